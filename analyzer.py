@@ -2,34 +2,100 @@ import re
 import logging
 from collections import Counter
 from skill_extractor import extract_skills_from_job_description
+from section_index import SectionIndex, SECTION_HEADERS
+from token_stats import DocumentTokenStats, build_lemma_table
+from scoring import extract_scoring_features, score_features
+from metrics import stage_timer
+from resume_parser import CONTACT_NOT_FOUND
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def analyze_resume(resume_data, job_description):
+# Common action verbs for resumes, mapped to their base form for inflection matching
+ACTION_VERB_LEMMAS = {
+    'achieved': 'achieve', 'improved': 'improve', 'developed': 'develop', 'created': 'create',
+    'implemented': 'implement', 'managed': 'manage', 'led': 'lead', 'designed': 'design',
+    'established': 'establish', 'coordinated': 'coordinate', 'conducted': 'conduct',
+    'organized': 'organize', 'directed': 'direct', 'launched': 'launch', 'spearheaded': 'spearhead',
+    'delivered': 'deliver', 'generated': 'generate', 'reduced': 'reduce', 'increased': 'increase',
+    'negotiated': 'negotiate', 'supervised': 'supervise', 'trained': 'train',
+    'analyzed': 'analyze', 'built': 'build', 'streamlined': 'streamline', 'produced': 'produce',
+    'resolved': 'resolve', 'executed': 'execute', 'maintained': 'maintain',
+    'collaborated': 'collaborate', 'influenced': 'influence', 'optimized': 'optimize',
+    'authored': 'author', 'initiated': 'initiate', 'transformed': 'transform'
+}
+
+# Verbs whose absence marks an experience description as weak
+STRONG_ACTION_VERBS = [
+    'achieved', 'improved', 'developed', 'created', 'implemented', 'managed', 'led',
+    'designed', 'established', 'coordinated', 'analyzed', 'built'
+]
+
+# Word forms counted for each action verb: exact past tense only, or all regular inflections
+ACTION_VERB_FORMS = build_lemma_table(ACTION_VERB_LEMMAS)
+ACTION_VERB_INFLECTED_FORMS = build_lemma_table(ACTION_VERB_LEMMAS, match_inflections=True)
+
+def analyze_resume(resume_data, job_description, job_skills=None, match_inflections=False, timings=None):
     """
     Analyze the resume for completeness, quality, and match with job description
     
     Args:
         resume_data (dict): Parsed resume data
         job_description (str): Job description text
+        job_skills (list): Skills already extracted from the job description (optional)
+        match_inflections (bool): Count inflected action verbs ("leading", "develops") too
+        timings (StageTimings): Collects the duration of each analysis (optional)
         
     Returns:
         dict: Analysis results
     """
     logger.debug("Analyzing resume")
     
-    analysis = {
-        'sections_analysis': analyze_sections(resume_data),
-        'word_count': analyze_word_count(resume_data),
-        'action_verbs': analyze_action_verbs(resume_data),
-        'keyword_match': analyze_keyword_match(resume_data, job_description),
-        'common_resume_issues': identify_common_issues(resume_data)
-    }
+    # Tokenize the resume once for the word count, action verb and issue checks
+    with stage_timer(timings, 'tokenize'):
+        stats = document_token_stats(resume_data)
+    
+    analysis = {}
+    with stage_timer(timings, 'analyze_sections'):
+        analysis['sections_analysis'] = analyze_sections(resume_data)
+    with stage_timer(timings, 'analyze_word_count'):
+        analysis['word_count'] = analyze_word_count(resume_data, stats)
+    with stage_timer(timings, 'analyze_action_verbs'):
+        analysis['action_verbs'] = analyze_action_verbs(resume_data, stats, match_inflections)
+    with stage_timer(timings, 'analyze_keyword_match'):
+        analysis['keyword_match'] = analyze_keyword_match(resume_data, job_description, job_skills)
+    with stage_timer(timings, 'identify_common_issues'):
+        analysis['common_resume_issues'] = identify_common_issues(resume_data, stats, match_inflections)
     
     return analysis
 
+def document_token_stats(resume_data):
+    """
+    Tokenize the raw text, summary and experience descriptions of a resume
+    
+    Args:
+        resume_data (dict): Parsed resume data
+        
+    Returns:
+        DocumentTokenStats: Word counts and lowercase token counters
+    """
+    return DocumentTokenStats(resume_data, summary_text=summary_section_text(resume_data))
+
+def summary_section_text(resume_data):
+    """Return the unstripped summary section text, or None if the resume has no summary"""
+    if not resume_data.get('sections', {}).get('summary', False):
+        return None
+    
+    # Use the summary span located by the parser, or find it in the raw text
+    raw_text = resume_data.get('raw_text', '')
+    summary_span = resume_data.get('section_spans', {}).get('summary')
+    if summary_span is None:
+        summary_span = SectionIndex(raw_text).span(SECTION_HEADERS['summary'])
+    if not summary_span:
+        return None
+    return raw_text[summary_span[0]:summary_span[1]]
+
 def analyze_sections(resume_data):
     """
     Analyze which sections are present or missing in the resume
@@ -61,37 +127,30 @@ def analyze_sections(resume_data):
         'has_all_essential': len(missing_essential) == 0
     }
 
-def analyze_word_count(resume_data):
+def analyze_word_count(resume_data, stats=None):
     """
     Analyze word count for different sections of the resume
     
     Args:
         resume_data (dict): Parsed resume data
+        stats (DocumentTokenStats): Token statistics of the resume (computed if omitted)
         
     Returns:
         dict: Word count analysis
     """
+    if stats is None:
+        stats = document_token_stats(resume_data)
     word_counts = {}
     
     # Count words in the raw text
-    raw_text = resume_data.get('raw_text', '')
-    word_counts['total'] = len(re.findall(r'\b\w+\b', raw_text))
+    word_counts['total'] = stats.raw.word_count
     
     # Count words in summary section (if present)
-    summary_section = ''
-    if resume_data.get('sections', {}).get('summary', False):
-        # Extract summary section from raw text (simplified)
-        summary_section = re.search(r'(?:SUMMARY|PROFESSIONAL SUMMARY|PROFILE)[:\s]*(?:\n|\r\n?)(.*?)(?:\n\s*(?:[A-Z][A-Z\s]+[A-Z])[:\s]*(?:\n|\r\n?)|$)', raw_text, re.IGNORECASE | re.DOTALL)
-        if summary_section:
-            summary_text = summary_section.group(1)
-            word_counts['summary'] = len(re.findall(r'\b\w+\b', summary_text))
+    if stats.summary is not None:
+        word_counts['summary'] = stats.summary.word_count
     
     # Count words in experience descriptions
-    experience_words = 0
-    for exp in resume_data.get('experience', []):
-        if 'description' in exp:
-            experience_words += len(re.findall(r'\b\w+\b', exp['description']))
-    word_counts['experience'] = experience_words
+    word_counts['experience'] = sum(exp.word_count for exp in stats.experience)
     
     # Analyze if word count is within recommended ranges
     word_count_assessment = {}
@@ -117,58 +176,40 @@ def analyze_word_count(resume_data):
     
     return word_counts
 
-def analyze_action_verbs(resume_data):
+def analyze_action_verbs(resume_data, stats=None, match_inflections=False):
     """
     Analyze the usage of action verbs in experience descriptions
     
     Args:
         resume_data (dict): Parsed resume data
+        stats (DocumentTokenStats): Token statistics of the resume (computed if omitted)
+        match_inflections (bool): Also count base, -s and -ing forms of each verb
         
     Returns:
         dict: Action verb analysis
     """
-    # Common action verbs for resumes
-    common_action_verbs = [
-        'achieved', 'improved', 'developed', 'created', 'implemented', 'managed', 'led', 'designed',
-        'established', 'coordinated', 'conducted', 'organized', 'directed', 'launched', 'spearheaded',
-        'delivered', 'generated', 'reduced', 'increased', 'negotiated', 'supervised', 'trained',
-        'analyzed', 'built', 'streamlined', 'produced', 'resolved', 'executed', 'maintained',
-        'collaborated', 'influenced', 'optimized', 'authored', 'initiated', 'transformed'
-    ]
-    
-    # Extract all experience descriptions
-    experience_descriptions = []
-    for exp in resume_data.get('experience', []):
-        if 'description' in exp:
-            experience_descriptions.append(exp['description'])
-    
-    combined_description = ' '.join(experience_descriptions).lower()
-    
-    # Count action verbs
-    action_verb_count = 0
-    unique_action_verbs = set()
-    
-    for verb in common_action_verbs:
-        verb_pattern = r'\b' + re.escape(verb) + r'\b'
-        matches = re.findall(verb_pattern, combined_description)
-        
+    if stats is None:
+        stats = document_token_stats(resume_data)
+    verb_forms = ACTION_VERB_INFLECTED_FORMS if match_inflections else ACTION_VERB_FORMS
+    
+    # Counts over all experience descriptions together (lowercased)
+    experience = stats.combined_experience
+    
+    # Count action verbs, in list order so ties in most_common keep that order
+    verb_counter = Counter()
+    for verb, forms in verb_forms.items():
+        matches = experience.count(forms)
         if matches:
-            action_verb_count += len(matches)
-            unique_action_verbs.add(verb)
+            verb_counter[verb] = matches
+    
+    action_verb_count = sum(verb_counter.values())
+    unique_action_verbs = set(verb_counter)
     
     # Calculate action verb density
-    total_words = len(re.findall(r'\b\w+\b', combined_description))
+    total_words = experience.lowercase_word_count
     action_verb_density = action_verb_count / total_words if total_words > 0 else 0
     
     # Extract most used action verbs (top 5)
-    verb_counter = Counter()
-    for verb in common_action_verbs:
-        verb_pattern = r'\b' + re.escape(verb) + r'\b'
-        matches = re.findall(verb_pattern, combined_description)
-        
-        if matches:
-            verb_counter[verb] = len(matches)
-    
     most_used_verbs = verb_counter.most_common(5)
     
     return {
@@ -179,13 +220,14 @@ def analyze_action_verbs(resume_data):
         'assessment': 'good' if action_verb_density >= 0.05 else 'needs_improvement'
     }
 
-def analyze_keyword_match(resume_data, job_description):
+def analyze_keyword_match(resume_data, job_description, job_skills=None):
     """
     Analyze how well the resume matches keywords from the job description
     
     Args:
         resume_data (dict): Parsed resume data
         job_description (str): Job description text
+        job_skills (list): Skills already extracted from the job description (optional)
         
     Returns:
         dict: Keyword match analysis
@@ -198,21 +240,15 @@ def analyze_keyword_match(resume_data, job_description):
             'assessment': 'no_job_description'
         }
     
-    # Extract skills from job description
-    job_skills = extract_skills_from_job_description(job_description)
+    # Extract skills from job description unless they were precomputed
+    if job_skills is None:
+        job_skills = extract_skills_from_job_description(job_description)
     
     # Get resume skills (flattened)
-    resume_skills = []
-    for skill_category, skills in resume_data.get('skills', {}).items():
-        if isinstance(skills, list):
-            resume_skills.extend(skills)
-        elif isinstance(skills, dict):
-            for subcategory, subskills in skills.items():
-                resume_skills.extend(subskills)
-    
-    # Normalize skills (lowercase)
-    resume_skills_lower = [skill.lower() for skill in resume_skills]
-    job_skills_lower = [skill.lower() for skill in job_skills]
+    resume_skills = flatten_skills(resume_data.get('skills', {}))
+    
+    # Normalize skills (lowercase) into a set for constant-time lookups
+    resume_skills_lower = {skill.lower() for skill in resume_skills}
     
     # Find matching and missing skills
     matched_skills = [skill for skill in job_skills if skill.lower() in resume_skills_lower]
@@ -238,23 +274,51 @@ def analyze_keyword_match(resume_data, job_description):
         'assessment': assessment
     }
 
-def identify_common_issues(resume_data):
+def flatten_skills(skills):
+    """
+    Flatten categorized skills into a single list
+    
+    Args:
+        skills (dict|list): Skills by category (as returned by extract_skills) or a plain list
+        
+    Returns:
+        list: All skills
+    """
+    if isinstance(skills, list):
+        return list(skills)
+    
+    flat_skills = []
+    for skill_category, category_skills in skills.items():
+        if isinstance(category_skills, list):
+            flat_skills.extend(category_skills)
+        elif isinstance(category_skills, dict):
+            for subcategory, subskills in category_skills.items():
+                flat_skills.extend(subskills)
+    return flat_skills
+
+def identify_common_issues(resume_data, stats=None, match_inflections=False):
     """
     Identify common issues in the resume
     
     Args:
         resume_data (dict): Parsed resume data
+        stats (DocumentTokenStats): Token statistics of the resume (computed if omitted)
+        match_inflections (bool): Accept inflected forms of the strong action verbs
         
     Returns:
         list: Common issues identified
     """
+    if stats is None:
+        stats = document_token_stats(resume_data)
+    verb_forms = ACTION_VERB_INFLECTED_FORMS if match_inflections else ACTION_VERB_FORMS
+    strong_verb_forms = {form for verb in STRONG_ACTION_VERBS for form in verb_forms[verb]}
     issues = []
     
     # Check for missing contact information
-    if resume_data.get('email') == "Email not found":
+    if resume_data.get('email') == CONTACT_NOT_FOUND['email']:
         issues.append("Missing email address")
     
-    if resume_data.get('phone') == "Phone not found":
+    if resume_data.get('phone') == CONTACT_NOT_FOUND['phone']:
         issues.append("Missing phone number")
     
     # Check for missing essential sections
@@ -273,21 +337,11 @@ def identify_common_issues(resume_data):
     
     # Check for potentially weak experience descriptions
     weak_experience = False
-    for exp in resume_data.get('experience', []):
-        if 'description' in exp:
-            description = exp['description']
-            # Check if description is too short
-            if len(re.findall(r'\b\w+\b', description)) < 15:
-                weak_experience = True
-                break
-            
-            # Check if description lacks action verbs
-            if not any(re.search(r'\b' + re.escape(verb) + r'\b', description.lower()) for verb in [
-                'achieved', 'improved', 'developed', 'created', 'implemented', 'managed', 'led',
-                'designed', 'established', 'coordinated', 'analyzed', 'built'
-            ]):
-                weak_experience = True
-                break
+    for description in stats.experience:
+        # Check if description is too short or lacks action verbs
+        if description.word_count < 15 or not description.contains_any(strong_verb_forms):
+            weak_experience = True
+            break
     
     if weak_experience:
         issues.append("Weak experience descriptions (too short or lacking action verbs)")
@@ -318,113 +372,8 @@ def score_resume(resume_data, analysis, job_description):
     Returns:
         dict: Resume scores
     """
-    scores = {}
-    
-    # Score based on sections (30 points)
-    section_score = 0
-    sections_analysis = analysis.get('sections_analysis', {})
-    
-    # Each essential section is worth 5 points
-    essential_sections = ['summary', 'education', 'experience', 'skills']
-    for section in essential_sections:
-        if section in sections_analysis.get('present', []):
-            section_score += 5
-    
-    # Each recommended section is worth 2.5 points
-    recommended_sections = ['projects', 'certifications']
-    for section in recommended_sections:
-        if section in sections_analysis.get('present', []):
-            section_score += 2.5
-    
-    # Bonus for having contact information (5 points)
-    if resume_data.get('email') != "Email not found" and resume_data.get('phone') != "Phone not found":
-        section_score += 5
-    
-    scores['sections'] = min(section_score, 30)
-    
-    # Score based on keyword matching (25 points)
-    keyword_score = 0
-    keyword_match = analysis.get('keyword_match', {})
-    
-    if keyword_match.get('match_percentage') is not None:
-        keyword_score = keyword_match.get('match_percentage') * 0.25
-    else:
-        # If no job description provided, give default score
-        keyword_score = 15
-    
-    scores['keywords'] = min(keyword_score, 25)
-    
-    # Score based on action verbs usage (20 points)
-    action_verb_score = 0
-    action_verbs = analysis.get('action_verbs', {})
-    
-    if action_verbs.get('assessment') == 'good':
-        action_verb_score = 15
-        
-        # Bonus for having many unique action verbs
-        if action_verbs.get('unique_action_verbs', 0) >= 10:
-            action_verb_score += 5
-    else:
-        # Base score based on action verb density
-        action_verb_density = action_verbs.get('action_verb_density', 0)
-        action_verb_score = min(action_verb_density * 200, 15)
-    
-    scores['action_verbs'] = min(action_verb_score, 20)
-    
-    # Score based on word count (15 points)
-    word_count_score = 0
-    word_count = analysis.get('word_count', {})
-    
-    # Score based on total word count
-    if word_count.get('assessment', {}).get('total') == 'good':
-        word_count_score += 10
-    elif word_count.get('assessment', {}).get('total') == 'too_short':
-        word_count_score += 5
-    elif word_count.get('assessment', {}).get('total') == 'too_long':
-        word_count_score += 7
-    
-    # Score based on summary word count (if present)
-    if 'summary' in word_count.get('assessment', {}):
-        if word_count.get('assessment', {}).get('summary') == 'good':
-            word_count_score += 5
-        elif word_count.get('assessment', {}).get('summary') == 'too_short':
-            word_count_score += 2
-        elif word_count.get('assessment', {}).get('summary') == 'too_long':
-            word_count_score += 3
-    
-    scores['word_count'] = min(word_count_score, 15)
-    
-    # Score based on lack of common issues (10 points)
-    issues_score = 10
-    common_issues = analysis.get('common_resume_issues', [])
-    
-    # Deduct 2 points per issue, up to 10 points
-    issues_score -= min(len(common_issues) * 2, 10)
-    
-    scores['issues'] = max(issues_score, 0)
-    
-    # Calculate overall score (out of 100)
-    scores['overall'] = (
-        scores['sections'] +
-        scores['keywords'] +
-        scores['action_verbs'] +
-        scores['word_count'] +
-        scores['issues']
-    )
-    
-    # Determine score grade
-    if scores['overall'] >= 90:
-        scores['grade'] = 'A'
-    elif scores['overall'] >= 80:
-        scores['grade'] = 'B'
-    elif scores['overall'] >= 70:
-        scores['grade'] = 'C'
-    elif scores['overall'] >= 60:
-        scores['grade'] = 'D'
-    else:
-        scores['grade'] = 'F'
-    
-    return scores
+    # Weights come from the active scoring profile; see scoring.py
+    return score_features(extract_scoring_features(resume_data, analysis))
 
 def generate_suggestions(resume_data, analysis, scores, job_description):
     """
@@ -503,9 +452,26 @@ def generate_suggestions(resume_data, analysis, scores, job_description):
             suggestions['medium_priority'].append("Fix formatting issues to improve readability")
     
     # General suggestions based on overall score
-    if scores.get('overall', 0) < 70:
+    band = overall_score_band(scores.get('overall', 0))
+    if band == 'overhaul':
         suggestions['high_priority'].append("Consider a complete resume overhaul to better highlight your qualifications")
-    elif scores.get('overall', 0) < 80:
+    elif band == 'improve':
         suggestions['medium_priority'].append("Make several key improvements to strengthen your resume's impact")
     
     return suggestions
+
+def overall_score_band(overall):
+    """
+    Return the general suggestion an overall score calls for
+    
+    Args:
+        overall (float): Overall score
+        
+    Returns:
+        str: 'overhaul', 'improve', or None for a good score
+    """
+    if overall < 70:
+        return 'overhaul'
+    if overall < 80:
+        return 'improve'
+    return None
@@ -1,16 +1,21 @@
 import os
+import io
+import json
+import time
+import click
 import logging
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash, session, stream_with_context
+from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 from werkzeug.middleware.proxy_fix import ProxyFix
-import tempfile
-import uuid
 from flask_sqlalchemy import SQLAlchemy
 
 # Import the resume processing modules
-from resume_parser import parse_resume
-from skill_extractor import extract_skills
-from analyzer import analyze_resume, score_resume, generate_suggestions
+from pipeline import (
+    process_upload, reanalyze_resume, match_job_descriptions, build_resume_record,
+    record_stages, stored_resume_data, stored_analysis, analysis_payload
+)
+from metrics import StageTimings, UPLOADS, upload_labels, render_metrics, stage_timer
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -31,18 +36,41 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # Import and initialize database models
-from models import db, Resume, User
+from models import db, Resume, User, AnalysisJob, upgrade_schema
 db.init_app(app)
 
+from jd_library import lookup_job_description, get_job_description, recent_job_descriptions
+from parse_cache import read_upload, parse_resume_cached
+from skill_index import rank_resumes_for_job
+from text_index import search_resumes, score_resume_text
+from jobs import job_queue, QueueFullError, describe_job
+from skill_store import find_resumes_by_skills, backfill_resume_skills
+from history import history_page, grade_choices, InvalidCursorError, HISTORY_SORTS, HISTORY_PAGE_SIZE
+from result_store import render_result, store_unsaved_result
+from bulk_upload import iter_bulk_members, iter_encoded_members, iter_bulk_results, process_bulk_upload, MAX_BULK_FILES
+from persistence import writer, configure_sqlite
+job_queue.init_app(app)
+writer.init_app(app)
+
 # Configure upload settings
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
-TEMP_FOLDER = tempfile.gettempdir()
-app.config['UPLOAD_FOLDER'] = TEMP_FOLDER
 
-# Create database tables if they don't exist
+# Most job descriptions one resume can be matched against per request
+MAX_MATCH_JOB_DESCRIPTIONS = 500
+
+# Largest request accepted by /bulk_upload
+MAX_BULK_UPLOAD_BYTES = int(os.environ.get('MAX_BULK_UPLOAD_BYTES', 512 * 1024 * 1024))
+
+# Seconds between job status checks in /jobs/<job_id> event streams, and the longest a stream stays open
+JOB_EVENTS_POLL_SECONDS = 0.5
+JOB_EVENTS_MAX_SECONDS = 300
+
+# Create database tables if they don't exist, and add columns introduced since
 with app.app_context():
+    configure_sqlite(db.engine)
     db.create_all()
+    upgrade_schema()
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -50,7 +78,7 @@ def allowed_file(filename):
 @app.route('/')
 def index():
     """Render the main page"""
-    return render_template('index.html')
+    return render_template('index.html', saved_job_descriptions=recent_job_descriptions())
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
@@ -62,6 +90,7 @@ def upload_file():
     
     file = request.files['resume']
     job_description = request.form.get('job_description', '')
+    job_description_id = request.form.get('job_description_id', type=int)
     
     # If user does not select file
     if file.filename == '':
@@ -69,82 +98,51 @@ def upload_file():
         return redirect(request.url)
     
     if file and file.filename and allowed_file(file.filename):
+        started = time.perf_counter()
+        timings = StageTimings()
         try:
-            # Generate a unique filename with the original extension
-            original_extension = file.filename.rsplit('.', 1)[1].lower()
-            unique_filename = f"{uuid.uuid4().hex}.{original_extension}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            
-            # Save the file
-            file.save(filepath)
-            logger.debug(f"File saved to {filepath}")
-            
-            # Parse the resume
-            resume_data = parse_resume(filepath, original_extension)
-            logger.debug("Resume parsed successfully")
+            # Resolve the job description through the library so its skills are extracted only once
+            if job_description_id:
+                job_entry = get_job_description(job_description_id)
+                if job_entry is None:
+                    flash('Saved job description not found')
+                    return redirect(request.url)
+                job_description = job_entry.text
+            else:
+                job_entry = lookup_job_description(job_description)
+            job_skills = job_entry.skills if job_entry else None
             
-            # Extract skills
-            skills = extract_skills(resume_data)
-            logger.debug(f"Extracted skills: {skills}")
+            original_extension = file.filename.rsplit('.', 1)[1].lower()
             
-            # Analyze the resume
-            analysis = analyze_resume(resume_data, job_description)
-            logger.debug("Resume analysis completed")
+            # Read the upload into memory, hashing it so identical files reuse earlier parser output
+            with timings.stage('read_upload'):
+                data, content_hash = read_upload(file.stream)
             
-            # Score the resume
-            scores = score_resume(resume_data, analysis, job_description)
-            logger.debug(f"Resume scores: {scores}")
+            if wants_async():
+                return queue_upload(data, content_hash, original_extension, file.filename,
+                                    job_description, job_skills)
             
-            # Generate improvement suggestions
-            suggestions = generate_suggestions(resume_data, analysis, scores, job_description)
-            logger.debug("Generated suggestions")
+            processed = process_upload(data, content_hash, original_extension, file.filename,
+                                       job_description, job_skills, timings)
+            resume_data, cache_hit, result = processed['resume_data'], processed['cache_hit'], processed['result']
             
-            # Store results in session
-            session['resume_data'] = resume_data
-            session['skills'] = skills
-            session['analysis'] = analysis
-            session['scores'] = scores
-            session['suggestions'] = suggestions
+            extraction = resume_data.get('extraction') or {}
+            if extraction.get('truncated'):
+                flash('This document is very long; only the first part was analyzed.')
             
-            # Save to database
-            try:
-                # Create a new Resume record
-                resume_record = Resume()
-                resume_record.filename = file.filename
-                resume_record.name = resume_data.get('name', 'Unknown')
-                resume_record.email = resume_data.get('email', '')
-                resume_record.phone = resume_data.get('phone', '')
-                resume_record.raw_text = resume_data.get('raw_text', '')
-                resume_record.job_description = job_description
-                resume_record.skills = skills
-                resume_record.sections_analysis = analysis.get('sections_analysis', {})
-                resume_record.keyword_match = analysis.get('keyword_match', {})
-                resume_record.action_verbs_analysis = analysis.get('action_verbs', {})
-                resume_record.word_count_analysis = analysis.get('word_count', {})
-                resume_record.common_issues = analysis.get('common_resume_issues', [])
-                resume_record.overall_score = scores.get('overall', 0)
-                resume_record.sections_score = scores.get('sections', 0)
-                resume_record.keywords_score = scores.get('keywords', 0)
-                resume_record.action_verbs_score = scores.get('action_verbs', 0)
-                resume_record.word_count_score = scores.get('word_count', 0)
-                resume_record.issues_score = scores.get('issues', 0)
-                resume_record.grade = scores.get('grade', 'F')
-                resume_record.suggestions = suggestions
-                
-                # Save to database
-                db.session.add(resume_record)
-                db.session.commit()
-                
-                # Store the resume ID in session for future reference
-                session['resume_id'] = resume_record.id
-                logger.debug(f"Resume saved to database with ID: {resume_record.id}")
-            except Exception as e:
-                logger.error(f"Error saving to database: {str(e)}")
-                db.session.rollback()
+            # Save to database; the session only keeps the ID and /results is served from the stored row
+            resume_id = save_resume_record(processed['record'], timings)
+            if resume_id is not None:
+                set_result(resume_id)
+                logger.debug(f"Resume saved to database with ID: {resume_id}")
+            else:
                 # Continue even if database save fails
+                set_result(store_unsaved_result(resume_data, result))
             
-            # Clean up the file
-            os.remove(filepath)
+            labels = upload_labels(original_extension, extraction, cache_hit)
+            timings.add('total', time.perf_counter() - started)
+            timings.observe(**labels)
+            UPLOADS.inc(**labels)
             
             return redirect(url_for('results'))
             
@@ -156,63 +154,595 @@ def upload_file():
         flash('File type not allowed. Please upload a PDF, DOCX, or TXT file.')
         return redirect(request.url)
 
+def save_resume_record(resume_record, timings=None):
+    """
+    Store a new resume and add it to the candidate and search indexes
+    
+    The record is written by the background writer together with whatever
+    other requests have finished meanwhile, which also refreshes the indexes.
+    
+    Args:
+        resume_record (Resume): Unsaved record
+        timings (StageTimings): Collects the duration of each stage (optional)
+    
+    Returns:
+        int: The new resume ID, or None if it could not be saved
+    """
+    try:
+        with stage_timer(timings, 'db_commit'):
+            return writer.save(resume_record)
+    except Exception as e:
+        logger.error(f"Error saving to database: {str(e)}")
+        return None
+
+def wants_async():
+    """Whether the client asked for the upload to be analyzed in the background"""
+    if request.form.get('async', '').lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+def queue_upload(data, content_hash, file_type, filename, job_description, job_skills):
+    """Queue an upload for background analysis and return a 202 response pointing at the job"""
+    try:
+        job_id = job_queue.submit(data, content_hash, file_type, filename, job_description, job_skills)
+    except QueueFullError as e:
+        logger.warning(f"Rejected async upload: {str(e)}")
+        response = jsonify({'error': 'Too many uploads are being analyzed; try again shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    
+    status_url = url_for('job_status', job_id=job_id)
+    response = jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': status_url,
+        'events_url': url_for('job_status', job_id=job_id, stream=1)
+    })
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report the status of a background analysis job, as JSON or as a stream of server-sent events"""
+    job = db.session.get(AnalysisJob, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if request.args.get('stream') or request.accept_mimetypes.best == 'text/event-stream':
+        return Response(stream_with_context(job_events(job_id)), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    
+    described = describe_job(job)
+    if job.resume_id:
+        described['resume_url'] = url_for('view_resume', resume_id=job.resume_id)
+    return jsonify(described)
+
+def job_events(job_id):
+    """Yield a server-sent event whenever a job's status or stage changes, until it finishes"""
+    deadline = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+    last = None
+    while True:
+        # Read the row fresh each time; the pool worker commits its progress in another process
+        db.session.expire_all()
+        job = db.session.get(AnalysisJob, job_id)
+        described = describe_job(job)
+        if (job.status, job.stage) != last:
+            last = (job.status, job.stage)
+            event = 'progress' if job.status in ('queued', 'running') else job.status
+            yield f"event: {event}\ndata: {json.dumps(described)}\n\n"
+        if job.status in ('done', 'failed'):
+            return
+        if time.monotonic() > deadline:
+            yield f"event: timeout\ndata: {json.dumps(described)}\n\n"
+            return
+        db.session.rollback()
+        time.sleep(JOB_EVENTS_POLL_SECONDS)
+
+@app.route('/bulk_upload', methods=['POST'])
+def bulk_upload():
+    """Analyze and store many resumes, uploaded as several files and/or zip archives"""
+    # Bulk uploads get a larger limit than single resumes
+    request.max_content_length = MAX_BULK_UPLOAD_BYTES
+    request.max_form_parts = MAX_BULK_FILES + 10
+    
+    files = request.files.getlist('resumes') + request.files.getlist('resume')
+    if not any(file.filename for file in files):
+        return jsonify({'error': 'No files uploaded'}), 400
+    
+    job = resolve_job_description(request.form)
+    if job is None:
+        return jsonify({'error': 'Job description not found'}), 404
+    job_description, job_skills = job
+    
+    report = process_bulk_upload(iter_bulk_members(files), job_description, job_skills)
+    return jsonify(report)
+
+@app.route('/job_descriptions', methods=['POST'])
+def save_job_description():
+    """Store a job description in the library and return its ID and skills"""
+    payload = request.get_json(silent=True) or request.form
+    job_entry = lookup_job_description(payload.get('job_description', ''))
+    if job_entry is None:
+        return jsonify({'error': 'Job description is empty'}), 400
+    
+    return jsonify({
+        'id': job_entry.id,
+        'skills': job_entry.skills,
+        'dictionary_version': job_entry.dictionary_version
+    })
+
+@app.route('/job_descriptions/<int:jd_id>')
+def job_description_detail(jd_id):
+    """Return a stored job description with its precomputed skills"""
+    job_entry = get_job_description(jd_id)
+    if job_entry is None:
+        return jsonify({'error': 'Job description not found'}), 404
+    
+    return jsonify({
+        'id': job_entry.id,
+        'text': job_entry.text,
+        'skills': job_entry.skills,
+        'dictionary_version': job_entry.dictionary_version
+    })
+
 @app.route('/results')
 def results():
     """Display the analysis results"""
-    # Check if we have results in the session
-    if not all(key in session for key in ['resume_data', 'skills', 'analysis', 'scores', 'suggestions']):
+    result_id = session.get('result_id')
+    page = render_result(result_id) if result_id is not None else None
+    if page is None:
         flash('No analysis data found. Please upload a resume first.')
         return redirect(url_for('index'))
     
-    return render_template('results.html',
-                          resume_data=session['resume_data'],
-                          skills=session['skills'],
-                          analysis=session['analysis'],
-                          scores=session['scores'],
-                          suggestions=session['suggestions'])
+    return page
+
+# Keys earlier versions kept the whole analysis under, cleared from old cookies
+LEGACY_RESULT_KEYS = ['resume_id', 'resume_data', 'skills', 'analysis', 'scores', 'suggestions']
+
+def set_result(result_id):
+    """Remember the result /results shows; the session holds nothing else about it"""
+    for key in LEGACY_RESULT_KEYS:
+        session.pop(key, None)
+    session['result_id'] = result_id
 
 @app.route('/history')
 def history():
-    """Display resume analysis history"""
-    # Get all resumes from database
-    resumes = Resume.query.order_by(Resume.upload_date.desc()).all()
+    """Display resume analysis history, one page at a time"""
+    sort = request.args.get('sort', 'date')
+    if sort not in HISTORY_SORTS:
+        sort = 'date'
+    grade = request.args.get('grade') or None
+    filters = {
+        'sort': sort,
+        'reverse': request.args.get('order') == 'reverse',
+        'grade': grade,
+        'min_score': request.args.get('min_score', type=float),
+        'max_score': request.args.get('max_score', type=float)
+    }
+    
+    try:
+        page = history_page(after=request.args.get('after'), before=request.args.get('before'),
+                            page_size=request.args.get('page_size', HISTORY_PAGE_SIZE, type=int), **filters)
+    except InvalidCursorError as e:
+        logger.warning(f"Bad history cursor: {str(e)}")
+        flash('That page of the history could not be found; showing the first page.')
+        page = history_page(**filters)
     
-    return render_template('history.html', resumes=resumes)
+    # Links to other pages keep the filters
+    params = {key: value for key, value in request.args.items() if key not in ('after', 'before')}
+    return render_template('history.html', resumes=page['rows'], params=params,
+                           next_cursor=page['next_cursor'], prev_cursor=page['prev_cursor'],
+                           grades=grade_choices(), sorts=list(HISTORY_SORTS))
 
 @app.route('/view_resume/<int:resume_id>')
 def view_resume(resume_id):
     """View a specific resume analysis from history"""
-    # Get the resume from database
+    # Only check that it exists; /results loads it
+    Resume.query.with_entities(Resume.id).filter_by(id=resume_id).first_or_404()
+    set_result(resume_id)
+    
+    return redirect(url_for('results'))
+
+@app.route('/reanalyze/<int:resume_id>', methods=['POST'])
+def reanalyze(resume_id):
+    """
+    Analyze a stored resume against another job description, reusing its parsed data and skills
+    
+    The new analysis is only added to the history as a resume of its own when
+    'store' is set; otherwise it is shown (or returned) without a new row.
+    """
     resume = Resume.query.get_or_404(resume_id)
+    payload = request.get_json(silent=True) or request.form
     
-    # Set session data
-    session['resume_data'] = {
-        'name': resume.name,
-        'email': resume.email,
-        'phone': resume.phone,
-        'raw_text': resume.raw_text
-    }
-    session['skills'] = resume.skills
-    session['analysis'] = {
-        'sections_analysis': resume.sections_analysis,
-        'keyword_match': resume.keyword_match,
-        'action_verbs': resume.action_verbs_analysis,
-        'word_count': resume.word_count_analysis,
-        'common_resume_issues': resume.common_issues
-    }
-    session['scores'] = {
-        'overall': resume.overall_score,
-        'sections': resume.sections_score,
-        'keywords': resume.keywords_score,
-        'action_verbs': resume.action_verbs_score,
-        'word_count': resume.word_count_score,
-        'issues': resume.issues_score,
-        'grade': resume.grade
-    }
-    session['suggestions'] = resume.suggestions
+    if payload.get('job_description_id'):
+        try:
+            job_entry = get_job_description(int(payload['job_description_id']))
+        except (TypeError, ValueError):
+            if request.is_json:
+                return jsonify({'error': 'job_description_id must be an integer'}), 400
+            flash('Invalid saved job description')
+            return redirect(url_for('results'))
+        if job_entry is None:
+            if request.is_json:
+                return jsonify({'error': 'Job description not found'}), 404
+            flash('Saved job description not found')
+            return redirect(url_for('results'))
+    else:
+        job_entry = lookup_job_description(payload.get('job_description', ''))
+    job_description = job_entry.text if job_entry else ''
+    job_skills = job_entry.skills if job_entry else None
+    
+    result = reanalyze_resume(resume, job_description, job_skills)
+    
+    new_resume_id = None
+    if api_flag(payload, 'store', False):
+        resume_record = build_resume_record(resume.filename, result['resume_data'], job_description, result)
+        new_resume_id = save_resume_record(resume_record)
+    
+    if request.is_json:
+        return jsonify({
+            'resume_id': new_resume_id,
+            'reanalyzed_from': resume.id,
+            'analysis': result['analysis'],
+            'scores': result['scores'],
+            'suggestions': result['suggestions'],
+            'stages': result['stages']
+        })
+    
+    if new_resume_id:
+        set_result(new_resume_id)
+    else:
+        set_result(store_unsaved_result(result['resume_data'], result, source_id=resume.id))
     
     return redirect(url_for('results'))
 
+@app.route('/match_job_descriptions', methods=['POST'])
+def match_resume_to_job_descriptions():
+    """
+    Match one resume against many job descriptions
+    
+    The resume is an uploaded file ('resume') or a stored resume ('resume_id').
+    Job descriptions are saved IDs ('job_description_ids') and/or texts
+    ('job_descriptions'); without either, the most recent saved ones are used.
+    """
+    payload = request.get_json(silent=True) or request.form
+    
+    jd_ids = request_list(payload, 'job_description_ids')
+    jd_texts = request_list(payload, 'job_descriptions')
+    if not jd_ids and not jd_texts:
+        jd_ids = [record.id for record in recent_job_descriptions(MAX_MATCH_JOB_DESCRIPTIONS)]
+    if len(jd_ids) + len(jd_texts) > MAX_MATCH_JOB_DESCRIPTIONS:
+        return jsonify({'error': f'At most {MAX_MATCH_JOB_DESCRIPTIONS} job descriptions per request'}), 400
+    
+    # Skills of each job description come from the library, extracted once per description
+    job_entries = []
+    for jd_id in jd_ids:
+        try:
+            job_entry = get_job_description(int(jd_id))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'job_description_ids must be integers'}), 400
+        if job_entry is None:
+            return jsonify({'error': f'Job description {jd_id} not found'}), 404
+        job_entries.append(job_entry)
+    for text in jd_texts:
+        job_entry = lookup_job_description(text)
+        if job_entry is not None:
+            job_entries.append(job_entry)
+    if not job_entries:
+        return jsonify({'error': 'No job descriptions to match'}), 400
+    
+    if payload.get('resume_id'):
+        # A stored resume already has its skills and resume-only analyses
+        try:
+            resume = db.session.get(Resume, int(payload['resume_id']))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'resume_id must be an integer'}), 400
+        if resume is None:
+            return jsonify({'error': 'Resume not found'}), 404
+        resume_data = stored_resume_data(resume)
+        matrix = match_job_descriptions(resume_data, job_entries, resume.skills or {}, stored_analysis(resume))
+        record_stages(skipped=['parse_resume'])
+        described = {'resume_id': resume.id, 'filename': resume.filename}
+    else:
+        file = request.files.get('resume')
+        if not file or not file.filename or not allowed_file(file.filename):
+            return jsonify({'error': 'Upload a PDF, DOCX, or TXT resume or give a resume_id'}), 400
+        data, content_hash = read_upload(file.stream)
+        resume_data, cache_hit = parse_resume_cached(data, content_hash, file.filename.rsplit('.', 1)[1].lower())
+        if cache_hit:
+            record_stages(skipped=['parse_resume'])
+        else:
+            record_stages(run=['parse_resume'])
+        matrix = match_job_descriptions(resume_data, job_entries)
+        described = {'resume_id': None, 'filename': file.filename}
+    
+    described['name'] = resume_data.get('name')
+    return jsonify(dict(matrix, resume=described))
+
+def request_list(payload, key):
+    """Return a list parameter from a JSON body or from repeated form fields"""
+    if hasattr(payload, 'getlist'):
+        return payload.getlist(key)
+    value = payload.get(key) or []
+    return value if isinstance(value, list) else [value]
+
+@app.route('/candidates', methods=['POST'])
+def rank_candidates():
+    """Return the stored resumes that best match a job description, by shared skills"""
+    payload = request.get_json(silent=True) or request.form
+    try:
+        limit = min(int(payload.get('limit', 50)), 500)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    if payload.get('job_description_id'):
+        try:
+            job_entry = get_job_description(int(payload['job_description_id']))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'job_description_id must be an integer'}), 400
+        if job_entry is None:
+            return jsonify({'error': 'Job description not found'}), 404
+    else:
+        job_entry = lookup_job_description(payload.get('job_description', ''))
+        if job_entry is None:
+            return jsonify({'error': 'Job description is empty'}), 400
+    
+    ranking = rank_resumes_for_job(job_entry.skills, limit)
+    
+    return jsonify({
+        'job_description_id': job_entry.id,
+        'job_skills': job_entry.skills,
+        'candidates': describe_ranked_resumes(ranking)
+    })
+
+@app.route('/search', methods=['POST'])
+def search():
+    """Return the stored resumes most relevant to a job description by BM25 over their full text"""
+    payload = request.get_json(silent=True) or request.form
+    try:
+        limit = min(int(payload.get('limit', 50)), 500)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    query = payload.get('job_description') or payload.get('query') or ''
+    if not query.strip():
+        return jsonify({'error': 'Job description is empty'}), 400
+    
+    return jsonify({'results': describe_ranked_resumes(search_resumes(query, limit))})
+
+def describe_ranked_resumes(ranking):
+    """Add display fields from the resumes table to ranking entries, keeping their order"""
+    ids = [entry['resume_id'] for entry in ranking]
+    records = {record.id: record for record in db.session.query(
+        Resume.id, Resume.filename, Resume.name, Resume.upload_date, Resume.overall_score, Resume.grade
+    ).filter(Resume.id.in_(ids))} if ids else {}
+    
+    described = []
+    for entry in ranking:
+        record = records.get(entry['resume_id'])
+        if record is None:
+            continue
+        described.append(dict(
+            entry,
+            filename=record.filename,
+            name=record.name,
+            upload_date=record.upload_date.isoformat() if record.upload_date else None,
+            overall_score=record.overall_score,
+            grade=record.grade
+        ))
+    return described
+
+def resolve_job_description(payload):
+    """
+    Look up the job description of a request through the library, so its skills are extracted only once
+    
+    Args:
+        payload: Form or JSON fields with job_description_id or job_description
+    
+    Returns:
+        tuple: (job description text, its skills or None), or None if the saved job description doesn't exist
+    """
+    if payload.get('job_description_id'):
+        try:
+            job_entry = get_job_description(int(payload['job_description_id']))
+        except (TypeError, ValueError):
+            job_entry = None
+        if job_entry is None:
+            return None
+        return job_entry.text, job_entry.skills
+    
+    job_description = payload.get('job_description') or ''
+    job_entry = lookup_job_description(job_description)
+    return job_description, job_entry.skills if job_entry else None
+
+def api_flag(payload, key, default):
+    """Read a boolean option given as a JSON boolean or a form string"""
+    value = payload.get(key)
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+def api_payload():
+    """Return the JSON body or the form fields of an API request, or None for malformed JSON"""
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        return payload if isinstance(payload, dict) else None
+    return request.form
+
+@app.route('/api/v1/analyze', methods=['POST'])
+def api_analyze():
+    """
+    Analyze one resume and return the parsed data, skills, analysis, scores and suggestions as JSON
+    
+    The resume is a multipart file field `resume`, or JSON `filename` and base64 `content`.
+    Options: job_description or job_description_id, store (default true), include_text (default false).
+    """
+    payload = api_payload()
+    if payload is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    
+    if request.is_json:
+        members = iter_encoded_members([payload], max_files=1)
+    else:
+        members = iter_bulk_members(request.files.getlist('resume')[:1], max_files=1)
+    member = next(members, None)
+    if member is None:
+        return jsonify({'error': 'No resume given'}), 400
+    if 'error' in member:
+        return jsonify({'error': member['error'], 'filename': member['filename']}), 400
+    
+    job = resolve_job_description(payload)
+    if job is None:
+        return jsonify({'error': 'Job description not found'}), 404
+    job_description, job_skills = job
+    
+    started = time.perf_counter()
+    timings = StageTimings()
+    try:
+        processed = process_upload(member['data'], member['content_hash'], member['file_type'], member['filename'],
+                                   job_description, job_skills, timings)
+    except Exception as e:
+        logger.error(f"Error processing {member['filename']}: {str(e)}")
+        return jsonify({'error': f'Error processing file: {str(e)}', 'filename': member['filename']}), 422
+    
+    # BM25 relevance of the whole text, beyond the dictionary skills; scored before the
+    # resume is stored so it isn't counted in the history's term statistics twice
+    text_match = None
+    if job_description.strip():
+        with timings.stage('text_match'):
+            text_match = score_resume_text(job_description, processed['resume_data'].get('raw_text', ''))
+    
+    resume_id = None
+    if api_flag(payload, 'store', True):
+        resume_id = save_resume_record(processed['record'], timings)
+        if resume_id is None:
+            return jsonify({'error': 'Error saving to database', 'filename': member['filename']}), 500
+    
+    labels = upload_labels(member['file_type'], processed['resume_data'].get('extraction'), processed['cache_hit'])
+    timings.add('total', time.perf_counter() - started)
+    timings.observe(**labels)
+    UPLOADS.inc(**labels)
+    
+    response = {'resume_id': resume_id, 'filename': member['filename'], 'text_match': text_match}
+    response.update(analysis_payload(processed['resume_data'], processed['result'], processed['cache_hit'],
+                                     api_flag(payload, 'include_text', False)))
+    return jsonify(response)
+
+@app.route('/api/v1/analyze/batch', methods=['POST'])
+def api_analyze_batch():
+    """
+    Analyze many resumes, streaming one NDJSON line per resume as soon as it is ready
+    
+    Resumes are multipart files in `resumes` (zip archives included), or a JSON `documents` list
+    of {filename, content} objects. Lines come in completion order; `index` is the position of the
+    resume in the request. Options are those of /api/v1/analyze.
+    """
+    request.max_content_length = MAX_BULK_UPLOAD_BYTES
+    request.max_form_parts = MAX_BULK_FILES + 10
+    payload = api_payload()
+    if payload is None:
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    
+    files = []
+    if request.is_json:
+        documents = payload.get('documents')
+        if not isinstance(documents, list) or not documents:
+            return jsonify({'error': 'documents must be a non-empty list'}), 400
+        members = iter_encoded_members(documents)
+    else:
+        files = request.files.getlist('resumes')
+        if not any(file.filename for file in files):
+            return jsonify({'error': 'No files uploaded'}), 400
+        # The request closes its files when the view returns, before the response is streamed
+        files = detach_uploads(files)
+        members = iter_bulk_members(files)
+    
+    job = resolve_job_description(payload)
+    if job is None:
+        return jsonify({'error': 'Job description not found'}), 404
+    job_description, job_skills = job
+    
+    # Each result is committed on its own so its line isn't held back by the rest of a batch
+    results = iter_bulk_results(members, job_description, job_skills, commit_size=1,
+                                store=api_flag(payload, 'store', True), details=True,
+                                include_text=api_flag(payload, 'include_text', False))
+    return Response(stream_with_context(ndjson_lines(results, files)), mimetype='application/x-ndjson')
+
+def detach_uploads(files):
+    """Take over the streams of uploaded files so they stay open after the request ends"""
+    detached = []
+    for file in files:
+        detached.append(FileStorage(file.stream, filename=file.filename, content_type=file.content_type))
+        file.stream = io.BytesIO()
+    return detached
+
+def ndjson_lines(results, files=()):
+    """Serialize results as NDJSON lines, closing the uploaded files once they are all read"""
+    try:
+        for entry in results:
+            yield json.dumps(entry) + '\n'
+    finally:
+        results.close()
+        for file in files:
+            file.close()
+
+@app.route('/api/v1/resumes')
+def api_resumes_by_skills():
+    """
+    List stored resumes by skills, newest first
+    
+    Query parameters: skills (comma-separated, all required), any_skills (comma-separated,
+    at least one required), category, limit (default 100) and before_id to continue a listing.
+    """
+    all_of = [skill for skill in request.args.get('skills', '').split(',') if skill.strip()]
+    any_of = [skill for skill in request.args.get('any_skills', '').split(',') if skill.strip()]
+    if not all_of and not any_of:
+        return jsonify({'error': 'Give skills and/or any_skills'}), 400
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    
+    rows = find_resumes_by_skills(all_of, any_of, request.args.get('category') or None,
+                                  limit=limit, before_id=request.args.get('before_id', type=int))
+    return jsonify({
+        'resumes': [
+            {
+                'resume_id': row.id,
+                'name': row.name,
+                'filename': row.filename,
+                'upload_date': row.upload_date.isoformat() if row.upload_date else None,
+                'overall_score': row.overall_score,
+                'grade': row.grade
+            }
+            for row in rows
+        ],
+        'next_before_id': rows[-1].id if len(rows) == limit else None
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Export upload pipeline timings and counters in the Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.cli.command('backfill-skills')
+@click.option('--batch-size', default=1000, show_default=True, help='Resumes per committed batch')
+def backfill_skills_command(batch_size):
+    """Fill the normalized resume_skills table for resumes stored before it existed"""
+    result = backfill_resume_skills(batch_size)
+    click.echo(f"Wrote {result['skill_rows']} skill rows for {result['resumes']} resumes")
+
+@app.cli.command('rescore')
+@click.option('--profile', 'profile_version', default=None, help='Weight profile version (default: SCORING_PROFILE)')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows written per batch')
+def rescore_command(profile_version, batch_size):
+    """Re-score all stored resumes with a weight profile"""
+    from rescore import rescore_resumes
+    result = rescore_resumes(profile_version, batch_size)
+    click.echo(f"Re-scored {result['updated']} of {result['resumes']} resumes with profile {result['profile']} "
+               f"(load {result['load_seconds']}s, score {result['score_seconds']}s, write {result['write_seconds']}s)")
+
 # Error handler for 405 Method Not Allowed
 @app.errorhandler(405)
 def method_not_allowed(e):
@@ -0,0 +1,67 @@
+"""
+python-docx vs. streaming DOCX text extraction
+
+Compares building the python-docx object model and reading doc.paragraphs
+with docx_reader.iter_docx_text on synthetic documents of increasing size,
+reporting wall time and peak Python memory (tracemalloc) for each. The
+streaming extractor's peak should stay flat as documents grow.
+
+    python -m benchmarks.bench_docx [--paragraphs 1000 5000 20000] [--repeat 3]
+"""
+import argparse
+import io
+import logging
+import time
+import tracemalloc
+
+from docx import Document
+
+from benchmarks.corpus import build_long_docx
+from docx_reader import iter_docx_text
+
+def python_docx_paragraphs(data):
+    """The previous extraction path: full object model, body paragraphs only"""
+    doc = Document(io.BytesIO(data))
+    for para in doc.paragraphs:
+        yield para.text + "\n"
+
+def streaming_paragraphs(data):
+    return iter_docx_text(io.BytesIO(data))
+
+def consume(paragraphs):
+    # Count instead of joining so the peak reflects the extractor, not the output string
+    return sum(len(text) for text in paragraphs)
+
+def measure(func, data, repeat):
+    """Return (best wall time in seconds, peak traced memory in bytes)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        consume(func(data))
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    consume(func(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'paragraphs':>10} {'size KB':>8} {'python-docx ms':>15} {'stream ms':>10} {'speedup':>8} "
+          f"{'python-docx MB':>15} {'stream MB':>10}")
+    for paragraph_count in sorted(args.paragraphs):
+        data = build_long_docx(paragraph_count)
+        assert "".join(python_docx_paragraphs(data)) == "".join(streaming_paragraphs(data))
+        docx_time, docx_peak = measure(python_docx_paragraphs, data, args.repeat)
+        stream_time, stream_peak = measure(streaming_paragraphs, data, args.repeat)
+        print(f"{paragraph_count:>10} {len(data) / 1024:>8.0f} {docx_time * 1000:>15.1f} {stream_time * 1000:>10.1f} "
+              f"{docx_time / stream_time:>7.2f}x {docx_peak / 2**20:>15.1f} {stream_peak / 2**20:>10.1f}")
+
+if __name__ == '__main__':
+    main()
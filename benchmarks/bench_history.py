@@ -0,0 +1,135 @@
+"""
+Paging through the resume history with keyset pagination
+
+Fills a SQLite database with synthetic resumes (only the columns the history
+shows, plus a raw_text of realistic size), then times the first and a deep
+page of every sort order with history_page against the old query that loaded
+every row and column, and against LIMIT/OFFSET. A full walk over the pages
+of every sort order on a small sample is checked against a sort in Python.
+
+    python -m benchmarks.bench_history [--resumes 200000] [--page-size 25] [--repeat 5]
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def fill(db, Resume, resume_count, seed=0, chunk_size=20000):
+    """Insert resume_count synthetic resumes"""
+    rng = random.Random(seed)
+    grades = [('A', 90), ('B', 80), ('C', 70), ('D', 60), ('F', 0)]
+    started = datetime(2020, 1, 1)
+    raw_text = 'Experienced engineer. ' * 150
+
+    for start in range(0, resume_count, chunk_size):
+        rows = []
+        for offset in range(min(chunk_size, resume_count - start)):
+            score = round(rng.uniform(30, 100), 1)
+            rows.append({
+                'filename': f'resume_{start + offset}.pdf',
+                'name': f'Candidate {start + offset}',
+                # Some uploads share a timestamp so the id tie-break matters
+                'upload_date': started + timedelta(seconds=(start + offset) // 3 * 60),
+                'overall_score': score,
+                'grade': next(grade for grade, cutoff in grades if score >= cutoff),
+                'raw_text': raw_text
+            })
+        db.session.execute(Resume.__table__.insert(), rows)
+        db.session.commit()
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def walk(history_page, **filters):
+    """Return the ids of every page forwards, and of every page backwards from the end"""
+    forward, cursor, pages = [], None, []
+    while True:
+        page = history_page(after=cursor, page_size=7, **filters)
+        pages.append(page)
+        forward.extend(row.id for row in page['rows'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    backward, cursor = [], pages[-1]['prev_cursor']
+    while cursor is not None:
+        page = history_page(before=cursor, page_size=7, **filters)
+        backward[:0] = [row.id for row in page['rows']]
+        cursor = page['prev_cursor']
+    return forward, backward + [row.id for row in pages[-1]['rows']]
+
+def check(db, Resume, history_page, HISTORY_SORTS):
+    """Walk every sort order (forwards and backwards, with and without filters) and compare with Python sorts"""
+    rows = db.session.query(Resume.id, Resume.upload_date, Resume.overall_score, Resume.grade).all()
+    sort_keys = {
+        'date': lambda row: (-row.upload_date.timestamp(), -row.id),
+        'score': lambda row: (-row.overall_score, -row.id),
+        'grade': lambda row: (row.grade, -row.overall_score, -row.id),
+    }
+    for sort in HISTORY_SORTS:
+        for reverse in (False, True):
+            for filters in ({}, {'grade': 'B'}, {'min_score': 55, 'max_score': 85}):
+                selected = [row for row in rows
+                            if row.grade == filters.get('grade', row.grade)
+                            and filters.get('min_score', 0) <= row.overall_score <= filters.get('max_score', 100)]
+                expected = [row.id for row in sorted(selected, key=sort_keys[sort], reverse=reverse)]
+                forward, backward = walk(history_page, sort=sort, reverse=reverse, **filters)
+                assert forward == expected, (sort, reverse, filters)
+                assert backward == expected, (sort, reverse, filters)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=200000)
+    parser.add_argument('--page-size', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    directory = tempfile.mkdtemp(prefix='bench_history_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'history.db')}"
+    os.environ.setdefault('TEXT_INDEX_DIR', os.path.join(directory, 'text_index'))
+    from app import app
+    from models import db, Resume
+    from history import history_page, encode_cursor, HISTORY_SORTS
+
+    with app.app_context():
+        fill(db, Resume, 500, seed=1)
+        check(db, Resume, history_page, HISTORY_SORTS)
+        print("pagination walk matches Python sorts for every sort order")
+        db.session.query(Resume).delete()
+        db.session.commit()
+
+        started = time.perf_counter()
+        fill(db, Resume, args.resumes)
+        print(f"resumes: {args.resumes}, filled in {time.perf_counter() - started:.2f}s")
+
+        load_all = best_of(min(args.repeat, 2), lambda: Resume.query.order_by(Resume.upload_date.desc()).all())
+        print(f"old history (all rows and columns): {load_all * 1000:9.1f} ms")
+
+        deep_offset = args.resumes * 9 // 10
+        for sort in HISTORY_SORTS:
+            first = best_of(args.repeat, lambda: history_page(sort=sort, page_size=args.page_size))
+            # A cursor 90% of the way through the history
+            keys = HISTORY_SORTS[sort]
+            columns = [column for column, _ in keys]
+            order = [column.desc() if descending else column.asc() for column, descending in keys]
+            offset_page = lambda: (db.session.query(Resume.id, Resume.name, Resume.filename, Resume.upload_date,
+                                                    Resume.overall_score, Resume.grade)
+                                   .order_by(*order).offset(deep_offset).limit(args.page_size).all())
+            deep_row = db.session.query(*columns).order_by(*order).offset(deep_offset - 1).limit(1).one()
+            cursor = encode_cursor(deep_row, keys)
+            deep = best_of(args.repeat, lambda: history_page(sort=sort, after=cursor, page_size=args.page_size))
+            offset = best_of(args.repeat, offset_page)
+            print(f"sort {sort:5}: first page {first * 1000:7.2f} ms, page at 90% {deep * 1000:7.2f} ms "
+                  f"(OFFSET {offset * 1000:7.2f} ms)")
+
+if __name__ == '__main__':
+    main()
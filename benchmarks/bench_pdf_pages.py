@@ -0,0 +1,66 @@
+"""
+Serial vs. parallel PDF page extraction
+
+Measures extract_text_from_pdf on synthetic documents of increasing length
+with parallel extraction forced off and on, and reports the smallest page
+count at which the process pool wins. Use the result to tune
+PDF_PARALLEL_PAGE_THRESHOLD.
+
+    python -m benchmarks.bench_pdf_pages [--pages 1 2 4 8 16 32 64] [--repeat 3] [--min-speedup 1.1]
+"""
+import argparse
+import logging
+import time
+
+from benchmarks.corpus import build_long_pdf
+import resume_parser
+from resume_parser import extract_text_from_pdf, extract_pdf_pages_parallel
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 2, 4, 8, 12, 16, 24, 32, 48, 64])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--min-speedup', type=float, default=1.1,
+                        help='speedup required to count as a win (filters out timing noise)')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"workers: {resume_parser.PDF_PARALLEL_WORKERS}, "
+          f"current threshold: {resume_parser.PDF_PARALLEL_PAGE_THRESHOLD} pages")
+
+    # Start the pool before timing so worker start-up is not charged to the first document
+    warm_up = build_long_pdf(resume_parser.PDF_PARALLEL_WORKERS)
+    extract_pdf_pages_parallel(warm_up, resume_parser.PDF_PARALLEL_WORKERS)
+
+    speedups = []
+    print(f"{'pages':>6} {'serial ms':>10} {'parallel ms':>12} {'speedup':>8}")
+    for page_count in sorted(args.pages):
+        pdf = build_long_pdf(page_count)
+        serial = best_time(lambda: extract_text_from_pdf(pdf, parallel=False), args.repeat)
+        parallel = best_time(lambda: extract_text_from_pdf(pdf, parallel=True), args.repeat)
+        assert extract_text_from_pdf(pdf, parallel=False) == extract_text_from_pdf(pdf, parallel=True)
+        speedups.append((page_count, serial / parallel))
+        print(f"{page_count:>6} {serial * 1000:>10.1f} {parallel * 1000:>12.1f} {serial / parallel:>7.2f}x")
+
+    # Smallest page count from which the pool wins for every longer document as well
+    crossover = None
+    for page_count, speedup in reversed(speedups):
+        if speedup <= args.min_speedup:
+            break
+        crossover = page_count
+
+    if crossover is None:
+        print("parallel extraction never beat the serial path")
+    else:
+        print(f"crossover: parallel extraction wins from {crossover} pages")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Concurrent resume commits, before and after write-behind persistence
+
+Starts several processes, each saving synthetic resumes from several
+threads at once into a fresh SQLite database, the way concurrent uploads
+do. The old setup commits every resume in its own transaction (and
+refreshes the resume indexes after each one) on a rollback-journal
+database with synchronous=FULL; the new one hands them to the write-behind
+writer, which commits whatever has queued up as one transaction on a WAL
+database with synchronous=NORMAL. Reports rows committed per second and
+saves that failed (e.g. "database is locked").
+
+    python -m benchmarks.bench_persistence [--processes 4] [--threads 8] [--resumes 50]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+SETUPS = {
+    'before': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL'},
+    'after': {'SQLITE_JOURNAL_MODE': 'WAL', 'SQLITE_SYNCHRONOUS': 'NORMAL'},
+}
+
+SKILLS = ['python', 'sql', 'flask', 'docker', 'aws', 'react', 'java', 'kubernetes', 'git', 'linux',
+          'communication', 'leadership', 'teamwork', 'agile', 'pandas']
+
+def synthetic_record(Resume, set_resume_skills, rng, number):
+    """An unsaved resume with realistic text and skill rows"""
+    skills = {'technical': rng.sample(SKILLS[:10], 4), 'soft': rng.sample(SKILLS[10:], 2)}
+    score = round(rng.uniform(30, 100), 1)
+    record = Resume(
+        filename=f'resume_{number}.pdf',
+        name=f'Candidate {number}',
+        raw_text='Experienced engineer. ' * 150,
+        skills=skills,
+        overall_score=score,
+        grade='A' if score >= 90 else 'B' if score >= 80 else 'C'
+    )
+    set_resume_skills(record, skills)
+    return record
+
+def commit_directly(db, record):
+    """The old save_resume_record: one commit, then an index refresh, per resume"""
+    from indexes import refresh_search_indexes
+    db.session.add(record)
+    db.session.commit()
+    refresh_search_indexes()
+    return record.id
+
+def run_process(setup, database_url, text_index_dir, threads, resumes, barrier, results, seed):
+    os.environ.update(SETUPS[setup])
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['TEXT_INDEX_DIR'] = text_index_dir
+    logging.disable(logging.CRITICAL)
+    from app import app
+    from models import db, Resume
+    from persistence import writer
+    from skill_store import set_resume_skills
+
+    counts = {'stored': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def save_resumes(thread_number):
+        rng = random.Random(seed * 1000 + thread_number)
+        with app.app_context():
+            for number in range(resumes):
+                try:
+                    record = synthetic_record(Resume, set_resume_skills, rng, number)
+                    if setup == 'before':
+                        commit_directly(db, record)
+                    else:
+                        writer.save(record)
+                    outcome = 'stored'
+                except Exception:
+                    db.session.rollback()
+                    outcome = 'failed'
+                with lock:
+                    counts[outcome] += 1
+
+    workers = [threading.Thread(target=save_resumes, args=(number,)) for number in range(threads)]
+    barrier.wait()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    writer.shutdown()
+    results.put(counts)
+
+def run_setup(setup, processes, threads, resumes):
+    """Run one setup on a new database; returns (seconds, stored, failed)"""
+    context = multiprocessing.get_context('spawn')
+    directory = tempfile.mkdtemp(prefix=f'bench_persistence_{setup}_')
+    database_url = f"sqlite:///{os.path.join(directory, 'resumes.db')}"
+    text_index_dir = os.path.join(directory, 'text_index')
+
+    # Create the tables (and the journal mode, which SQLite keeps in the file) before the clock starts
+    barrier, results = context.Barrier(1), context.Queue()
+    setup_process = context.Process(target=run_process,
+                                    args=(setup, database_url, text_index_dir, 0, 0, barrier, results, 0))
+    setup_process.start()
+    results.get()
+    setup_process.join()
+
+    barrier, results = context.Barrier(processes + 1), context.Queue()
+    workers = [context.Process(target=run_process,
+                               args=(setup, database_url, text_index_dir, threads, resumes, barrier, results, seed))
+               for seed in range(1, processes + 1)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    counts = [results.get() for _ in workers]
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+    return elapsed, sum(count['stored'] for count in counts), sum(count['failed'] for count in counts)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8, help='concurrent saves per process')
+    parser.add_argument('--resumes', type=int, default=50, help='resumes saved by each thread')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{args.processes} processes x {args.threads} threads x {args.resumes} resumes")
+    rates = {}
+    for setup in SETUPS:
+        elapsed, stored, failed = run_setup(setup, args.processes, args.threads, args.resumes)
+        rates[setup] = stored / elapsed
+        settings = ', '.join(f'{name.split("_", 1)[1].lower()}={value}' for name, value in SETUPS[setup].items())
+        print(f"{setup:6} ({settings}): {stored} stored, {failed} failed in {elapsed:.2f}s "
+              f"({rates[setup]:.0f} rows/s)")
+    print(f"speedup: {rates['after'] / rates['before']:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Ranking stored resumes against a job description with skill bitsets
+
+Fills a SkillBitsetIndex with synthetic resumes (random skill sets drawn
+from the real skills dictionary), then times SkillBitsetIndex.rank against
+matching each resume's skill list one by one, the way analyze_keyword_match
+does. The per-resume loop is timed on a sample and extrapolated.
+
+    python -m benchmarks.bench_skill_rank [--resumes 1000000] [--limit 50] [--repeat 5]
+"""
+import argparse
+import logging
+import random
+import time
+
+import numpy as np
+
+from skill_extractor import skills_registry
+from skill_index import SkillBitsetIndex, WORD_BITS, build_vocabulary
+
+def build_index(vocabulary, resume_count, skills_per_resume=(5, 30), seed=0, chunk_size=100000):
+    """Fill an index with resume_count synthetic resumes; returns (index, sampled skill lists)"""
+    rng = np.random.default_rng(seed)
+    index = SkillBitsetIndex(vocabulary)
+    skills = list(vocabulary)
+    samples = []
+
+    for start in range(0, resume_count, chunk_size):
+        count = min(chunk_size, resume_count - start)
+        rows = np.zeros((count, index.words), dtype=np.uint64)
+        sizes = rng.integers(skills_per_resume[0], skills_per_resume[1] + 1, size=count)
+        positions = rng.integers(0, len(vocabulary), size=int(sizes.sum()))
+        owners = np.repeat(np.arange(count), sizes)
+        # Set one bit per (resume, skill) pair; duplicates just set the same bit again
+        np.bitwise_or.at(rows, (owners, positions // WORD_BITS),
+                         np.left_shift(np.uint64(1), (positions % WORD_BITS).astype(np.uint64)))
+        index.append(np.arange(start + 1, start + count + 1), rows)
+
+        if len(samples) < 20000:
+            offsets = np.concatenate(([0], np.cumsum(sizes)))
+            for row in range(min(count, 20000 - len(samples))):
+                samples.append([skills[p] for p in positions[offsets[row]:offsets[row + 1]]])
+    return index, samples
+
+def keyword_match_loop(samples, job_skills):
+    """The per-resume approach: lowercase lists and `in` checks for every resume"""
+    counts = []
+    for resume_skills in samples:
+        resume_skills_lower = [skill.lower() for skill in resume_skills]
+        counts.append(sum(1 for skill in job_skills if skill.lower() in resume_skills_lower))
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=1000000)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--job-skills', type=int, default=10, help='number of skills in the job description')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    vocabulary = build_vocabulary(skills_registry.get().matcher)
+    job_skills = random.Random(1).sample(list(vocabulary), args.job_skills)
+
+    started = time.perf_counter()
+    index, samples = build_index(vocabulary, args.resumes)
+    build_seconds = time.perf_counter() - started
+    print(f"resumes: {index.size}, vocabulary: {len(vocabulary)} skills, "
+          f"matrix: {index.words} x uint64 per row ({index.size * index.words * 8 / 2**20:.1f} MB), "
+          f"built in {build_seconds:.2f}s")
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        ranking = index.rank(job_skills, args.limit)
+        timings.append(time.perf_counter() - started)
+
+    # Check the ranking against a full sort of the match counts
+    ids, counts = index.match_counts(job_skills)
+    expected = sorted(counts.tolist(), reverse=True)[:args.limit]
+    assert [entry['matched'] for entry in ranking] == [count for count in expected if count > 0]
+
+    started = time.perf_counter()
+    keyword_match_loop(samples, job_skills)
+    loop_seconds = (time.perf_counter() - started) / len(samples) * index.size
+
+    print(f"bitset rank (top {args.limit}): {min(timings) * 1000:.1f} ms")
+    print(f"per-resume keyword loop: {loop_seconds * 1000:.1f} ms (extrapolated from {len(samples)} resumes)")
+    print(f"speedup: {loop_seconds / min(timings):.0f}x")
+
+if __name__ == '__main__':
+    main()
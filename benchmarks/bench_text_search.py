@@ -0,0 +1,65 @@
+"""
+BM25 search over the full text of stored resumes
+
+Builds a text index of synthetic resumes in a temporary directory, then
+times a job description query against the whole index, scoring a single
+new document, and opening the memory-mapped index in a fresh process state.
+
+    python -m benchmarks.bench_text_search [--resumes 100000] [--words 400] [--repeat 5]
+"""
+import argparse
+import logging
+import random
+import tempfile
+import time
+
+import text_index
+from benchmarks.corpus import random_lines
+from text_index import TextIndex
+
+JOB_DESCRIPTION = (
+    "We are hiring a senior engineer to design and build data pipeline services on AWS with Python, "
+    "Docker and Kubernetes, improve latency and throughput, and lead migration and architecture work."
+)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resumes', type=int, default=100000)
+    parser.add_argument('--words', type=int, default=400, help='approximate words per resume')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as index_dir:
+        # Write larger segments while building so the benchmark measures searching, not merging
+        text_index.FLUSH_DOCS = 10000
+        index = TextIndex(index_dir)
+        started = time.perf_counter()
+        for resume_id in range(1, args.resumes + 1):
+            index.add(resume_id, "\n".join(random_lines(rng, args.words // 10)))
+        index.flush()
+        print(f"indexed {index.doc_count} resumes into {len(index.segments)} segments "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        reopened = TextIndex(index_dir)
+        print(f"open (memory-mapped): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = reopened.search(JOB_DESCRIPTION, 50)
+            timings.append(time.perf_counter() - started)
+        print(f"search top 50: {min(timings) * 1000:.1f} ms (best score {results[0]['score']:.4f})")
+
+        document = "\n".join(random_lines(rng, args.words // 10))
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            reopened.score_text(JOB_DESCRIPTION, document)
+            timings.append(time.perf_counter() - started)
+        print(f"score one new document: {min(timings) * 1000:.2f} ms")
+
+if __name__ == '__main__':
+    main()
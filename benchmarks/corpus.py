@@ -0,0 +1,277 @@
+"""
+Deterministic synthetic documents for the benchmarks
+
+Resumes are generated from a seed in configurable sizes and section mixes,
+each with a paired job description, and rendered as TXT, DOCX or PDF. To
+write a corpus to disk:
+
+    python -m benchmarks.corpus --out /tmp/corpus [--count 30] [--seed 0]
+"""
+import argparse
+import io
+import json
+import os
+import random
+
+WORDS = (
+    "led developed managed designed implemented improved built created analyzed delivered "
+    "team project platform service customer data pipeline system release quality process "
+    "python java sql docker kubernetes aws react django terraform agile scrum leadership "
+    "communication reporting budget growth revenue latency throughput migration architecture"
+).split()
+
+def random_lines(rng, count, words_per_line=(6, 14)):
+    """Return deterministic pseudo-random lines of resume-like words"""
+    return [' '.join(rng.choice(WORDS) for _ in range(rng.randint(*words_per_line))).capitalize()
+            for _ in range(count)]
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def build_pdf(pages):
+    """
+    Build a minimal text-only PDF
+
+    Args:
+        pages (list): One list of text lines per page (Latin-1 characters only)
+
+    Returns:
+        bytes: The PDF file
+    """
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>", None]
+    font_id, pages_id = 1, 2
+    page_ids = []
+    for lines in pages:
+        # 14pt leading from the top of a US Letter page; ' moves to the next line and shows text
+        content = "BT /F1 10 Tf 14 TL 40 770 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in lines) + " ET"
+        content = content.encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+                       % (pages_id, font_id, content_id))
+        page_ids.append(len(objects))
+    objects[pages_id - 1] = (b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+                             + b"] /Count %d >>" % len(page_ids))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+    catalog_id = len(objects)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref_offset = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+              % (len(objects) + 1, catalog_id, xref_offset))
+    return out.getvalue()
+
+def build_long_pdf(page_count, lines_per_page=50, seed=0):
+    """Build a deterministic multi-page PDF filled with resume-like text"""
+    rng = random.Random(seed)
+    return build_pdf([random_lines(rng, lines_per_page) for _ in range(page_count)])
+
+def build_docx(lines, table_rows=()):
+    """
+    Build a DOCX file with one paragraph per line
+
+    Args:
+        lines (list): Paragraph texts
+        table_rows (list): Rows of cell texts for a table appended after the paragraphs
+
+    Returns:
+        bytes: The DOCX file
+    """
+    from docx import Document
+
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    if table_rows:
+        table = doc.add_table(rows=len(table_rows), cols=max(len(row) for row in table_rows))
+        for row, cells in zip(table.rows, table_rows):
+            for cell, text in zip(row.cells, cells):
+                cell.text = text
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+def build_long_docx(paragraph_count, seed=0):
+    """Build a deterministic DOCX file with paragraph_count paragraphs of resume-like text"""
+    rng = random.Random(seed)
+    return build_docx(random_lines(rng, paragraph_count))
+
+FIRST_NAMES = ['Alice', 'Brian', 'Chloe', 'Daniel', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas']
+LAST_NAMES = ['Anders', 'Baker', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Garcia', 'Hughes', 'Ito', 'Jensen']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries', 'Wayne Digital']
+TITLES = ['Software Engineer', 'Data Engineer', 'Backend Developer', 'Platform Engineer', 'Analyst']
+
+# Skills from the default skills dictionary, so extraction and keyword matching find them
+SKILLS = [
+    'Python', 'Java', 'JavaScript', 'SQL', 'Go', 'TypeScript', 'React', 'Django', 'Flask', 'Spring',
+    'PostgreSQL', 'MongoDB', 'Redis', 'AWS', 'Azure', 'Docker', 'Kubernetes', 'Terraform', 'Jenkins',
+    'Git', 'Agile', 'Scrum', 'Microservices', 'Machine Learning', 'Data Analysis', 'ETL',
+    'Communication', 'Leadership', 'Teamwork', 'Problem Solving', 'Project Management'
+]
+
+# Experience entries and lines per entry for each resume size
+SIZES = {
+    'small': {'jobs': 2, 'lines_per_job': 3, 'projects': 1},
+    'medium': {'jobs': 4, 'lines_per_job': 5, 'projects': 2},
+    'large': {'jobs': 12, 'lines_per_job': 8, 'projects': 6}
+}
+
+SECTION_MIXES = {
+    'full': ['summary', 'experience', 'education', 'skills', 'projects', 'certifications', 'languages'],
+    'essential': ['summary', 'experience', 'education', 'skills'],
+    'minimal': ['experience', 'education'],
+    'no_summary': ['experience', 'education', 'skills', 'projects']
+}
+
+FILE_TYPES = ['txt', 'docx', 'pdf']
+
+def generate_resume(seed, size='medium', sections=None):
+    """
+    Generate the text of a synthetic resume
+
+    Args:
+        seed (int): Random seed; the same seed always gives the same resume
+        size (str): Key of SIZES
+        sections (list): Sections to include, in order (default SECTION_MIXES['full'])
+
+    Returns:
+        dict: 'lines' of text and the 'skills' it mentions
+    """
+    rng = random.Random(seed)
+    shape = SIZES[size]
+    sections = SECTION_MIXES['full'] if sections is None else sections
+    skills = rng.sample(SKILLS, rng.randint(6, 14))
+
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [f"{first} {last}", f"{first.lower()}.{last.lower()}@example.com",
+             f"+1 (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}", ""]
+
+    for section in sections:
+        if section == 'summary':
+            lines += ["PROFESSIONAL SUMMARY",
+                      f"{rng.choice(TITLES)} with experience in {', '.join(skills[:3])}. "
+                      + random_lines(rng, 1)[0] + "."]
+        elif section == 'experience':
+            lines.append("EXPERIENCE")
+            year = 2024
+            for _ in range(shape['jobs']):
+                start = year - rng.randint(1, 4)
+                lines += [f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)}", f"{start} - {year}"]
+                for line in random_lines(rng, shape['lines_per_job']):
+                    lines.append(f"{line} using {rng.choice(skills)}.")
+                lines.append("")
+                year = start
+        elif section == 'education':
+            lines += ["EDUCATION", "Bachelor of Science in Computer Science",
+                      f"State University {year - 4} - {year}" if 'experience' in sections else "State University 2010 - 2014"]
+        elif section == 'skills':
+            lines += ["SKILLS", ", ".join(skills)]
+        elif section == 'projects':
+            lines.append("PROJECTS")
+            for number in range(shape['projects']):
+                lines += [f"Project {number + 1} ({rng.randint(2015, 2024)})",
+                          f"{random_lines(rng, 1)[0]} with {rng.choice(skills)}."]
+        elif section == 'certifications':
+            lines += ["CERTIFICATIONS", "- AWS Certified Solutions Architect"]
+        elif section == 'languages':
+            lines += ["LANGUAGES", "English, Spanish"]
+        lines.append("")
+
+    return {'lines': lines, 'skills': skills}
+
+def generate_job_description(seed, resume_skills, overlap=0.5):
+    """
+    Generate a job description sharing about `overlap` of its skills with a resume
+
+    Returns:
+        str: Job description text
+    """
+    rng = random.Random(seed)
+    wanted = rng.randint(6, 12)
+    shared = rng.sample(resume_skills, min(len(resume_skills), round(wanted * overlap)))
+    others = rng.sample([skill for skill in SKILLS if skill not in resume_skills], wanted - len(shared))
+    required = shared + others
+    rng.shuffle(required)
+    return (f"We are hiring a {rng.choice(TITLES)} at {rng.choice(COMPANIES)}.\n"
+            f"Requirements: {', '.join(required[:len(required) // 2 + 1])}.\n"
+            f"Nice to have: {', '.join(required[len(required) // 2 + 1:])}.\n"
+            + " ".join(random_lines(rng, 3)) + ".")
+
+def render_resume(lines, file_type, lines_per_page=50):
+    """Render resume lines as the bytes of a TXT, DOCX or PDF file"""
+    if file_type == 'txt':
+        return "\n".join(lines).encode('utf-8')
+    if file_type == 'docx':
+        return build_docx(lines)
+    if file_type == 'pdf':
+        return build_pdf([lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)])
+    raise ValueError(f"Unsupported file type: {file_type}")
+
+def generate_corpus(count=30, seed=0, sizes=None, mixes=None, file_types=None):
+    """
+    Generate a deterministic corpus cycling through sizes, section mixes and file types
+
+    Args:
+        count (int): Number of resumes
+        seed (int): Base random seed
+        sizes (list): Keys of SIZES (default all)
+        mixes (list): Keys of SECTION_MIXES (default all)
+        file_types (list): Formats to render (default FILE_TYPES)
+
+    Returns:
+        list: Dicts with name, file_type, size, mix, data (file bytes), text and job_description
+    """
+    sizes = sizes or list(SIZES)
+    mixes = mixes or list(SECTION_MIXES)
+    file_types = file_types or FILE_TYPES
+
+    corpus = []
+    for number in range(count):
+        size = sizes[number % len(sizes)]
+        mix = mixes[(number // len(sizes)) % len(mixes)]
+        # Offset by the size cycle so every size appears in every format
+        file_type = file_types[(number + number // len(sizes)) % len(file_types)]
+        resume = generate_resume(seed * 100003 + number, size, SECTION_MIXES[mix])
+        corpus.append({
+            'name': f"resume_{number:04d}_{size}_{mix}.{file_type}",
+            'file_type': file_type,
+            'size': size,
+            'mix': mix,
+            'data': render_resume(resume['lines'], file_type),
+            'text': "\n".join(resume['lines']),
+            'job_description': generate_job_description(seed * 100003 + number, resume['skills'])
+        })
+    return corpus
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True, help='directory to write the corpus to')
+    parser.add_argument('--count', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    manifest = []
+    for document in generate_corpus(args.count, args.seed):
+        with open(os.path.join(args.out, document['name']), 'wb') as f:
+            f.write(document['data'])
+        job_file = document['name'].rsplit('.', 1)[0] + '.jd.txt'
+        with open(os.path.join(args.out, job_file), 'w') as f:
+            f.write(document['job_description'])
+        manifest.append({key: document[key] for key in ('name', 'file_type', 'size', 'mix')}
+                        | {'job_description': job_file})
+    with open(os.path.join(args.out, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Wrote {len(manifest)} resumes to {args.out}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Latency, throughput and memory of the public parsing, skill and analysis functions
+
+Generates a deterministic corpus (benchmarks/corpus.py), then runs every
+public function of resume_parser, skill_extractor and analyzer over it.
+For each function it reports the mean, median and 95th percentile latency
+per call, calls per second, and the peak Python memory of one pass
+(tracemalloc).
+
+Results are compared against a JSON baseline. The run fails (exit status
+1) when a function's mean latency or peak memory grew by more than the
+threshold. Baselines depend on the machine, so record one on the machine
+that runs the comparison:
+
+    python -m benchmarks.run --update            # record benchmarks/baseline.json
+    python -m benchmarks.run                     # compare against it
+    python -m benchmarks.run --only analyzer. --threshold 0.3
+"""
+import argparse
+import inspect
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import analyzer
+import resume_parser
+import skill_extractor
+from benchmarks.corpus import generate_corpus
+
+MODULES = [resume_parser, skill_extractor, analyzer]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+def _consume(iterator):
+    """Run a generator to the end, as a caller joining its chunks would"""
+    return sum(len(chunk) for chunk in iterator)
+
+def _pdf_page_count(data):
+    import pdfplumber
+    with pdfplumber.open(resume_parser.open_source(data)) as pdf:
+        return len(pdf.pages)
+
+def build_inputs(document):
+    """Prepare everything the cases need for one corpus document, outside the timed calls"""
+    data, file_type = document['data'], document['file_type']
+    resume_data = resume_parser.parse_resume(data, file_type)
+    text = resume_data['raw_text']
+    skills = skill_extractor.extract_skills(resume_data)
+    analyzed = dict(resume_data, skills=skills)
+    job_description = document['job_description']
+    analysis = analyzer.analyze_resume(analyzed, job_description)
+    scores = analyzer.score_resume(resume_data, analysis, job_description)
+    dictionary = skill_extractor.load_skills_dictionary()
+    return {
+        'data': data,
+        'file_type': file_type,
+        'pages': _pdf_page_count(data) if file_type == 'pdf' else None,
+        'text': text,
+        'index': resume_parser.SectionIndex(text),
+        'resume_data': resume_data,
+        'analyzed': analyzed,
+        'skills': skills,
+        'job_description': job_description,
+        'job_skills': skill_extractor.extract_skills_from_job_description(job_description),
+        'analysis': analysis,
+        'scores': scores,
+        'stats': analyzer.document_token_stats(resume_data),
+        'dictionary': dictionary
+    }
+
+# Function name -> (file types it applies to, or None for all; call on the prepared inputs)
+CASES = {
+    # resume_parser
+    'resume_parser.parse_resume': (None, lambda d: resume_parser.parse_resume(d['data'], d['file_type'])),
+    'resume_parser.extract_document_text': (None, lambda d: resume_parser.extract_document_text(d['data'], d['file_type'])),
+    'resume_parser.iter_document_text': (None, lambda d: _consume(resume_parser.iter_document_text(d['data'], d['file_type']))),
+    'resume_parser.collect_text': (None, lambda d: resume_parser.collect_text(resume_parser.iter_document_text(d['data'], d['file_type']))),
+    'resume_parser.peek_contact_info': (None, lambda d: resume_parser.peek_contact_info(d['data'], d['file_type'])),
+    'resume_parser.describe_source': (None, lambda d: resume_parser.describe_source(d['data'])),
+    'resume_parser.open_source': (None, lambda d: resume_parser.open_source(d['data'])),
+    'resume_parser.extract_text_from_pdf': (['pdf'], lambda d: resume_parser.extract_text_from_pdf(d['data'])),
+    'resume_parser.iter_pdf_pages': (['pdf'], lambda d: _consume(resume_parser.iter_pdf_pages(d['data']))),
+    'resume_parser.extract_pdf_pages_parallel': (['pdf'], lambda d: resume_parser.extract_pdf_pages_parallel(d['data'], d['pages'])),
+    'resume_parser.iter_pdf_pages_parallel': (['pdf'], lambda d: _consume(resume_parser.iter_pdf_pages_parallel(d['data'], d['pages']))),
+    'resume_parser.extract_text_from_docx': (['docx'], lambda d: resume_parser.extract_text_from_docx(d['data'])),
+    'resume_parser.iter_docx_paragraphs': (['docx'], lambda d: _consume(resume_parser.iter_docx_paragraphs(d['data']))),
+    'resume_parser.extract_text_from_txt': (['txt'], lambda d: resume_parser.extract_text_from_txt(d['data'])),
+    'resume_parser.iter_txt_lines': (['txt'], lambda d: _consume(resume_parser.iter_txt_lines(d['data']))),
+    'resume_parser.extract_resume_data': (None, lambda d: resume_parser.extract_resume_data(d['text'])),
+    'resume_parser.extract_name': (None, lambda d: resume_parser.extract_name(d['text'])),
+    'resume_parser.extract_email': (None, lambda d: resume_parser.extract_email(d['text'])),
+    'resume_parser.extract_phone': (None, lambda d: resume_parser.extract_phone(d['text'])),
+    'resume_parser.extract_education': (None, lambda d: resume_parser.extract_education(d['text'], d['index'])),
+    'resume_parser.extract_experience': (None, lambda d: resume_parser.extract_experience(d['text'], d['index'])),
+    'resume_parser.extract_skills_from_text': (None, lambda d: resume_parser.extract_skills_from_text(d['text'], d['index'])),
+    'resume_parser.extract_projects': (None, lambda d: resume_parser.extract_projects(d['text'], d['index'])),
+    'resume_parser.extract_certifications': (None, lambda d: resume_parser.extract_certifications(d['text'], d['index'])),
+    'resume_parser.extract_languages': (None, lambda d: resume_parser.extract_languages(d['text'], d['index'])),
+    'resume_parser.extract_section': (None, lambda d: resume_parser.extract_section(d['text'], resume_parser.SECTION_HEADERS['experience'], d['index'])),
+    'resume_parser.identify_sections': (None, lambda d: resume_parser.identify_sections(d['text'], d['index'])),
+    # skill_extractor
+    'skill_extractor.load_skills_dictionary': (None, lambda d: skill_extractor.load_skills_dictionary()),
+    'skill_extractor.get_skills_dictionary_version': (None, lambda d: skill_extractor.get_skills_dictionary_version()),
+    'skill_extractor.generate_default_skills_dictionary': (None, lambda d: skill_extractor.generate_default_skills_dictionary()),
+    'skill_extractor.get_skill_matcher': (None, lambda d: skill_extractor.get_skill_matcher()),
+    'skill_extractor.extract_skills': (None, lambda d: skill_extractor.extract_skills(d['resume_data'])),
+    'skill_extractor.extract_technical_skills': (None, lambda d: skill_extractor.extract_technical_skills(d['text'], d['dictionary']['technical'])),
+    'skill_extractor.extract_soft_skills': (None, lambda d: skill_extractor.extract_soft_skills(d['text'], d['dictionary']['soft'])),
+    'skill_extractor.extract_industry_skills': (None, lambda d: skill_extractor.extract_industry_skills(d['text'], d['dictionary']['industry_specific'])),
+    'skill_extractor.extract_skills_from_job_description': (None, lambda d: skill_extractor.extract_skills_from_job_description(d['job_description'])),
+    # analyzer
+    'analyzer.analyze_resume': (None, lambda d: analyzer.analyze_resume(d['analyzed'], d['job_description'], d['job_skills'])),
+    'analyzer.document_token_stats': (None, lambda d: analyzer.document_token_stats(d['resume_data'])),
+    'analyzer.summary_section_text': (None, lambda d: analyzer.summary_section_text(d['resume_data'])),
+    'analyzer.analyze_sections': (None, lambda d: analyzer.analyze_sections(d['resume_data'])),
+    'analyzer.analyze_word_count': (None, lambda d: analyzer.analyze_word_count(d['resume_data'], d['stats'])),
+    'analyzer.analyze_action_verbs': (None, lambda d: analyzer.analyze_action_verbs(d['resume_data'], d['stats'])),
+    'analyzer.analyze_keyword_match': (None, lambda d: analyzer.analyze_keyword_match(d['analyzed'], d['job_description'], d['job_skills'])),
+    'analyzer.flatten_skills': (None, lambda d: analyzer.flatten_skills(d['skills'])),
+    'analyzer.identify_common_issues': (None, lambda d: analyzer.identify_common_issues(d['resume_data'], d['stats'])),
+    'analyzer.score_resume': (None, lambda d: analyzer.score_resume(d['resume_data'], d['analysis'], d['job_description'])),
+    'analyzer.generate_suggestions': (None, lambda d: analyzer.generate_suggestions(d['resume_data'], d['analysis'], d['scores'], d['job_description'])),
+}
+
+def public_functions(modules=MODULES):
+    """Return 'module.function' for every public function defined in the modules"""
+    names = []
+    for module in modules:
+        for name, value in inspect.getmembers(module, inspect.isfunction):
+            if not name.startswith('_') and value.__module__ == module.__name__:
+                names.append(f"{module.__name__}.{name}")
+    return names
+
+def measure(func, inputs, repeat):
+    """
+    Time func over every input `repeat` times, then trace one more pass for memory
+
+    Each input keeps its fastest time over the repeats, which filters out
+    interruptions from other processes on a busy machine.
+
+    Returns:
+        dict: Mean and percentile latencies (ms), calls per second and peak memory (KiB)
+    """
+    best = [float('inf')] * len(inputs)
+    for _ in range(repeat):
+        for position, item in enumerate(inputs):
+            started = time.perf_counter()
+            func(item)
+            best[position] = min(best[position], time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            func(item)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies = sorted(best)
+    total = sum(latencies)
+    return {
+        'calls': len(latencies),
+        'mean_ms': round(total / len(latencies) * 1000, 4),
+        'p50_ms': round(statistics.median(latencies) * 1000, 4),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 4),
+        'throughput_per_s': round(len(latencies) / max(total, 1e-9), 1),
+        'peak_kib': round(peak / 1024, 1)
+    }
+
+def compare(results, baseline, threshold, memory_threshold, min_delta_ms, min_delta_kib):
+    """
+    Return the regressions of results against a baseline
+
+    A function regresses when its mean latency grew by more than threshold
+    (and by at least min_delta_ms, so timer noise on microsecond calls is
+    ignored) or its peak memory grew by more than memory_threshold (and by
+    at least min_delta_kib).
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if (result['mean_ms'] > previous['mean_ms'] * (1 + threshold)
+                and result['mean_ms'] - previous['mean_ms'] >= min_delta_ms):
+            regressions.append(f"{name}: mean {previous['mean_ms']} ms -> {result['mean_ms']} ms")
+        if (result['peak_kib'] > previous['peak_kib'] * (1 + memory_threshold)
+                and result['peak_kib'] - previous['peak_kib'] >= min_delta_kib):
+            regressions.append(f"{name}: peak memory {previous['peak_kib']} KiB -> {result['peak_kib']} KiB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--update', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed mean latency growth (fraction)')
+    parser.add_argument('--memory-threshold', type=float, default=0.25, help='allowed peak memory growth (fraction)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help='ignore latency growth below this')
+    parser.add_argument('--min-delta-kib', type=float, default=64, help='ignore peak memory growth below this')
+    parser.add_argument('--count', type=int, default=12, help='resumes in the corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', default='', help='only run functions whose name starts with this')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    missing = [name for name in public_functions() if name not in CASES]
+    if missing:
+        print(f"no benchmark case for: {', '.join(missing)}")
+
+    corpus = generate_corpus(args.count, args.seed)
+    inputs = [build_inputs(document) for document in corpus]
+
+    results = {}
+    for name, (file_types, func) in CASES.items():
+        if not name.startswith(args.only):
+            continue
+        applicable = [item for item in inputs if file_types is None or item['file_type'] in file_types]
+        func(applicable[0])  # warm up lazily built caches and pools
+        results[name] = measure(func, applicable, args.repeat)
+        result = results[name]
+        print(f"{name:55} mean {result['mean_ms']:9.3f} ms  p50 {result['p50_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms  "
+              f"{result['throughput_per_s']:10.1f}/s  peak {result['peak_kib']:9.1f} KiB")
+
+    report = {
+        'environment': {'python': platform.python_version(), 'machine': platform.machine(),
+                        'cpus': os.cpu_count(), 'corpus': {'count': args.count, 'seed': args.seed}},
+        'results': results
+    }
+
+    if args.update:
+        if os.path.exists(args.baseline):
+            # Keep entries of functions this run skipped (e.g. with --only)
+            with open(args.baseline) as f:
+                report['results'] = dict(json.load(f)['results'], **results)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update to record one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['environment'].get('corpus') != report['environment']['corpus']:
+        print("warning: baseline was recorded on a different corpus")
+
+    regressions = compare(results, baseline['results'], args.threshold, args.memory_threshold,
+                          args.min_delta_ms, args.min_delta_kib)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print(f"no regressions against {args.baseline}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,285 @@
+import io
+import os
+import base64
+import binascii
+import logging
+import zipfile
+from concurrent.futures import wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from sqlalchemy.exc import SQLAlchemyError
+from models import db
+from parse_cache import read_upload
+from pipeline import build_resume_record, analysis_payload
+from jobs import job_queue, analyze_upload, merge_worker_metrics
+from indexes import refresh_search_indexes
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+BULK_EXTENSIONS = {'pdf', 'docx', 'txt'}
+
+# Most resumes accepted in one bulk upload, counting every archive member
+MAX_BULK_FILES = int(os.environ.get('MAX_BULK_FILES', 1000))
+
+# Largest single resume accepted, inside an archive or not (same as a single upload)
+MAX_MEMBER_BYTES = 16 * 1024 * 1024
+
+# Resume rows written per commit
+BULK_COMMIT_SIZE = int(os.environ.get('BULK_COMMIT_SIZE', 50))
+
+# Uploads handed to each pool worker ahead of time; bounds how many files are held in memory
+BULK_QUEUE_DEPTH = 2
+
+def file_extension(filename):
+    """Return the lowercased extension of a file name, or '' if it has none"""
+    return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+
+def iter_bulk_members(files, max_files=MAX_BULK_FILES):
+    """
+    Read the resumes in uploaded files one at a time, opening zip archives in place
+
+    Archive members are decompressed straight from the upload stream into
+    memory, one member at a time; nothing is extracted to disk.
+
+    Args:
+        files (list): Uploaded files (werkzeug FileStorage), resumes or zip archives
+        max_files (int): Most resumes to read
+
+    Yields:
+        dict: filename and either file_type, data and content_hash, or error
+    """
+    count = 0
+    for storage in files:
+        if not storage.filename:
+            continue
+        if file_extension(storage.filename) == 'zip':
+            members = _iter_zip_members(storage)
+        else:
+            members = [_read_member(storage.filename, storage.stream, None)]
+
+        for member in members:
+            count += 1
+            if count > max_files:
+                yield {'filename': member['filename'], 'error': f'Too many files; at most {max_files} are accepted'}
+                return
+            yield member
+
+def iter_encoded_members(documents, max_files=MAX_BULK_FILES):
+    """
+    Read resumes sent inline as base64, as in JSON API requests
+
+    Args:
+        documents (list): Dicts with filename and content (base64-encoded file bytes)
+        max_files (int): Most resumes to read
+
+    Yields:
+        dict: filename and either file_type, data and content_hash, or error
+    """
+    for count, document in enumerate(documents, 1):
+        if not isinstance(document, dict):
+            yield {'filename': None, 'error': 'Each document must be an object with filename and content'}
+            continue
+        filename = str(document.get('filename') or '')
+        if count > max_files:
+            yield {'filename': filename, 'error': f'Too many files; at most {max_files} are accepted'}
+            return
+        try:
+            data = base64.b64decode(document.get('content') or '', validate=True)
+        except (binascii.Error, TypeError, ValueError):
+            yield {'filename': filename, 'error': 'content is not valid base64'}
+            continue
+        if not data:
+            yield {'filename': filename, 'error': 'content is empty'}
+            continue
+        yield _read_member(filename, io.BytesIO(data), len(data))
+
+def _iter_zip_members(storage):
+    try:
+        archive = zipfile.ZipFile(storage.stream)
+    except (zipfile.BadZipFile, OSError) as e:
+        yield {'filename': storage.filename, 'error': f'Not a valid zip archive: {str(e)}'}
+        return
+
+    with archive:
+        for info in archive.infolist():
+            basename = info.filename.rsplit('/', 1)[-1]
+            # Skip directories and the metadata files archivers add
+            if info.is_dir() or not basename or basename.startswith('.') or info.filename.startswith('__MACOSX/'):
+                continue
+            name = f'{storage.filename}/{info.filename}'
+            if info.flag_bits & 0x1:
+                yield {'filename': name, 'error': 'Encrypted archive members are not supported'}
+                continue
+            try:
+                with archive.open(info) as stream:
+                    yield _read_member(name, stream, info.file_size)
+            except (zipfile.BadZipFile, NotImplementedError, OSError, EOFError) as e:
+                yield {'filename': name, 'error': f'Could not read archive member: {str(e)}'}
+
+def _read_member(name, stream, size):
+    file_type = file_extension(name)
+    if file_type not in BULK_EXTENSIONS:
+        return {'filename': name, 'error': 'File type not allowed. Please upload PDF, DOCX, or TXT files.'}
+    # Archive members declare their size; zipfile never inflates one past it
+    if size is not None and size > MAX_MEMBER_BYTES:
+        return {'filename': name, 'error': f'File is larger than {MAX_MEMBER_BYTES // (1024 * 1024)}MB'}
+
+    data, content_hash = read_upload(stream)
+    if len(data) > MAX_MEMBER_BYTES:
+        return {'filename': name, 'error': f'File is larger than {MAX_MEMBER_BYTES // (1024 * 1024)}MB'}
+    return {'filename': name, 'file_type': file_type, 'data': data, 'content_hash': content_hash}
+
+def iter_bulk_results(members, job_description='', job_skills=None, commit_size=BULK_COMMIT_SIZE,
+                      store=True, details=False, include_text=False):
+    """
+    Analyze many resumes in the job process pool, yielding each result as soon as it is ready
+
+    Results come in completion order; a stored result is yielded once its
+    batch is committed. A failing file is reported and the rest carry on.
+
+    Args:
+        members (iterable): Resumes as yielded by iter_bulk_members
+        job_description (str): Job description every resume is matched against
+        job_skills (list): Skills already extracted from the job description (optional)
+        commit_size (int): Resume rows written per commit
+        store (bool): Save the resumes to the database
+        details (bool): Add the full analysis (see analysis_payload) to each result
+        include_text (bool): Keep the raw text in the full analysis
+
+    Yields:
+        dict: index (position in members), filename and either error, or
+            overall_score, grade and resume_id (when stored)
+    """
+    unsaved = []
+    in_flight = {}
+    stored = 0
+    pool = job_queue.executor()
+    depth = max(1, job_queue.workers * BULK_QUEUE_DEPTH)
+
+    def finish(futures):
+        """Turn finished futures into results, returning those ready to be yielded"""
+        nonlocal stored
+        ready = []
+        for future in futures:
+            entry, file_type = in_flight.pop(future)
+            try:
+                outcome = future.result()
+            except BrokenProcessPool as e:
+                job_queue.reset_executor()
+                entry['error'] = f'Worker failed: {str(e)}'
+                ready.append(entry)
+                continue
+            except Exception as e:
+                entry['error'] = str(e)
+                ready.append(entry)
+                continue
+
+            merge_worker_metrics(outcome, file_type)
+            if outcome['status'] != 'done':
+                entry['error'] = outcome['error']
+                ready.append(entry)
+                continue
+
+            entry['overall_score'] = outcome['result']['scores'].get('overall')
+            entry['grade'] = outcome['result']['scores'].get('grade')
+            if details:
+                entry.update(analysis_payload(outcome['resume_data'], outcome['result'],
+                                              outcome['cache_hit'], include_text))
+            if not store:
+                ready.append(entry)
+                continue
+            record = build_resume_record(entry['filename'], outcome['resume_data'], job_description, outcome['result'])
+            unsaved.append((entry, record))
+            if len(unsaved) >= commit_size:
+                stored += _commit_records(unsaved, ready)
+        return ready
+
+    try:
+        for index, member in enumerate(members):
+            entry = {'index': index, 'filename': member['filename']}
+            if 'error' in member:
+                entry['error'] = member['error']
+                yield entry
+                continue
+
+            try:
+                future = pool.submit(analyze_upload, member['data'], member['content_hash'], member['file_type'],
+                                     member['filename'], job_description, job_skills)
+            except BrokenProcessPool:
+                # A worker died while earlier files were running; start a new pool for the rest
+                job_queue.reset_executor()
+                pool = job_queue.executor()
+                future = pool.submit(analyze_upload, member['data'], member['content_hash'], member['file_type'],
+                                     member['filename'], job_description, job_skills)
+            in_flight[future] = (entry, member['file_type'])
+
+            if len(in_flight) >= depth:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from finish(done)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from finish(done)
+        ready = []
+        stored += _commit_records(unsaved, ready)
+        yield from ready
+    finally:
+        # The consumer may stop early (e.g. a client disconnecting); drop the files not started yet
+        for future in in_flight:
+            future.cancel()
+        stored += _commit_records(unsaved, [])
+        if stored:
+            refresh_search_indexes()
+
+def process_bulk_upload(members, job_description='', job_skills=None, commit_size=BULK_COMMIT_SIZE):
+    """
+    Analyze many resumes in the job process pool and store them in batched commits
+
+    A failing file is reported and the rest of the batch carries on.
+
+    Args:
+        members (iterable): Resumes as yielded by iter_bulk_members
+        job_description (str): Job description every resume is matched against
+        job_skills (list): Skills already extracted from the job description (optional)
+        commit_size (int): Resume rows written per commit
+
+    Returns:
+        dict: total, stored and failed counts, and one entry per file in upload
+            order with its filename and either resume_id, overall_score and
+            grade, or error
+    """
+    files = sorted(iter_bulk_results(members, job_description, job_skills, commit_size),
+                   key=lambda entry: entry.pop('index'))
+    stored = sum(1 for entry in files if 'resume_id' in entry)
+
+    logger.debug(f"Bulk upload stored {stored} of {len(files)} resumes")
+    return {
+        'total': len(files),
+        'stored': stored,
+        'failed': len(files) - stored,
+        'files': files
+    }
+
+def _commit_records(unsaved, ready):
+    """Commit the unsaved (entry, record) pairs, moving their entries to ready; returns the number stored"""
+    if not unsaved:
+        return 0
+    stored = 0
+    try:
+        db.session.add_all(record for _, record in unsaved)
+        # Read the IDs before the commit expires the rows, which would reload each one
+        db.session.flush()
+        resume_ids = [record.id for _, record in unsaved]
+        db.session.commit()
+        for (entry, _), resume_id in zip(unsaved, resume_ids):
+            entry['resume_id'] = resume_id
+        stored = len(unsaved)
+    except SQLAlchemyError as e:
+        logger.error(f"Error saving bulk upload batch: {str(e)}")
+        db.session.rollback()
+        for entry, _ in unsaved:
+            entry['error'] = f'Error saving to database: {str(e)}'
+    ready.extend(entry for entry, _ in unsaved)
+    unsaved.clear()
+    return stored
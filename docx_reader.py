@@ -0,0 +1,137 @@
+import re
+import zipfile
+import logging
+import xml.etree.ElementTree as ET
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+WORD_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+MARKUP_COMPATIBILITY_NAMESPACE = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+
+def _w(tag):
+    return f'{{{WORD_NAMESPACE}}}{tag}'
+
+PARAGRAPH = _w('p')
+RUN = _w('r')
+TEXT = _w('t')
+BREAK = _w('br')
+BREAK_TYPE = _w('type')
+BODY = _w('body')
+HEADER = _w('hdr')
+FOOTER = _w('ftr')
+
+# Run content that maps to a single character, as python-docx renders it.
+# Only counted inside runs: w:tab also marks tab stops in paragraph properties.
+RUN_CHARACTERS = {
+    _w('tab'): '\t',
+    _w('ptab'): '\t',
+    _w('cr'): '\n',
+    _w('noBreakHyphen'): '-'
+}
+
+# Word stores text boxes twice: as DrawingML and again as a VML fallback
+FALLBACK = f'{{{MARKUP_COMPATIBILITY_NAMESPACE}}}Fallback'
+
+DOCUMENT_PART = 'word/document.xml'
+HEADER_PART_PATTERN = re.compile(r'word/header(\d*)\.xml$')
+FOOTER_PART_PATTERN = re.compile(r'word/footer(\d*)\.xml$')
+
+def iter_docx_text(source):
+    """
+    Yield the text of a DOCX file one paragraph at a time
+
+    Reads the XML parts straight from the zip archive with an incremental
+    parser, so memory use does not grow with the size of the document. Body
+    paragraphs, table cells and text boxes are yielded in document order,
+    preceded by the page headers and followed by the page footers; identical
+    headers or footers (e.g. first page and default) are only yielded once.
+
+    Args:
+        source: Path or binary file object of the DOCX file
+
+    Yields:
+        str: Paragraph text followed by a newline
+    """
+    with zipfile.ZipFile(source) as archive:
+        names = archive.namelist()
+        if DOCUMENT_PART not in names:
+            raise ValueError("Not a Word document: word/document.xml is missing")
+
+        seen_parts = set()
+        for part in _numbered_parts(names, HEADER_PART_PATTERN):
+            yield from _iter_unique_part(archive, part, seen_parts)
+        yield from _iter_part_paragraphs(archive, DOCUMENT_PART)
+        for part in _numbered_parts(names, FOOTER_PART_PATTERN):
+            yield from _iter_unique_part(archive, part, seen_parts)
+
+def _numbered_parts(names, pattern):
+    """Return the archive members matching pattern, ordered by their part number"""
+    numbered = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            numbered.append((int(match.group(1) or 0), name))
+    return [name for _, name in sorted(numbered)]
+
+def _iter_unique_part(archive, part, seen_parts):
+    # Headers and footers are small; buffer them to drop repeats
+    paragraphs = list(_iter_part_paragraphs(archive, part))
+    key = tuple(paragraphs)
+    if any(paragraph.strip() for paragraph in paragraphs) and key not in seen_parts:
+        seen_parts.add(key)
+        yield from paragraphs
+
+def _iter_part_paragraphs(archive, part):
+    """
+    Yield the paragraph texts of one XML part
+
+    A paragraph is yielded when it closes, so a text box anchored inside a
+    paragraph is yielded just before the paragraph that contains it.
+    """
+    open_paragraphs = []
+    run_depth = 0
+    fallback_depth = 0
+    depth = 0
+    # Body (or header/footer root) and its depth; its finished children are dropped to keep memory flat
+    container = None
+    container_depth = None
+
+    with archive.open(part) as xml_file:
+        for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                depth += 1
+                if tag == PARAGRAPH:
+                    open_paragraphs.append([])
+                elif tag == RUN:
+                    run_depth += 1
+                elif tag == FALLBACK:
+                    fallback_depth += 1
+                elif tag in (BODY, HEADER, FOOTER):
+                    container, container_depth = elem, depth
+                continue
+
+            depth -= 1
+            if tag == PARAGRAPH:
+                text = "".join(open_paragraphs.pop())
+                if not fallback_depth:
+                    yield text + "\n"
+            elif tag == RUN:
+                run_depth -= 1
+            elif tag == FALLBACK:
+                fallback_depth -= 1
+            elif run_depth and open_paragraphs and not fallback_depth:
+                if tag == TEXT:
+                    open_paragraphs[-1].append(elem.text or "")
+                elif tag in RUN_CHARACTERS:
+                    open_paragraphs[-1].append(RUN_CHARACTERS[tag])
+                elif tag == BREAK and elem.get(BREAK_TYPE, 'textWrapping') == 'textWrapping':
+                    # Page and column breaks carry no text
+                    open_paragraphs[-1].append("\n")
+
+            # Drop finished top-level blocks (paragraphs, tables) from the tree. The parser
+            # reads ahead, so a few later siblings may already be attached after this one.
+            if depth == container_depth:
+                container.remove(elem)
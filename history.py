@@ -0,0 +1,214 @@
+import json
+import base64
+import binascii
+import logging
+from datetime import datetime
+from sqlalchemy import func, tuple_
+from models import db, Resume
+from scoring import get_scoring_profile
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+HISTORY_PAGE_SIZE = 25
+MAX_HISTORY_PAGE_SIZE = 100
+
+# Columns the history page shows; raw text, the job description and the JSON analyses stay unloaded
+HISTORY_COLUMNS = [Resume.id, Resume.name, Resume.filename, Resume.upload_date, Resume.overall_score, Resume.grade]
+
+# Sort orders as (column, descending) keys, each ending in the id so every row has a unique position.
+# Each matches one of the indexes declared on Resume, with or without a grade filter. The grade
+# sort is read one grade at a time, so the keys after the grade share one direction. Rows with
+# no date, score or grade come after the others (before them when the order is reversed).
+HISTORY_SORTS = {
+    'date': [(Resume.upload_date, True), (Resume.id, True)],
+    'score': [(Resume.overall_score, True), (Resume.id, True)],
+    'grade': [(Resume.grade, False), (Resume.overall_score, True), (Resume.id, True)],
+}
+
+class InvalidCursorError(ValueError):
+    """Raised when a page cursor cannot be decoded"""
+
+def history_page(sort='date', reverse=False, grade=None, min_score=None, max_score=None,
+                 after=None, before=None, page_size=HISTORY_PAGE_SIZE):
+    """
+    Return one page of the resume history using keyset pagination
+
+    Pages are located by the sort key of the row next to them rather than by
+    an offset, so every page costs one index range scan of page_size rows,
+    however long the history is.
+
+    Args:
+        sort (str): Sort order, a key of HISTORY_SORTS
+        reverse (bool): Reverse the sort order
+        grade (str): Only resumes with this grade (optional)
+        min_score (float): Only resumes scoring at least this (optional)
+        max_score (float): Only resumes scoring at most this (optional)
+        after (str): Cursor of the row before the page, from a previous page's next_cursor
+        before (str): Cursor of the row after the page, from a previous page's prev_cursor
+        page_size (int): Rows per page
+
+    Returns:
+        dict: rows (named tuples of HISTORY_COLUMNS), next_cursor and
+            prev_cursor (None at either end)
+
+    Raises:
+        InvalidCursorError: If a cursor is malformed or belongs to another sort order
+    """
+    keys = HISTORY_SORTS[sort]
+    if reverse:
+        keys = [(column, not descending) for column, descending in keys]
+    page_size = max(1, min(page_size, MAX_HISTORY_PAGE_SIZE))
+
+    query = db.session.query(*HISTORY_COLUMNS)
+    if grade:
+        query = query.filter(Resume.grade == grade)
+    if min_score is not None:
+        query = query.filter(Resume.overall_score >= min_score)
+    if max_score is not None:
+        query = query.filter(Resume.overall_score <= max_score)
+
+    # Going backwards reads the rows before the cursor in reverse order, then flips them
+    backwards = before is not None and after is None
+    cursor = before if backwards else after
+    scan_keys = [(column, not descending) for column, descending in keys] if backwards else keys
+    values = decode_cursor(cursor, keys) if cursor is not None else None
+    nulls_last = reverse == backwards
+
+    if scan_keys[0][0] is Resume.grade and grade:
+        # Every row has the filtered grade, so only the keys after it order them
+        rows = _fetch(query, scan_keys[1:], values[1:] if values is not None else None, page_size + 1, nulls_last)
+    elif scan_keys[0][0] is Resume.grade:
+        rows = _fetch_by_grade(query, scan_keys, values, page_size + 1, nulls_last)
+    else:
+        rows = _fetch(query, scan_keys, values, page_size + 1, nulls_last)
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more or backwards:
+            next_cursor = encode_cursor(rows[-1], keys)
+        if cursor is not None and (has_more or not backwards):
+            prev_cursor = encode_cursor(rows[0], keys)
+    return {'rows': rows, 'next_cursor': next_cursor, 'prev_cursor': prev_cursor}
+
+def _fetch(query, keys, values, limit, nulls_last=True):
+    """
+    Read up to limit rows after the sort key values (from the start if None) in the order of keys
+
+    Rows whose first key is NULL come after the others, or before them if
+    nulls_last is False, ordered by the remaining keys. A row-value
+    comparison never matches NULL, so those rows are read separately; the
+    keys after the first are never NULL.
+    """
+    column = keys[0][0]
+    if not column.nullable:
+        return _fetch_range(query, keys, values, limit)
+
+    # (holds NULL keys, rows, keys ordering them) in scan order
+    parts = [(False, query.filter(column.isnot(None)), keys), (True, query.filter(column.is_(None)), keys[1:])]
+    if not nulls_last:
+        parts.reverse()
+    if values is not None:
+        # Start in the part holding the cursor row
+        while parts[0][0] != (values[0] is None):
+            parts.pop(0)
+
+    rows = []
+    for holds_nulls, part, part_keys in parts:
+        part_values = None
+        if values is not None:
+            part_values = values[1:] if holds_nulls else values
+            values = None
+        rows.extend(_fetch_range(part, part_keys, part_values, limit - len(rows)))
+        if len(rows) >= limit:
+            break
+    return rows
+
+def _fetch_range(query, keys, values, limit):
+    """Read up to limit rows after non-NULL sort key values (from the start if None) in the order of keys"""
+    descending = keys[0][1]
+    columns = [column for column, _ in keys]
+    if values is not None:
+        # One row-value comparison, which the index turns into a range seek
+        key, cursor = tuple_(*columns), tuple_(*values)
+        query = query.filter(key < cursor if descending else key > cursor)
+    return query.order_by(*[column.desc() if descending else column.asc() for column in columns]).limit(limit).all()
+
+def _fetch_by_grade(query, keys, values, limit, nulls_last=True):
+    """
+    Read up to limit rows in grade order, one grade at a time
+
+    The grade and the keys after it go in opposite directions, which a single
+    row-value comparison can't express; within one grade they don't. Rows
+    without a grade form a group of their own after the graded ones, or
+    before them if nulls_last is False.
+    """
+    descending = keys[0][1]
+    if values is not None:
+        grade, values = values[0], values[1:]
+        ungraded = grade is None
+    elif nulls_last:
+        grade = _next_grade(query, None, descending)
+        ungraded = grade is None
+    else:
+        grade, ungraded = None, True
+
+    rows = []
+    while len(rows) < limit:
+        group = query.filter(Resume.grade.is_(None) if ungraded else Resume.grade == grade)
+        rows.extend(_fetch(group, keys[1:], values, limit - len(rows), nulls_last))
+        values = None
+
+        if ungraded:
+            if nulls_last:
+                break
+            grade, ungraded = _next_grade(query, None, descending), False
+        else:
+            grade = _next_grade(query, grade, descending)
+            if grade is None:
+                if not nulls_last:
+                    break
+                ungraded = True
+        if grade is None and not ungraded:
+            break
+    return rows
+
+def _next_grade(query, grade, descending):
+    """Return the grade after `grade` (the first one if None) among the filtered rows, or None"""
+    if grade is not None:
+        query = query.filter(Resume.grade < grade if descending else Resume.grade > grade)
+    bound = func.max(Resume.grade) if descending else func.min(Resume.grade)
+    return query.with_entities(bound).scalar()
+
+def grade_choices():
+    """Return the grades of the active scoring profile, best first"""
+    profile = get_scoring_profile()
+    return [grade for grade, _ in profile['grades']] + [profile['lowest_grade']]
+
+def encode_cursor(row, keys):
+    """Encode the sort key of a row as an opaque URL-safe cursor"""
+    values = []
+    for column, _ in keys:
+        value = getattr(row, column.key)
+        values.append(value.isoformat() if isinstance(value, datetime) else value)
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, keys):
+    """Decode a cursor made by encode_cursor for the same sort keys"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursorError(f"Cursor does not match the sort order: {cursor}")
+
+    try:
+        return [datetime.fromisoformat(value) if isinstance(column.type, db.DateTime) and value is not None else value
+                for (column, _), value in zip(keys, values)]
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,13 @@
+def refresh_search_indexes():
+    """
+    Bring the candidate and search indexes up to date after resumes are stored
+
+    Only indexes this process has already built or opened are updated; the
+    others load every stored resume when first used. They are imported here
+    rather than at module level so analysis pool workers, which import the
+    modules that call this, don't load them.
+    """
+    from skill_index import index_new_resume
+    from text_index import index_new_resumes
+    index_new_resume()
+    index_new_resumes()
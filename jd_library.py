@@ -0,0 +1,130 @@
+import hashlib
+import logging
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from models import db, JobDescription
+from skill_extractor import extract_skills_from_job_description, get_skills_dictionary_version
+from lru import LRUCache
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# In-process cache of recently used job descriptions, keyed by ('hash', content hash) and ('id', ID)
+_jd_cache = LRUCache(maxsize=256)
+
+def normalize_job_description(job_description):
+    """
+    Normalize a job description for hashing
+
+    Skill matching is case-insensitive and only looks at word boundaries,
+    so case, line endings and surrounding whitespace never change the result.
+    """
+    return job_description.replace('\r\n', '\n').strip().lower()
+
+def hash_job_description(job_description):
+    """Return the content hash identifying a job description"""
+    return hashlib.sha256(normalize_job_description(job_description).encode('utf-8')).hexdigest()
+
+class CachedJobDescription:
+    """Job description data held in the in-process cache"""
+
+    def __init__(self, jd_id, content_hash, text, skills, dictionary_version):
+        self.id = jd_id
+        self.content_hash = content_hash
+        self.text = text
+        self.skills = skills
+        self.dictionary_version = dictionary_version
+
+def lookup_job_description(job_description):
+    """
+    Return the stored job description and its skills, creating it if needed
+
+    Args:
+        job_description (str): Job description text
+
+    Returns:
+        CachedJobDescription: The library entry, or None for an empty job description
+    """
+    if not job_description or not job_description.strip():
+        return None
+
+    content_hash = hash_job_description(job_description)
+    version = get_skills_dictionary_version()
+
+    cached = _jd_cache.get(('hash', content_hash))
+    if cached is not None and cached.dictionary_version == version:
+        return cached
+
+    try:
+        record = JobDescription.query.filter_by(content_hash=content_hash).first()
+        if record is None:
+            record = JobDescription(content_hash=content_hash, text=job_description.strip())
+            db.session.add(record)
+        _refresh_skills(record, version)
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored the same job description first
+        db.session.rollback()
+        record = JobDescription.query.filter_by(content_hash=content_hash).first()
+        if record is None:
+            raise
+    except SQLAlchemyError as e:
+        logger.error(f"Error storing job description: {str(e)}")
+        db.session.rollback()
+        # Keep working without the library
+        skills = extract_skills_from_job_description(job_description)
+        return CachedJobDescription(None, content_hash, job_description.strip(), skills, version)
+
+    return _cache_record(record)
+
+def get_job_description(jd_id):
+    """
+    Return a stored job description by ID
+
+    Args:
+        jd_id (int): Job description ID
+
+    Returns:
+        CachedJobDescription: The library entry, or None if it does not exist
+    """
+    version = get_skills_dictionary_version()
+    cached = _jd_cache.get(('id', jd_id))
+    if cached is not None and cached.dictionary_version == version:
+        return cached
+
+    record = db.session.get(JobDescription, jd_id)
+    if record is None:
+        return None
+
+    if record.dictionary_version != version or record.skills is None:
+        content_hash, text = record.content_hash, record.text
+        try:
+            _refresh_skills(record, version)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            logger.error(f"Error updating job description {jd_id}: {str(e)}")
+            db.session.rollback()
+            skills = extract_skills_from_job_description(text)
+            return CachedJobDescription(jd_id, content_hash, text, skills, version)
+
+    return _cache_record(record)
+
+def recent_job_descriptions(limit=20):
+    """Return the most recently stored job descriptions"""
+    return (JobDescription.query
+            .order_by(JobDescription.created_at.desc())
+            .limit(limit)
+            .all())
+
+def _refresh_skills(record, version):
+    """Recompute the skills of a record extracted with another dictionary version"""
+    if record.dictionary_version != version or record.skills is None:
+        record.skills = extract_skills_from_job_description(record.text)
+        record.dictionary_version = version
+
+def _cache_record(record):
+    entry = CachedJobDescription(record.id, record.content_hash, record.text,
+                                 record.skills, record.dictionary_version)
+    _jd_cache.put(('hash', record.content_hash), entry)
+    _jd_cache.put(('id', record.id), entry)
+    return entry
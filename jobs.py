@@ -0,0 +1,283 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from sqlalchemy import update
+from models import db, AnalysisJob
+from metrics import PIPELINE_STAGES, StageTimings, UPLOADS, upload_labels
+from indexes import refresh_search_indexes
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Worker processes running queued uploads, per web worker process
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', min(2, os.cpu_count() or 1)))
+
+# Uploads a web worker accepts before turning new ones away; each holds its file in memory
+MAX_PENDING_JOBS = int(os.environ.get('MAX_PENDING_JOBS', 32))
+
+# Minimum seconds between stage progress writes for one job
+PROGRESS_INTERVAL = 0.25
+
+JOB_STATUSES = ['queued', 'running', 'done', 'failed']
+
+class QueueFullError(Exception):
+    """Raised when a web worker already has MAX_PENDING_JOBS uploads queued or running"""
+
+class JobQueue:
+    """
+    Runs uploads through the pipeline in a bounded process pool
+
+    Job state lives in the analysis_jobs table, so any web worker can report
+    on a job. Pool workers parse, analyze and commit the resume together
+    with the job's final status; the web worker that queued a job then
+    updates its in-process indexes and metrics.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_pending=MAX_PENDING_JOBS):
+        self.app = None
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Register the Flask app whose context completion callbacks run in"""
+        self.app = app
+
+    def submit(self, data, content_hash, file_type, filename, job_description, job_skills=None):
+        """
+        Queue an upload for analysis
+
+        Args:
+            data (bytes): File content
+            content_hash (str): SHA-256 hex digest of the content
+            file_type (str): File extension (pdf, docx, txt)
+            filename (str): Uploaded file name
+            job_description (str): Job description text
+            job_skills (list): Skills already extracted from the job description (optional)
+
+        Returns:
+            str: The job ID
+
+        Raises:
+            QueueFullError: If too many jobs are already pending
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"{self._pending} uploads are already queued")
+            self._pending += 1
+
+        try:
+            job = AnalysisJob(id=uuid.uuid4().hex, status='queued', filename=filename)
+            db.session.add(job)
+            db.session.commit()
+
+            future = self.executor().submit(
+                run_job, job.id, data, content_hash, file_type, filename, job_description, job_skills
+            )
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        future.add_done_callback(partial(self._job_finished, job.id, file_type))
+        logger.debug(f"Queued analysis job {job.id} for {filename}")
+        return job.id
+
+    def _job_finished(self, job_id, file_type, future):
+        with self._lock:
+            self._pending -= 1
+
+        with self.app.app_context():
+            try:
+                outcome = future.result()
+            except Exception as e:
+                # The worker process died; run_job records every other failure itself
+                logger.error(f"Analysis job {job_id} failed: {str(e)}")
+                if isinstance(e, BrokenProcessPool):
+                    self.reset_executor()
+                mark_job(job_id, status='failed', error=f"Worker failed: {str(e)}", finished_at=datetime.utcnow())
+                return
+
+            merge_worker_metrics(outcome, file_type)
+            if outcome['status'] != 'done':
+                return
+
+            refresh_search_indexes()
+
+    def executor(self):
+        """Return the process pool, starting it on first use; pool workers can run run_job and analyze_upload"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            return self._pool
+
+    def reset_executor(self):
+        """Drop a broken process pool; the next executor() call starts a new one"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def shutdown(self, wait=True):
+        """Stop the pool, waiting for running jobs unless wait is False"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+def mark_job(job_id, **values):
+    """Update columns of a job row and commit"""
+    db.session.execute(update(AnalysisJob).where(AnalysisJob.id == job_id).values(**values))
+    db.session.commit()
+
+def merge_worker_metrics(outcome, file_type):
+    """Add the stage counts and, for finished uploads, the timings collected in a pool worker to this process's metrics"""
+    for (stage, result), count in outcome['stages'].items():
+        PIPELINE_STAGES.inc(count, stage=stage, outcome=result)
+    if outcome['status'] != 'done':
+        return
+
+    timings = StageTimings()
+    timings.durations = outcome['durations']
+    labels = upload_labels(file_type, outcome['extraction'], outcome['cache_hit'])
+    timings.observe(**labels)
+    UPLOADS.inc(**labels)
+
+def describe_job(job):
+    """Return the public fields of a job"""
+    return {
+        'id': job.id,
+        'status': job.status,
+        'stage': job.stage,
+        'filename': job.filename,
+        'resume_id': job.resume_id,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+class _ProgressWriter:
+    """Stage listener recording the current stage of a job, at most every PROGRESS_INTERVAL seconds"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.last_write = 0.0
+
+    def __call__(self, stage):
+        now = time.monotonic()
+        if now - self.last_write >= PROGRESS_INTERVAL:
+            self.last_write = now
+            mark_job(self.job_id, stage=stage)
+
+_worker_app = None
+
+def _init_worker():
+    """Set up a pool worker process: the Flask app and a fresh database connection pool"""
+    global _worker_app
+    import resume_parser
+    from app import app
+
+    _worker_app = app
+    # The job pool already runs one upload per worker; don't fan PDF pages out again
+    resume_parser.PDF_PARALLEL_WORKERS = 1
+    with app.app_context():
+        # Connections inherited from the parent process must not be shared
+        db.engine.dispose(close=False)
+
+def run_job(job_id, data, content_hash, file_type, filename, job_description, job_skills=None):
+    """
+    Analyze one upload in a pool worker and store the resume with the job's final status
+
+    Returns:
+        dict: status, stage counts, and for finished jobs the stage durations,
+            extraction info and whether the parse cache was hit
+    """
+    from pipeline import process_upload
+
+    with _worker_app.app_context():
+        stages_before = PIPELINE_STAGES.values()
+        started = time.perf_counter()
+        mark_job(job_id, status='running', started_at=datetime.utcnow())
+        timings = StageTimings(on_stage=_ProgressWriter(job_id))
+
+        try:
+            processed = process_upload(data, content_hash, file_type, filename,
+                                       job_description, job_skills, timings)
+            with timings.stage('db_commit'):
+                resume_record = processed['record']
+                db.session.add(resume_record)
+                db.session.flush()
+                # The resume and the job's completion are committed together
+                db.session.execute(update(AnalysisJob).where(AnalysisJob.id == job_id).values(
+                    status='done', stage=None, resume_id=resume_record.id, finished_at=datetime.utcnow()
+                ))
+                db.session.commit()
+            status = 'done'
+        except Exception as e:
+            logger.error(f"Error processing job {job_id}: {str(e)}")
+            db.session.rollback()
+            mark_job(job_id, status='failed', error=str(e), finished_at=datetime.utcnow())
+            status = 'failed'
+
+        stages = _stage_counts_since(stages_before)
+        if status == 'failed':
+            return {'status': status, 'stages': stages}
+
+        timings.add('total', time.perf_counter() - started)
+        return {
+            'status': status,
+            'stages': stages,
+            'durations': timings.durations,
+            'extraction': processed['resume_data'].get('extraction'),
+            'cache_hit': processed['cache_hit']
+        }
+
+def analyze_upload(data, content_hash, file_type, filename, job_description, job_skills=None):
+    """
+    Parse and analyze one upload in a pool worker, leaving storage to the caller
+
+    Returns:
+        dict: status and stage counts, plus resume_data, cache_hit, result,
+            durations and extraction info when it succeeded or error when it failed
+    """
+    from pipeline import process_upload
+
+    with _worker_app.app_context():
+        stages_before = PIPELINE_STAGES.values()
+        started = time.perf_counter()
+        timings = StageTimings()
+        try:
+            processed = process_upload(data, content_hash, file_type, filename,
+                                       job_description, job_skills, timings)
+        except Exception as e:
+            logger.error(f"Error processing {filename}: {str(e)}")
+            db.session.rollback()
+            return {'status': 'failed', 'error': str(e), 'stages': _stage_counts_since(stages_before)}
+
+        timings.add('total', time.perf_counter() - started)
+        return {
+            'status': 'done',
+            'stages': _stage_counts_since(stages_before),
+            'durations': timings.durations,
+            'resume_data': processed['resume_data'],
+            'extraction': processed['resume_data'].get('extraction'),
+            'cache_hit': processed['cache_hit'],
+            'result': processed['result']
+        }
+
+def _stage_counts_since(before):
+    return {key: count - before.get(key, 0) for key, count in PIPELINE_STAGES.values().items()
+            if count != before.get(key, 0)}
+
+# Shared by every request in this process
+job_queue = JobQueue()
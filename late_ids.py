@@ -0,0 +1,91 @@
+import time
+from sqlalchemy import select
+from models import db
+
+# How long an id skipped by a catch-up scan is looked for again; longer than any write transaction
+MISSING_ID_SECONDS = 600
+
+# Only skipped ids this close to the highest loaded id are remembered
+MISSING_ID_WINDOW = 10000
+
+# Ids looked up per query; keeps IN lists within the database's parameter limits
+ID_CHUNK_SIZE = 500
+
+class MissingIds:
+    """
+    Resume ids a catch-up scan passed without finding a row
+
+    Indexes that follow the resumes table load the rows above the highest id
+    they have seen. Ids are handed out when a row is inserted, not when it is
+    committed, so a row can become visible after rows with higher ids (another
+    worker process's transaction, a Postgres sequence, a large batch). The ids
+    skipped by a scan are remembered and looked up again on the next catch-up;
+    one that stays missing (a rolled back insert, a deleted resume) is
+    forgotten after MISSING_ID_SECONDS.
+    """
+
+    def __init__(self, entries=()):
+        """
+        Args:
+            entries (iterable): (id, time first missed) pairs, as returned by entries()
+        """
+        self._missed = {int(resume_id): missed for resume_id, missed in entries}
+
+    def __len__(self):
+        return len(self._missed)
+
+    def __contains__(self, resume_id):
+        return resume_id in self._missed
+
+    def passed(self, previous_max_id, loaded_ids):
+        """
+        Record the ids a scan skipped
+
+        Args:
+            previous_max_id (int): Highest id loaded before the scan
+            loaded_ids (list): Ids the scan loaded, in increasing order
+        """
+        if not loaded_ids:
+            return
+        now = time.time()
+        loaded = set(loaded_ids)
+        for resume_id in range(max(previous_max_id, loaded_ids[-1] - MISSING_ID_WINDOW) + 1, loaded_ids[-1]):
+            if resume_id not in loaded:
+                self._missed.setdefault(resume_id, now)
+
+    def found(self, resume_ids):
+        """Forget ids whose rows have been loaded"""
+        for resume_id in resume_ids:
+            self._missed.pop(resume_id, None)
+
+    def expire(self, max_id):
+        """Forget ids missing for too long or too far below the highest loaded id"""
+        oldest = time.time() - MISSING_ID_SECONDS
+        self._missed = {resume_id: missed for resume_id, missed in self._missed.items()
+                        if missed >= oldest and resume_id > max_id - MISSING_ID_WINDOW}
+
+    def ids(self):
+        return sorted(self._missed)
+
+    def entries(self):
+        """Return (id, time first missed) pairs, e.g. to save with an index"""
+        return sorted(self._missed.items())
+
+def load_late_rows(columns, missing):
+    """
+    Look up the rows of missing ids that have been committed since
+
+    Args:
+        columns (list): Columns of the resumes table to load, starting with the id
+        missing (MissingIds): Ids to look for; call missing.found once the rows are loaded
+
+    Returns:
+        list: Rows found, in id order
+    """
+    ids = missing.ids()
+    rows = []
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        rows.extend(db.session.execute(
+            select(*columns).where(columns[0].in_(ids[start:start + ID_CHUNK_SIZE])).order_by(columns[0])
+        ).all())
+    return rows
@@ -0,0 +1,229 @@
+import bisect
+import threading
+import time
+
+# Upper bounds (seconds) of the stage duration histogram buckets; analysis stages take well under a millisecond
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter with labels, exported in the Prometheus text format"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Add amount to the series identified by labels"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self):
+        """Return a snapshot of the series, keyed by label value tuples"""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for key, value in sorted(self.values().items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+class Histogram:
+    """Histogram with fixed buckets and labels, exported in the Prometheus text format"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Label values mapped to [per-bucket counts (last one is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record one observation in the series identified by labels"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def render(self):
+        with self._lock:
+            snapshot = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for key, (counts, total) in sorted(snapshot.items()):
+            # Buckets are exported cumulatively
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, [("le", le)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+class Gauge:
+    """Current values read from a callback at export time, in the Prometheus text format"""
+
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        """
+        Args:
+            collect (callable): Returns a dict of label value tuples to the current value (None to skip)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        for key, value in sorted(self.collect().items()):
+            if value is not None:
+                lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+class StageTimer:
+    """Context manager adding the duration of one stage to a StageTimings"""
+
+    __slots__ = ('timings', 'stage', 'started')
+
+    def __init__(self, timings, stage):
+        self.timings = timings
+        self.stage = stage
+
+    def __enter__(self):
+        if self.timings.on_stage is not None:
+            self.timings.on_stage(self.stage)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.durations.append((self.stage, time.perf_counter() - self.started))
+        return False
+
+class StageTimings:
+    """
+    Durations of the pipeline stages of one request
+
+    Stages are timed as they run and observed in the histogram at the end,
+    once labels that are only known later (such as the page count) are.
+    """
+
+    def __init__(self, on_stage=None):
+        """
+        Args:
+            on_stage (callable): Called with the name of each stage as it starts (optional)
+        """
+        self.durations = []
+        self.on_stage = on_stage
+
+    def stage(self, name):
+        """Return a context manager timing the stage `name`"""
+        return StageTimer(self, name)
+
+    def add(self, name, seconds):
+        """Record the duration of a stage timed by the caller"""
+        self.durations.append((name, seconds))
+
+    def observe(self, **labels):
+        """Record every timed stage in STAGE_SECONDS with the given labels"""
+        for stage, seconds in self.durations:
+            STAGE_SECONDS.observe(seconds, stage=stage, **labels)
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NO_TIMER = _NoTimer()
+
+def stage_timer(timings, stage):
+    """Time a stage into timings, or do nothing when timings is None"""
+    return _NO_TIMER if timings is None else StageTimer(timings, stage)
+
+def page_bucket(pages):
+    """Group a page count into a low-cardinality label value ('none' for formats without pages)"""
+    if pages is None:
+        return 'none'
+    for bound, label in ((1, '1'), (3, '2-3'), (10, '4-10'), (50, '11-50')):
+        if pages <= bound:
+            return label
+    return '50+'
+
+def upload_labels(file_type, extraction, cache_hit):
+    """Return the file_type, pages and cache labels of an upload"""
+    return {
+        'file_type': file_type,
+        'pages': page_bucket((extraction or {}).get('pages')),
+        'cache': 'hit' if cache_hit else 'miss'
+    }
+
+STAGE_SECONDS = Histogram(
+    'resume_stage_duration_seconds', 'Time spent in each stage of the upload pipeline',
+    ['stage', 'file_type', 'pages', 'cache']
+)
+UPLOADS = Counter(
+    'resume_uploads_total', 'Resumes uploaded and analyzed',
+    ['file_type', 'pages', 'cache']
+)
+PIPELINE_STAGES = Counter(
+    'resume_pipeline_stages_total', 'Pipeline stages run, or skipped because earlier results were reused',
+    ['stage', 'outcome']
+)
+
+def _nlp_model_stat(name):
+    def collect():
+        from nlp_models import nlp_registry
+        stats = nlp_registry.stats()
+        value = stats[name]
+        return {(stats['model'],): int(value) if isinstance(value, bool) else value}
+    return collect
+
+NLP_MODEL_LOADED = Gauge(
+    'resume_nlp_model_loaded', 'Whether this process has loaded the spaCy model (it loads on first use)',
+    ['model'], _nlp_model_stat('loaded')
+)
+NLP_MODEL_LOAD_SECONDS = Gauge(
+    'resume_nlp_model_load_seconds', 'Time this process took to load the spaCy model',
+    ['model'], _nlp_model_stat('load_seconds')
+)
+NLP_MODEL_RSS_BYTES = Gauge(
+    'resume_nlp_model_rss_bytes', 'Growth of resident memory while this process loaded the spaCy model',
+    ['model'], _nlp_model_stat('rss_delta_bytes')
+)
+
+REGISTRY = [STAGE_SECONDS, UPLOADS, PIPELINE_STAGES, NLP_MODEL_LOADED, NLP_MODEL_LOAD_SECONDS, NLP_MODEL_RSS_BYTES]
+
+def render_metrics(registry=REGISTRY):
+    """
+    Return every metric in the Prometheus text exposition format
+
+    Metrics live in process memory, so each worker process exports its own.
+    """
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
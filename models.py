@@ -1,12 +1,22 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import JSON
+import logging
+from sqlalchemy import JSON, inspect, text
 
 db = SQLAlchemy()
 
+logger = logging.getLogger(__name__)
+
 class Resume(db.Model):
     """Resume model for storing uploaded resume data and analysis results"""
     __tablename__ = 'resumes'
+    # Keyset pagination of the history (see history.HISTORY_SORTS); id breaks ties
+    __table_args__ = (
+        db.Index('ix_resumes_upload_date_id', 'upload_date', 'id'),
+        db.Index('ix_resumes_overall_score_id', 'overall_score', 'id'),
+        db.Index('ix_resumes_grade_upload_date_id', 'grade', 'upload_date', 'id'),
+        db.Index('ix_resumes_grade_score_id', 'grade', db.desc('overall_score'), db.desc('id')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
@@ -41,9 +51,121 @@ class Resume(db.Model):
     # Suggestions
     suggestions = db.Column(JSON, nullable=True)
     
+    # Parsed entries shown on the results page (see pipeline.DETAIL_FIELDS)
+    parsed_details = db.Column(JSON, nullable=True)
+    
+    # Scoring features (see scoring.FEATURE_COLUMNS), kept so stored resumes can be re-scored
+    has_summary = db.Column(db.Boolean, nullable=True)
+    has_education = db.Column(db.Boolean, nullable=True)
+    has_experience = db.Column(db.Boolean, nullable=True)
+    has_skills = db.Column(db.Boolean, nullable=True)
+    has_projects = db.Column(db.Boolean, nullable=True)
+    has_certifications = db.Column(db.Boolean, nullable=True)
+    has_contact = db.Column(db.Boolean, nullable=True)
+    match_percentage = db.Column(db.Float, nullable=True)
+    action_verb_density = db.Column(db.Float, nullable=True)
+    unique_action_verbs = db.Column(db.Integer, nullable=True)
+    word_count_total_assessment = db.Column(db.String(16), nullable=True)
+    word_count_summary_assessment = db.Column(db.String(16), nullable=True)
+    issue_count = db.Column(db.Integer, nullable=True)
+    
+    # Version of the weight profile the scores were computed with
+    scoring_profile = db.Column(db.String(32), nullable=True)
+    
+    # Normalized copy of skills, for indexed skill queries (see skill_store.py)
+    skill_links = db.relationship('ResumeSkill', cascade='all, delete-orphan', lazy='select')
+    
     def __repr__(self):
         return f'<Resume {self.id}: {self.name or "Unknown"}>'
 
+class JobDescription(db.Model):
+    """Job description library entry with its precomputed skills"""
+    __tablename__ = 'job_descriptions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # SHA-256 of the normalized text, used to find repeated job descriptions
+    content_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Skills extracted with the skills dictionary identified by dictionary_version
+    skills = db.Column(JSON, nullable=True)
+    dictionary_version = db.Column(db.String(32), nullable=True)
+
+    def __repr__(self):
+        return f'<JobDescription {self.id}>'
+
+class ParsedDocument(db.Model):
+    """Cached parser output for an uploaded file, keyed by the SHA-256 of its bytes"""
+    __tablename__ = 'parsed_documents'
+    __table_args__ = (
+        db.UniqueConstraint('content_hash', 'file_type', 'parser_version', name='uq_parsed_documents_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False)
+    file_type = db.Column(db.String(10), nullable=False)
+    # Parser version and extraction limits; entries written under others are never reused
+    parser_version = db.Column(db.String(16), nullable=False)
+
+    # Output of extract_resume_data, including the extracted raw text
+    resume_data = db.Column(JSON, nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<ParsedDocument {self.content_hash[:12]} ({self.file_type})>'
+
+class Skill(db.Model):
+    """Distinct skill found in stored resumes"""
+    __tablename__ = 'skills'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Lowercase, as skills are matched case-insensitively
+    name = db.Column(db.String(255), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f'<Skill {self.id}: {self.name}>'
+
+class ResumeSkill(db.Model):
+    """A skill of a stored resume, under the category it was extracted in"""
+    __tablename__ = 'resume_skills'
+    __table_args__ = (
+        # Skill (and category) to resumes lookups; the primary key covers resume to skills
+        db.Index('ix_resume_skills_skill_category_resume', 'skill_id', 'category', 'resume_id'),
+    )
+
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    # Category key of Resume.skills, e.g. 'programming_languages'; '' for uncategorized skills
+    category = db.Column(db.String(64), primary_key=True, default='')
+
+    def __repr__(self):
+        return f'<ResumeSkill {self.resume_id}: {self.skill_id} ({self.category})>'
+
+class AnalysisJob(db.Model):
+    """Upload analyzed in the background; the row is shared by every web and pool worker"""
+    __tablename__ = 'analysis_jobs'
+
+    # Random hex ID, so job URLs cannot be enumerated
+    id = db.Column(db.String(32), primary_key=True)
+    # queued, running, done or failed
+    status = db.Column(db.String(16), nullable=False, default='queued')
+    # Pipeline stage the job is in while running
+    stage = db.Column(db.String(64), nullable=True)
+    filename = db.Column(db.String(255), nullable=False)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<AnalysisJob {self.id}: {self.status}>'
+
 class User(db.Model):
     """User model for authentication and resume ownership"""
     __tablename__ = 'users'
@@ -64,4 +186,29 @@ class User(db.Model):
 user_resumes = db.Table('user_resumes',
     db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
     db.Column('resume_id', db.Integer, db.ForeignKey('resumes.id'), primary_key=True)
-)
\ No newline at end of file
+)
+
+
+def upgrade_schema():
+    """
+    Bring existing tables up to date with the models
+
+    db.create_all only creates missing tables. This adds columns introduced
+    since a table was created (all of them nullable) and creates missing indexes.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                logger.info(f"Added column {table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
@@ -0,0 +1,112 @@
+import os
+import time
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+DEFAULT_MODEL = os.environ.get('SPACY_MODEL', 'en_core_web_sm')
+
+# Pipeline components the analyzer never uses; excluding them cuts load time and memory
+EXCLUDED_COMPONENTS = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter', 'textcat']
+
+def current_rss_bytes():
+    """Return the resident set size of this process in bytes, or None if unknown"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        # Peak RSS is the best we can do here; reported in kilobytes on Linux, bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+class NLPModelRegistry:
+    """
+    Lazily loaded, process-wide spaCy model
+
+    The model is loaded on first use instead of at import time, at most once
+    per process. A missing spaCy install or model is remembered so later calls
+    return None immediately and callers fall back to the regex based parsing.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL, exclude=None):
+        self.model_name = model_name
+        self.exclude = EXCLUDED_COMPONENTS if exclude is None else exclude
+        self._lock = threading.Lock()
+        self._nlp = None
+        self._attempted = False
+        self.load_seconds = None
+        self.rss_delta_bytes = None
+        self.error = None
+
+    def get(self):
+        """
+        Return the loaded model, loading it on first use
+
+        Returns:
+            spacy.language.Language: The model, or None if spaCy or the model is unavailable
+        """
+        if self._attempted:
+            return self._nlp
+
+        with self._lock:
+            if not self._attempted:
+                self._load()
+                self._attempted = True
+        return self._nlp
+
+    def _load(self):
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            import spacy
+            self._nlp = spacy.load(self.model_name, exclude=self.exclude)
+        except (ImportError, OSError) as e:
+            # ImportError: spaCy not installed; OSError: model package not downloaded
+            self.error = str(e)
+            logger.warning(f"SpaCy model {self.model_name} not available ({self.error}). "
+                           "Using basic parsing methods instead.")
+            return
+
+        self.load_seconds = time.perf_counter() - started
+        rss_after = current_rss_bytes()
+        if rss_before is not None and rss_after is not None:
+            self.rss_delta_bytes = rss_after - rss_before
+        logger.info(f"SpaCy model {self.model_name} loaded in {self.load_seconds:.2f}s "
+                    f"(pipeline: {', '.join(self._nlp.pipe_names)}, "
+                    f"RSS delta: {self._format_bytes(self.rss_delta_bytes)})")
+
+    def stats(self):
+        """Return load statistics for diagnostics"""
+        return {
+            'model': self.model_name,
+            'loaded': self._nlp is not None,
+            'attempted': self._attempted,
+            'pipeline': list(self._nlp.pipe_names) if self._nlp is not None else [],
+            'load_seconds': self.load_seconds,
+            'rss_delta_bytes': self.rss_delta_bytes,
+            'error': self.error
+        }
+
+    @staticmethod
+    def _format_bytes(value):
+        if value is None:
+            return 'unknown'
+        return f"{value / (1024 * 1024):.1f} MB"
+
+# One per process. Parsing doesn't use spaCy, so nothing loads the model until a caller asks for it;
+# /metrics reports whether it has been loaded
+nlp_registry = NLPModelRegistry()
+
+def get_nlp():
+    """Return the shared spaCy model, or None if it is not available"""
+    return nlp_registry.get()
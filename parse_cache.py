@@ -0,0 +1,196 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from models import db, ParsedDocument
+from resume_parser import parse_resume, ExtractionBudget, PARSER_VERSION
+from metrics import stage_timer
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Upper bound for the stored parser output; least recently used entries are evicted beyond it
+MAX_CACHE_BYTES = int(os.environ.get('PARSE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Inserts between checks of the whole cache's size; inserts by other workers are only seen then
+EVICT_CHECK_INTERVAL = int(os.environ.get('PARSE_CACHE_EVICT_INTERVAL', 100))
+
+# A hit only rewrites last_used_at when the stored value is older than this
+LAST_USED_RESOLUTION = timedelta(minutes=1)
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# This process's view of the cache size: bytes at the last check plus what it stored since
+_cache_size = {'bytes': None, 'inserts': 0}
+_cache_size_lock = threading.Lock()
+
+def _env_limit(name, default):
+    value = os.environ.get(name, default)
+    return int(value) if value not in (None, '', '0') else None
+
+# Extraction limits for uploads; 0 disables a limit
+EXTRACTION_BUDGET = ExtractionBudget(
+    max_pages=_env_limit('EXTRACTION_MAX_PAGES', 60),
+    max_chars=_env_limit('EXTRACTION_MAX_CHARS', 200000),
+    deadline_seconds=float(os.environ.get('EXTRACTION_DEADLINE_SECONDS', 20)) or None
+)
+
+def read_upload(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Read an uploaded file into memory, hashing it on the way in
+
+    Args:
+        stream: Readable binary stream (e.g. FileStorage.stream)
+        chunk_size (int): Bytes read per chunk
+
+    Returns:
+        tuple: (file content as bytes, SHA-256 hex digest)
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        buffer += chunk
+    return bytes(buffer), digest.hexdigest()
+
+def parse_resume_cached(data, content_hash, file_type, budget=None, timings=None):
+    """
+    Parse a resume, reusing the stored result for identical files
+
+    Args:
+        data (bytes): File content
+        content_hash (str): SHA-256 hex digest of the content
+        file_type (str): File extension (pdf, docx, txt)
+        budget (ExtractionBudget): Extraction limits (default EXTRACTION_BUDGET)
+        timings (StageTimings): Collects the duration of each stage (optional)
+
+    Returns:
+        tuple: (resume data dict, True if it came from the cache)
+    """
+    budget = EXTRACTION_BUDGET if budget is None else budget
+    # Page and character limits change the output, so they are part of the key
+    version = cache_version(budget)
+
+    with stage_timer(timings, 'parse_cache_lookup'):
+        resume_data = get_cached_resume_data(content_hash, file_type, version)
+    if resume_data is not None:
+        logger.debug(f"Parse cache hit for {content_hash[:12]}")
+        return resume_data, True
+
+    resume_data = parse_resume(data, file_type, budget, timings)
+    if resume_data['extraction']['truncated_by'] != 'deadline':
+        # A deadline cut depends on load, not on the file; parse it again next time
+        with stage_timer(timings, 'parse_cache_store'):
+            store_resume_data(content_hash, file_type, resume_data, version)
+    return resume_data, False
+
+def cache_version(budget):
+    """Return the parser_version key for output produced under an extraction budget"""
+    return f"{PARSER_VERSION}-{budget.cache_key()}"
+
+def get_cached_resume_data(content_hash, file_type, version=None):
+    """Return the cached parser output for a file, or None"""
+    version = cache_version(EXTRACTION_BUDGET) if version is None else version
+    try:
+        entry = ParsedDocument.query.filter_by(
+            content_hash=content_hash, file_type=file_type, parser_version=version
+        ).first()
+        if entry is None:
+            return None
+        now = datetime.utcnow()
+        # Eviction only needs a rough recency order; don't turn every hit into a write
+        if entry.last_used_at is None or now - entry.last_used_at > LAST_USED_RESOLUTION:
+            entry.last_used_at = now
+            db.session.commit()
+        return entry.resume_data
+    except SQLAlchemyError as e:
+        logger.error(f"Error reading parse cache: {str(e)}")
+        db.session.rollback()
+        return None
+
+def store_resume_data(content_hash, file_type, resume_data, version=None):
+    """
+    Store parser output for a file and evict old entries if the cache is too large
+
+    The cache's total size is only summed every EVICT_CHECK_INTERVAL inserts,
+    or when this process's running total passes the bound.
+    """
+    version = cache_version(EXTRACTION_BUDGET) if version is None else version
+    size_bytes = len(json.dumps(resume_data))
+    entry = ParsedDocument(
+        content_hash=content_hash,
+        file_type=file_type,
+        parser_version=version,
+        resume_data=resume_data,
+        size_bytes=size_bytes
+    )
+    try:
+        db.session.add(entry)
+        db.session.commit()
+    except IntegrityError:
+        # Another request stored the same file concurrently
+        db.session.rollback()
+        return
+    except SQLAlchemyError as e:
+        logger.error(f"Error writing parse cache: {str(e)}")
+        db.session.rollback()
+        return
+
+    with _cache_size_lock:
+        _cache_size['inserts'] += 1
+        if _cache_size['bytes'] is not None:
+            _cache_size['bytes'] += size_bytes
+        due = (_cache_size['bytes'] is None or _cache_size['bytes'] > MAX_CACHE_BYTES
+               or _cache_size['inserts'] >= EVICT_CHECK_INTERVAL)
+    if due:
+        evict_parse_cache()
+
+def evict_parse_cache(max_bytes=None):
+    """
+    Delete least recently used entries until the cache fits its size bound
+
+    Entries from older parser versions (or other extraction budgets) are never
+    read again, so they age out like any other unused entry.
+
+    Returns:
+        int: Number of entries deleted
+    """
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    try:
+        deleted = 0
+        total = db.session.query(func.coalesce(func.sum(ParsedDocument.size_bytes), 0)).scalar()
+        if total > max_bytes:
+            excess = total - max_bytes
+            stale_ids = []
+            oldest = (db.session.query(ParsedDocument.id, ParsedDocument.size_bytes)
+                      .order_by(ParsedDocument.last_used_at.asc())
+                      .yield_per(500))
+            for entry_id, size in oldest:
+                stale_ids.append(entry_id)
+                excess -= size
+                total -= size
+                if excess <= 0:
+                    break
+            deleted += ParsedDocument.query.filter(
+                ParsedDocument.id.in_(stale_ids)
+            ).delete(synchronize_session=False)
+
+        db.session.commit()
+        with _cache_size_lock:
+            _cache_size['bytes'] = total
+            _cache_size['inserts'] = 0
+        if deleted:
+            logger.debug(f"Evicted {deleted} parse cache entries")
+        return deleted
+    except SQLAlchemyError as e:
+        logger.error(f"Error evicting parse cache: {str(e)}")
+        db.session.rollback()
+        return 0
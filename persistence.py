@@ -0,0 +1,252 @@
+import os
+import queue
+import atexit
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from sqlalchemy import event
+from models import db
+from indexes import refresh_search_indexes
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Finished results waiting to be written; submitters block (then give up) when it is full
+WRITE_QUEUE_SIZE = int(os.environ.get('WRITE_QUEUE_SIZE', 256))
+
+# Most rows written per transaction
+WRITE_BATCH_SIZE = int(os.environ.get('WRITE_BATCH_SIZE', 64))
+
+# Seconds the writer waits for more results before committing a partial batch
+WRITE_MAX_DELAY = float(os.environ.get('WRITE_MAX_DELAY', 0.005))
+
+# Seconds a submitter waits for room in a full queue
+WRITE_SUBMIT_TIMEOUT = 10
+
+# Seconds save waits for its row to be committed before giving up on it
+WRITE_RESULT_TIMEOUT = float(os.environ.get('WRITE_RESULT_TIMEOUT', 30))
+
+# SQLite settings applied to every connection; see configure_sqlite
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+class WriteQueueFullError(Exception):
+    """Raised when a result can't be queued because the writer is too far behind"""
+
+class WriteTimeoutError(Exception):
+    """Raised when a queued result wasn't committed in time"""
+
+class WriteBehindWriter:
+    """
+    Background thread writing finished resumes to the database in batched transactions
+
+    Requests hand over their unsaved Resume rows and get a Future of the new
+    resume ID. The writer commits whatever has queued up as one transaction
+    (a group commit), so concurrent requests share one commit and one index
+    refresh instead of paying for their own. The queue is bounded, and
+    whatever is queued is written when the process exits.
+
+    Despite the name, uploads still wait for their own row to be committed
+    (see save): the response links to the stored result by its ID, so a
+    request can't finish before the row exists. What the writer saves is the
+    per-request transaction, not the wait.
+    """
+
+    def __init__(self, max_queue=WRITE_QUEUE_SIZE, batch_size=WRITE_BATCH_SIZE, max_delay=WRITE_MAX_DELAY):
+        self.app = None
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def init_app(self, app):
+        """Register the Flask app whose context the writer runs in, and flush on shutdown"""
+        self.app = app
+        atexit.register(self.shutdown)
+
+    def submit(self, resume_record, timeout=WRITE_SUBMIT_TIMEOUT):
+        """
+        Queue an unsaved resume to be written
+
+        Args:
+            resume_record (Resume): New record, not added to any session
+            timeout (float): Seconds to wait for room in a full queue
+
+        Returns:
+            Future: Resolves to the new resume ID once its batch is committed
+
+        Raises:
+            WriteQueueFullError: If the queue stayed full for timeout seconds
+        """
+        self._start()
+        future = Future()
+        try:
+            self._queue.put((resume_record, future), timeout=timeout)
+        except queue.Full:
+            raise WriteQueueFullError(f"{self._queue.qsize()} results are waiting to be written")
+        return future
+
+    def save(self, resume_record, timeout=WRITE_SUBMIT_TIMEOUT, result_timeout=WRITE_RESULT_TIMEOUT):
+        """
+        Queue a resume and wait for it to be committed
+
+        The caller blocks until the batch holding its row is committed, which
+        is usually the batch it started, so a failed write is reported to the
+        request that made it rather than handled later.
+
+        Returns:
+            int: The new resume ID
+
+        Raises:
+            WriteQueueFullError: If the queue stayed full for timeout seconds
+            WriteTimeoutError: If the row wasn't committed within result_timeout seconds
+        """
+        future = self.submit(resume_record, timeout)
+        try:
+            return future.result(result_timeout)
+        except FutureTimeoutError:
+            # Dropped if the writer hasn't taken it yet; otherwise it may still be written later
+            future.cancel()
+            raise WriteTimeoutError(f"Resume not written within {result_timeout}s")
+
+    def _start(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The writer has been shut down")
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        batch = []
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                batch = [item]
+                stopping = False
+                # Gather what arrives while the first result waits, up to a full batch
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(timeout=self.max_delay) if self.max_delay else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                # Skip the results whose submitter stopped waiting
+                batch = [(record, future) for record, future in batch if future.set_running_or_notify_cancel()]
+                if batch:
+                    self._write(batch)
+                batch = []
+                if stopping:
+                    return
+        except Exception as e:
+            # Fail everything waiting rather than leaving submitters blocked; the next submit starts a new thread
+            logger.error(f"Write-behind writer stopped: {str(e)}")
+            self._fail(batch, e)
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    self._fail([item], e)
+
+    @staticmethod
+    def _fail(batch, error):
+        for _, future in batch:
+            if future.done():
+                continue
+            if future.running() or future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def _write(self, batch):
+        with self.app.app_context():
+            try:
+                db.session.add_all(record for record, _ in batch)
+                # Read the IDs before the commit expires the rows
+                db.session.flush()
+                results = [(future, record.id, None) for record, future in batch]
+                db.session.commit()
+            except Exception as e:
+                # Write the rows one by one so a bad row doesn't fail the others
+                logger.error(f"Error writing a batch of {len(batch)} resumes: {str(e)}")
+                db.session.rollback()
+                results = [(future,) + self._write_one(record) for record, future in batch]
+
+            if any(resume_id is not None for _, resume_id, _ in results):
+                try:
+                    refresh_search_indexes()
+                except Exception as e:
+                    # The indexes catch up with the next stored resume
+                    logger.error(f"Error updating resume indexes: {str(e)}")
+            db.session.remove()
+
+        for future, resume_id, error in results:
+            if error is None:
+                future.set_result(resume_id)
+            else:
+                future.set_exception(error)
+
+    def _write_one(self, record):
+        try:
+            db.session.add(record)
+            db.session.flush()
+            resume_id = record.id
+            db.session.commit()
+            return resume_id, None
+        except Exception as e:
+            db.session.rollback()
+            return None, e
+
+    def shutdown(self, timeout=30):
+        """Write everything queued, then stop the writer thread"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.error(f"Write-behind writer did not finish within {timeout}s")
+
+    def _forget(self):
+        # A forked child has the queue and flags but not the thread; start afresh
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+def configure_sqlite(engine):
+    """
+    Apply the SQLITE_* settings to every new connection of a SQLite engine
+
+    WAL lets readers run alongside the single writer instead of waiting for
+    it, synchronous=NORMAL skips the fsync per commit that WAL doesn't need,
+    and the busy timeout makes a second writer wait for the lock instead of
+    failing with "database is locked". Other backends are left alone.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(connection, _):
+        cursor = connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}')
+        if SQLITE_JOURNAL_MODE:
+            cursor.execute(f'PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}')
+        if SQLITE_SYNCHRONOUS:
+            cursor.execute(f'PRAGMA synchronous = {SQLITE_SYNCHRONOUS}')
+        cursor.close()
+
+# Shared by every request in this process
+writer = WriteBehindWriter()
+os.register_at_fork(after_in_child=writer._forget)
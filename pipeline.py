@@ -0,0 +1,315 @@
+import logging
+import numpy as np
+from models import Resume
+from skill_store import set_resume_skills
+from parse_cache import parse_resume_cached
+from metrics import PIPELINE_STAGES, stage_timer
+from skill_extractor import extract_skills
+from analyzer import (
+    analyze_resume, analyze_keyword_match, score_resume, generate_suggestions, flatten_skills
+)
+from scoring import (
+    BOOLEAN_FEATURES, ASSESSMENT_FEATURES, extract_scoring_features, score_feature_arrays, get_scoring_profile
+)
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Stages of the analysis pipeline, in order
+STAGES = [
+    'parse_resume', 'extract_skills', 'analyze_sections', 'analyze_word_count',
+    'analyze_action_verbs', 'identify_common_issues', 'analyze_keyword_match',
+    'score_resume', 'generate_suggestions'
+]
+
+# Stages whose results depend on the job description; the others only depend on the resume
+JD_DEPENDENT_STAGES = ['analyze_keyword_match', 'score_resume', 'generate_suggestions']
+JD_INDEPENDENT_STAGES = [stage for stage in STAGES if stage not in JD_DEPENDENT_STAGES]
+
+# Parsed lists stored with each resume for the results page
+DETAIL_FIELDS = ['education', 'experience', 'projects', 'certifications', 'languages']
+
+def record_stages(run=(), skipped=()):
+    """Count pipeline stages that ran and stages whose stored results were reused (see PIPELINE_STAGES)"""
+    for stage in run:
+        PIPELINE_STAGES.inc(stage=stage, outcome='run')
+    for stage in skipped:
+        PIPELINE_STAGES.inc(stage=stage, outcome='skipped')
+
+def process_upload(data, content_hash, file_type, filename, job_description, job_skills=None, timings=None):
+    """
+    Run the whole pipeline on an uploaded file, up to the unsaved Resume row
+
+    Args:
+        data (bytes): File content
+        content_hash (str): SHA-256 hex digest of the content
+        file_type (str): File extension (pdf, docx, txt)
+        filename (str): Uploaded file name
+        job_description (str): Job description text
+        job_skills (list): Skills already extracted from the job description (optional)
+        timings (StageTimings): Collects the duration of each stage (optional)
+
+    Returns:
+        dict: resume_data, cache_hit, result (see analyze_parsed_resume) and record
+    """
+    # Identical files reuse earlier parser output
+    resume_data, cache_hit = parse_resume_cached(data, content_hash, file_type, timings=timings)
+    logger.debug(f"Resume parsed successfully (cache {'hit' if cache_hit else 'miss'})")
+    if cache_hit:
+        record_stages(skipped=['parse_resume'])
+    else:
+        record_stages(run=['parse_resume'])
+
+    result = analyze_parsed_resume(resume_data, job_description, job_skills, timings)
+    return {
+        'resume_data': resume_data,
+        'cache_hit': cache_hit,
+        'result': result,
+        'record': build_resume_record(filename, resume_data, job_description, result)
+    }
+
+def analyze_parsed_resume(resume_data, job_description, job_skills=None, timings=None):
+    """
+    Run the analysis stages after parsing on a parsed resume
+
+    Args:
+        resume_data (dict): Parsed resume data
+        job_description (str): Job description text
+        job_skills (list): Skills already extracted from the job description (optional)
+        timings (StageTimings): Collects the duration of each stage (optional)
+
+    Returns:
+        dict: skills, analysis, scores and suggestions
+    """
+    with stage_timer(timings, 'extract_skills'):
+        skills = extract_skills(resume_data)
+    logger.debug(f"Extracted skills: {skills}")
+
+    # Keywords are matched against the categorized skills
+    analysis = analyze_resume(dict(resume_data, skills=skills), job_description, job_skills, timings=timings)
+    logger.debug("Resume analysis completed")
+
+    with stage_timer(timings, 'score_resume'):
+        scores = score_resume(resume_data, analysis, job_description)
+    logger.debug(f"Resume scores: {scores}")
+
+    with stage_timer(timings, 'generate_suggestions'):
+        suggestions = generate_suggestions(resume_data, analysis, scores, job_description)
+    logger.debug("Generated suggestions")
+
+    record_stages(run=STAGES[1:])
+    return {
+        'skills': skills,
+        'analysis': analysis,
+        'scores': scores,
+        'suggestions': suggestions
+    }
+
+def stored_analysis(resume):
+    """Rebuild the analysis dict of a stored resume"""
+    return {
+        'sections_analysis': resume.sections_analysis or {},
+        'keyword_match': resume.keyword_match or {},
+        'action_verbs': resume.action_verbs_analysis or {},
+        'word_count': resume.word_count_analysis or {},
+        'common_resume_issues': resume.common_issues or []
+    }
+
+def stored_resume_data(resume):
+    """Rebuild the parsed data kept for a stored resume"""
+    resume_data = {
+        'name': resume.name,
+        'email': resume.email,
+        'phone': resume.phone,
+        'raw_text': resume.raw_text
+    }
+    resume_data.update(resume.parsed_details or {})
+    return resume_data
+
+def stored_scores(resume):
+    """Rebuild the scores dict of a stored resume"""
+    return {
+        'overall': resume.overall_score,
+        'sections': resume.sections_score,
+        'keywords': resume.keywords_score,
+        'action_verbs': resume.action_verbs_score,
+        'word_count': resume.word_count_score,
+        'issues': resume.issues_score,
+        'grade': resume.grade
+    }
+
+def reanalyze_resume(resume, job_description, job_skills=None):
+    """
+    Analyze a stored resume against another job description
+
+    Parsing, skill extraction and the resume-only checks (sections, word
+    count, action verbs, common issues) do not depend on the job
+    description, so their stored results are reused. Only the keyword
+    match, the scores and the suggestions are recomputed.
+
+    Args:
+        resume (Resume): Stored resume
+        job_description (str): Job description text
+        job_skills (list): Skills already extracted from the job description (optional)
+
+    Returns:
+        dict: resume_data, skills, analysis, scores, suggestions, and the stages
+            that were run and skipped
+    """
+    resume_data = stored_resume_data(resume)
+    skills = resume.skills or {}
+
+    analysis = stored_analysis(resume)
+    analysis['keyword_match'] = analyze_keyword_match({'skills': skills}, job_description, job_skills)
+
+    scores = score_resume(resume_data, analysis, job_description)
+    suggestions = generate_suggestions(resume_data, analysis, scores, job_description)
+
+    record_stages(run=JD_DEPENDENT_STAGES, skipped=JD_INDEPENDENT_STAGES)
+    logger.debug(f"Re-analyzed resume {resume.id}; skipped {', '.join(JD_INDEPENDENT_STAGES)}")
+    return {
+        'resume_data': resume_data,
+        'skills': skills,
+        'analysis': analysis,
+        'scores': scores,
+        'suggestions': suggestions,
+        'stages': {'run': list(JD_DEPENDENT_STAGES), 'skipped': list(JD_INDEPENDENT_STAGES)}
+    }
+
+# Columns of each row returned by match_job_descriptions; job_skill_count is the number of the job description's skills
+MATCH_COLUMNS = ['job_description_id', 'matched', 'job_skill_count', 'match_percentage',
+                 'keywords_score', 'overall_score', 'grade']
+
+def match_job_descriptions(resume_data, job_entries, skills=None, analysis=None):
+    """
+    Match one resume against many job descriptions
+
+    The resume is analyzed once without a job description; skills and the
+    resume-only analyses are shared by every job description. Each job
+    description then only costs a keyword match against the resume's
+    skill set, and all of them are scored in one vectorized pass.
+
+    Args:
+        resume_data (dict): Parsed resume data
+        job_entries (list): Job descriptions with id and skills (CachedJobDescription)
+        skills (dict): Skills already extracted from the resume (optional)
+        analysis (dict): Resume-only analysis already computed for the resume (optional)
+
+    Returns:
+        dict: 'columns' (MATCH_COLUMNS) and 'rows', one per job description in the given order
+    """
+    run = []
+    if skills is None:
+        skills = extract_skills(resume_data)
+        run.append('extract_skills')
+    if analysis is None:
+        analysis = analyze_resume(dict(resume_data, skills=skills), '')
+        run.extend(JD_INDEPENDENT_STAGES[2:])
+
+    resume_skills_lower = {skill.lower() for skill in flatten_skills(skills)}
+
+    # Same counting as analyze_keyword_match: every job skill is looked up in the resume's skill set
+    matched = np.array([sum(1 for skill in entry.skills if skill.lower() in resume_skills_lower)
+                        for entry in job_entries], dtype=np.int64)
+    totals = np.array([len(entry.skills) for entry in job_entries], dtype=np.int64)
+    # A job description without skills matches 0%, as in analyze_keyword_match
+    match_percentage = np.zeros(len(job_entries))
+    has_skills = totals > 0
+    match_percentage[has_skills] = matched[has_skills] / totals[has_skills] * 100
+
+    # Only the match percentage differs between job descriptions
+    features = extract_scoring_features(resume_data, analysis)
+    arrays = {}
+    for column, value in features.items():
+        if column == 'match_percentage':
+            arrays[column] = match_percentage
+        elif column in BOOLEAN_FEATURES:
+            arrays[column] = np.full(len(job_entries), bool(value))
+        elif column in ASSESSMENT_FEATURES:
+            arrays[column] = np.full(len(job_entries), value or '')
+        else:
+            arrays[column] = np.full(len(job_entries), float(value or 0))
+    scores = score_feature_arrays(arrays)
+
+    record_stages(run=run + ['analyze_keyword_match', 'score_resume'] * len(job_entries))
+    rows = [list(row) for row in zip(
+        [entry.id for entry in job_entries],
+        matched.tolist(),
+        totals.tolist(),
+        match_percentage.tolist(),
+        scores['keywords'].tolist(),
+        scores['overall'].tolist(),
+        scores['grade'].tolist()
+    )]
+    return {'columns': list(MATCH_COLUMNS), 'rows': rows}
+
+def analysis_payload(resume_data, result, cache_hit=None, include_text=False):
+    """
+    Combine parser output and analysis into one JSON-serializable payload
+
+    Args:
+        resume_data (dict): Parsed resume data
+        result (dict): skills, analysis, scores and suggestions
+        cache_hit (bool): Whether the parse came from the cache (optional)
+        include_text (bool): Keep the extracted raw text, usually the largest field
+
+    Returns:
+        dict: resume_data, skills, analysis, scores, suggestions and cache_hit
+    """
+    if not include_text:
+        resume_data = {key: value for key, value in resume_data.items() if key != 'raw_text'}
+    return {
+        'resume_data': resume_data,
+        'skills': result['skills'],
+        'analysis': result['analysis'],
+        'scores': result['scores'],
+        'suggestions': result['suggestions'],
+        'cache_hit': cache_hit
+    }
+
+def build_resume_record(filename, resume_data, job_description, result):
+    """
+    Create (but do not add) the Resume row for an analysis
+
+    Args:
+        filename (str): Uploaded file name
+        resume_data (dict): Parsed resume data
+        job_description (str): Job description text
+        result (dict): skills, analysis, scores and suggestions
+
+    Returns:
+        Resume: The new record
+    """
+    analysis, scores = result['analysis'], result['scores']
+
+    resume_record = Resume()
+    resume_record.filename = filename
+    resume_record.name = resume_data.get('name', 'Unknown')
+    resume_record.email = resume_data.get('email', '')
+    resume_record.phone = resume_data.get('phone', '')
+    resume_record.raw_text = resume_data.get('raw_text', '')
+    resume_record.job_description = job_description
+    resume_record.skills = result['skills']
+    resume_record.sections_analysis = analysis.get('sections_analysis', {})
+    resume_record.keyword_match = analysis.get('keyword_match', {})
+    resume_record.action_verbs_analysis = analysis.get('action_verbs', {})
+    resume_record.word_count_analysis = analysis.get('word_count', {})
+    resume_record.common_issues = analysis.get('common_resume_issues', [])
+    resume_record.overall_score = scores.get('overall', 0)
+    resume_record.sections_score = scores.get('sections', 0)
+    resume_record.keywords_score = scores.get('keywords', 0)
+    resume_record.action_verbs_score = scores.get('action_verbs', 0)
+    resume_record.word_count_score = scores.get('word_count', 0)
+    resume_record.issues_score = scores.get('issues', 0)
+    resume_record.grade = scores.get('grade', 'F')
+    resume_record.suggestions = result['suggestions']
+    resume_record.parsed_details = {field: resume_data.get(field, []) for field in DETAIL_FIELDS}
+    set_resume_skills(resume_record, result['skills'])
+
+    # Keep the scoring inputs so the history can be re-scored with new weights
+    for column, value in extract_scoring_features(resume_data, analysis).items():
+        setattr(resume_record, column, value)
+    resume_record.scoring_profile = get_scoring_profile()['version']
+
+    return resume_record
@@ -0,0 +1,232 @@
+import time
+import logging
+import numpy as np
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.orm import load_only
+from models import db, Resume
+from analyzer import generate_suggestions, overall_score_band
+from pipeline import stored_analysis
+from scoring import (
+    FEATURE_COLUMNS, SCORE_COLUMNS, BOOLEAN_FEATURES, ASSESSMENT_FEATURES,
+    extract_scoring_features, score_feature_arrays, load_scoring_profile
+)
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Resume columns holding each score
+SCORE_FIELDS = {
+    'sections': 'sections_score',
+    'keywords': 'keywords_score',
+    'action_verbs': 'action_verbs_score',
+    'word_count': 'word_count_score',
+    'issues': 'issues_score',
+    'overall': 'overall_score'
+}
+
+def backfill_scoring_features(batch_size=1000):
+    """
+    Fill in scoring features for resumes stored before they were persisted
+
+    The features are recovered from the stored analysis JSON, walking the
+    table in id order and committing one batch at a time.
+
+    Returns:
+        int: Number of resumes updated
+    """
+    table = Resume.__table__
+    statement = (update(table)
+                 .where(table.c.id == bindparam('resume_id'))
+                 .values({column: bindparam(column) for column in FEATURE_COLUMNS}))
+    updated = 0
+    last_id = 0
+
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, table.c.email, table.c.phone, table.c.sections_analysis,
+                   table.c.keyword_match, table.c.action_verbs_analysis,
+                   table.c.word_count_analysis, table.c.common_issues)
+            .where(table.c.id > last_id, table.c.issue_count.is_(None))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        parameters = []
+        for row in rows:
+            analysis = {
+                'sections_analysis': row.sections_analysis or {},
+                'keyword_match': row.keyword_match or {},
+                'action_verbs': row.action_verbs_analysis or {},
+                'word_count': row.word_count_analysis or {},
+                'common_resume_issues': row.common_issues or []
+            }
+            features = extract_scoring_features({'email': row.email, 'phone': row.phone}, analysis)
+            parameters.append(dict(features, resume_id=row.id))
+
+        db.session.execute(statement, parameters)
+
+        stale = [row for row, is_stale in zip(parameters, stale_suggestions[start:start + batch_size]) if is_stale]
+        if stale:
+            suggestions = rebuild_suggestions(stale)
+            db.session.execute(suggestions_statement, [
+                {'resume_id': resume_id, 'suggestions': value} for resume_id, value in suggestions.items()
+            ])
+            suggestions_updated += len(suggestions)
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+
+    if updated:
+        logger.info(f"Backfilled scoring features for {updated} resumes")
+    return updated
+
+def load_feature_arrays():
+    """
+    Load the scoring features and current scores of all resumes into NumPy arrays
+
+    Returns:
+        tuple: (resume ids, FEATURE_COLUMNS mapped to arrays, SCORE_COLUMNS plus 'grade' and
+            'profile' mapped to the stored values)
+    """
+    table = Resume.__table__
+    stored_columns = [SCORE_FIELDS[score] for score in SCORE_COLUMNS] + ['grade', 'scoring_profile']
+    rows = db.session.execute(
+        select(table.c.id, *[table.c[column] for column in FEATURE_COLUMNS + stored_columns])
+        .where(table.c.issue_count.isnot(None))
+        .order_by(table.c.id)
+    ).all()
+
+    columns = list(zip(*rows)) if rows else [()] * (1 + len(FEATURE_COLUMNS) + len(stored_columns))
+    ids = np.array(columns[0], dtype=np.int64)
+
+    features = {}
+    for column, values in zip(FEATURE_COLUMNS, columns[1:]):
+        if column in BOOLEAN_FEATURES:
+            features[column] = np.array(values, dtype=bool)
+        elif column in ASSESSMENT_FEATURES:
+            features[column] = np.array([value or '' for value in values], dtype=str)
+        else:
+            # None becomes NaN: no job description for match_percentage
+            features[column] = np.array(values, dtype=float)
+    features['action_verb_density'] = np.nan_to_num(features['action_verb_density'])
+    features['unique_action_verbs'] = np.nan_to_num(features['unique_action_verbs'])
+
+    stored = {}
+    for column, values in zip(SCORE_COLUMNS + ['grade', 'profile'], columns[1 + len(FEATURE_COLUMNS):]):
+        if column in SCORE_COLUMNS:
+            stored[column] = np.array(values, dtype=float)
+        else:
+            stored[column] = np.array([value or '' for value in values], dtype=str)
+
+    return ids, features, stored
+
+def rescore_resumes(profile_version=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Re-score every stored resume with a weight profile
+
+    Features are loaded once, scored for the whole table in one vectorized
+    pass, and only rows whose scores, grade or profile changed are written
+    back, one committed batch at a time.
+
+    Args:
+        profile_version (str): Weight profile version (default: the active profile)
+        batch_size (int): Rows per UPDATE batch
+
+    Returns:
+        dict: Row counts and timings
+    """
+    profile = load_scoring_profile(profile_version)
+    started = time.perf_counter()
+
+    backfilled = backfill_scoring_features(batch_size=batch_size)
+
+    ids, features, stored = load_feature_arrays()
+    loaded = time.perf_counter()
+
+    scores = score_feature_arrays(features, profile)
+    scored = time.perf_counter()
+
+    changed = (stored['profile'] != profile['version']) | (stored['grade'] != scores['grade'])
+    for column in SCORE_COLUMNS:
+        # NaN != NaN, so rows without stored scores count as changed
+        changed |= stored[column] != scores[column]
+    positions = np.flatnonzero(changed)
+
+    # Suggestions depend on the overall score only through its band, so they are rebuilt only where it moved
+    stale_suggestions = np.array([
+        np.isnan(previous) or overall_score_band(previous) != overall_score_band(current)
+        for previous, current in zip(stored['overall'][positions].tolist(), scores['overall'][positions].tolist())
+    ], dtype=bool)
+
+    table = Resume.__table__
+    statement = (update(table)
+                 .where(table.c.id == bindparam('resume_id'))
+                 .values({field: bindparam(field) for field in list(SCORE_FIELDS.values()) + ['grade', 'scoring_profile']}))
+    suggestions_statement = (update(table)
+                             .where(table.c.id == bindparam('resume_id'))
+                             .values(suggestions=bindparam('suggestions')))
+    suggestions_updated = 0
+
+    for start in range(0, len(positions), batch_size):
+        batch = positions[start:start + batch_size]
+        columns = {SCORE_FIELDS[score]: scores[score][batch].tolist() for score in SCORE_COLUMNS}
+        columns['grade'] = scores['grade'][batch].tolist()
+        parameters = [
+            dict(zip(columns, values), resume_id=resume_id, scoring_profile=profile['version'])
+            for resume_id, *values in zip(ids[batch].tolist(), *columns.values())
+        ]
+        db.session.execute(statement, parameters)
+
+        stale = [row for row, is_stale in zip(parameters, stale_suggestions[start:start + batch_size]) if is_stale]
+        if stale:
+            suggestions = rebuild_suggestions(stale)
+            db.session.execute(suggestions_statement, [
+                {'resume_id': resume_id, 'suggestions': value} for resume_id, value in suggestions.items()
+            ])
+            suggestions_updated += len(suggestions)
+        db.session.commit()
+
+    finished = time.perf_counter()
+    result = {
+        'profile': profile['version'],
+        'backfilled': backfilled,
+        'resumes': len(ids),
+        'updated': len(positions),
+        'suggestions_updated': suggestions_updated,
+        'load_seconds': round(loaded - started, 3),
+        'score_seconds': round(scored - loaded, 3),
+        'write_seconds': round(finished - scored, 3)
+    }
+    logger.info(f"Re-scored resumes: {result}")
+    return result
+
+def rebuild_suggestions(rows):
+    """
+    Regenerate the suggestions of re-scored resumes from their stored analysis
+
+    Args:
+        rows (list): UPDATE parameters of rescore_resumes, with resume_id and the new scores
+
+    Returns:
+        dict: Resume ID mapped to its new suggestions
+    """
+    new_scores = {row['resume_id']: row for row in rows}
+    resumes = db.session.query(Resume).options(load_only(
+        Resume.sections_analysis, Resume.keyword_match, Resume.action_verbs_analysis,
+        Resume.word_count_analysis, Resume.common_issues
+    )).filter(Resume.id.in_(list(new_scores))).all()
+
+    suggestions = {}
+    for resume in resumes:
+        row = new_scores[resume.id]
+        scores = {score: row[field] for score, field in SCORE_FIELDS.items()}
+        scores['grade'] = row['grade']
+        # generate_suggestions reads only the analysis and the scores
+        suggestions[resume.id] = generate_suggestions({}, stored_analysis(resume), scores, None)
+    db.session.expunge_all()
+    return suggestions
@@ -0,0 +1,95 @@
+import os
+import uuid
+import logging
+from flask import render_template, get_flashed_messages
+from models import db, Resume
+from lru import LRUCache
+from pipeline import stored_resume_data, stored_analysis, stored_scores
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Rendered results pages kept per process
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 256))
+
+# Analyses that could not be saved, kept in this process only so /results can still show them
+UNSAVED_RESULT_CACHE_SIZE = 64
+
+UNSAVED_PREFIX = 'unsaved-'
+
+_rendered = LRUCache(RESULT_CACHE_SIZE)
+_unsaved = LRUCache(UNSAVED_RESULT_CACHE_SIZE)
+
+def result_payload(resume):
+    """Return the results page variables of a stored resume"""
+    return {
+        'resume_data': stored_resume_data(resume),
+        'skills': resume.skills,
+        'analysis': stored_analysis(resume),
+        'scores': stored_scores(resume),
+        'suggestions': resume.suggestions
+    }
+
+def store_unsaved_result(resume_data, result, source_id=None):
+    """
+    Keep an analysis that isn't stored as a resume (its save failed, or it wasn't asked for)
+
+    Args:
+        resume_data (dict): Parsed resume data
+        result (dict): skills, analysis, scores and suggestions
+        source_id (int): Stored resume the analysis was made from, so the page still offers re-analysis (optional)
+
+    Returns:
+        str: Result ID to keep in the session
+    """
+    result_id = UNSAVED_PREFIX + uuid.uuid4().hex
+    _unsaved.put(result_id, {
+        'source_id': source_id,
+        'resume_data': resume_data,
+        'skills': result['skills'],
+        'analysis': result['analysis'],
+        'scores': result['scores'],
+        'suggestions': result['suggestions']
+    })
+    return result_id
+
+def render_result(result_id):
+    """
+    Render the results page of a stored resume or an unsaved analysis
+
+    Pages of stored resumes are cached, keyed by the resume's scoring
+    profile and overall score too so a re-scored resume is rendered again.
+    Pages carrying flashed messages are not cached.
+
+    Args:
+        result_id: Resume ID, or an ID returned by store_unsaved_result
+
+    Returns:
+        str: The page, or None if the result no longer exists
+    """
+    if isinstance(result_id, str) and result_id.startswith(UNSAVED_PREFIX):
+        payload = _unsaved.get(result_id)
+        if payload is None:
+            return None
+        payload = dict(payload)
+        return render_template('results.html', resume_id=payload.pop('source_id'), **payload)
+
+    version = (db.session.query(Resume.scoring_profile, Resume.overall_score)
+               .filter(Resume.id == result_id)
+               .first())
+    if version is None:
+        return None
+
+    key = (result_id, version.scoring_profile, version.overall_score)
+    cacheable = not get_flashed_messages()
+    if cacheable:
+        page = _rendered.get(key)
+        if page is not None:
+            return page
+
+    resume = db.session.get(Resume, result_id)
+    page = render_template('results.html', resume_id=resume.id, **result_payload(resume))
+    if cacheable:
+        _rendered.put(key, page)
+    return page
@@ -1,82 +1,383 @@
+import os
 import logging
 import re
 import io
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import pdfplumber
-from docx import Document
+from docx_reader import iter_docx_text
+from section_index import SectionIndex, SECTION_HEADERS
+from metrics import stage_timer
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Try to import spaCy, but provide a fallback if it's not available
-try:
-    import spacy
-    nlp = spacy.load('en_core_web_sm')
-    logger.info("SpaCy model loaded successfully")
-except ImportError:
-    logger.warning("SpaCy model not available. Using basic parsing methods instead.")
-    nlp = None
+# Bump whenever parsing output changes so cached results are not reused
+PARSER_VERSION = '5'
 
-def parse_resume(filepath, file_extension):
+# PDFs with at least this many pages have their pages extracted across a process pool.
+# See benchmarks/bench_pdf_pages.py for how the crossover point was measured.
+PDF_PARALLEL_PAGE_THRESHOLD = int(os.environ.get('PDF_PARALLEL_PAGE_THRESHOLD', 12))
+PDF_PARALLEL_WORKERS = int(os.environ.get('PDF_PARALLEL_WORKERS', min(4, os.cpu_count() or 1)))
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+class ExtractionBudget:
+    """Limits on how much of a document is extracted before analysis starts"""
+    
+    def __init__(self, max_pages=None, max_chars=None, deadline_seconds=None):
+        """
+        Args:
+            max_pages (int): Maximum number of PDF pages to extract
+            max_chars (int): Maximum number of characters to keep
+            deadline_seconds (float): Wall-clock time after which extraction stops
+        """
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.deadline_seconds = deadline_seconds
+    
+    def cache_key(self):
+        """Identify the deterministic limits, for caching truncated results"""
+        return f"{self.max_pages or 0}-{self.max_chars or 0}"
+
+def parse_resume(source, file_extension, budget=None, timings=None):
     """
     Parse a resume file and extract information
     
     Args:
-        filepath (str): Path to the resume file
+        source: Path to the resume file, its content as bytes or memoryview,
+            or a readable binary stream (e.g. FileStorage.stream)
         file_extension (str): File extension (pdf, docx, txt)
+        budget (ExtractionBudget): Limits on the extracted text (optional)
+        timings (StageTimings): Collects the duration of each stage (optional)
         
     Returns:
-        dict: Extracted resume data
+        dict: Extracted resume data; 'extraction' reports whether the text was truncated
     """
-    logger.debug(f"Parsing resume: {filepath} with extension {file_extension}")
-    
-    text = ""
+    logger.debug(f"Parsing resume: {describe_source(source)} with extension {file_extension}")
+    if not isinstance(source, (str, os.PathLike, bytes, bytearray, memoryview)):
+        # A stream can only be read once; peek_contact_info may need the start of the document again
+        source = source.read()
     
     try:
-        if file_extension == 'pdf':
-            text = extract_text_from_pdf(filepath)
-        elif file_extension == 'docx':
-            text = extract_text_from_docx(filepath)
-        elif file_extension == 'txt':
-            with open(filepath, 'r', encoding='utf-8') as f:
-                text = f.read()
-        else:
-            raise ValueError(f"Unsupported file extension: {file_extension}")
+        with stage_timer(timings, 'extract_text'):
+            text, extraction = extract_document_text(source, file_extension, budget)
         
         # Extract resume information
-        resume_data = extract_resume_data(text)
+        with stage_timer(timings, 'extract_resume_data'):
+            resume_data = extract_resume_data(text)
+        resume_data['extraction'] = extraction
+        
+        missing = [field for field, placeholder in CONTACT_NOT_FOUND.items() if resume_data[field] == placeholder]
+        if extraction['truncated_by'] == 'deadline' and missing:
+            # Contact details sit on the first page; resolve them even if the deadline hit first
+            contact = peek_contact_info(source, file_extension)
+            for field in missing:
+                resume_data[field] = contact[field]
         return resume_data
         
     except Exception as e:
         logger.error(f"Error parsing resume: {str(e)}")
         raise
 
-def extract_text_from_pdf(filepath):
-    """Extract text from a PDF file"""
-    logger.debug(f"Extracting text from PDF: {filepath}")
-    text = ""
+# What extract_name, extract_email and extract_phone return when they find nothing
+CONTACT_NOT_FOUND = {'name': "Name not detected", 'email': "Email not found", 'phone': "Phone not found"}
+
+def extract_document_text(source, file_extension, budget=None):
+    """
+    Extract the text of a document, stopping early when the budget runs out
+    
+    Args:
+        source: Path, bytes, memoryview or binary stream of the document
+        file_extension (str): File extension (pdf, docx, txt)
+        budget (ExtractionBudget): Limits on the extracted text (optional)
+        
+    Returns:
+        tuple: (text, extraction info with pages, characters and truncation details)
+    """
+    max_pages = budget.max_pages if budget else None
+    text, extraction = collect_text(iter_document_text(source, file_extension, max_pages), budget)
+    if file_extension != 'pdf':
+        extraction['pages'] = None
+    return text, extraction
+
+def iter_document_text(source, file_extension, max_pages=None):
+    """
+    Yield the text of a document incrementally
+    
+    PDFs yield one chunk per page, DOCX files one per paragraph and text
+    files one per line, so callers can stop as soon as they have enough.
+    """
+    if file_extension == 'pdf':
+        return iter_pdf_pages(source, max_pages=max_pages)
+    elif file_extension == 'docx':
+        return iter_docx_paragraphs(source)
+    elif file_extension == 'txt':
+        return iter_txt_lines(source)
+    raise ValueError(f"Unsupported file extension: {file_extension}")
+
+def collect_text(chunks, budget=None):
+    """
+    Join text chunks until they run out or the budget is exhausted
+    
+    Args:
+        chunks (generator): Text chunks; a generator may return the total number
+            of chunks in the document when it stops early because of a page limit
+        budget (ExtractionBudget): Limits on the extracted text (optional)
+        
+    Returns:
+        tuple: (text, extraction info)
+    """
+    max_chars = budget.max_chars if budget else None
+    deadline = None
+    if budget and budget.deadline_seconds is not None:
+        deadline = time.monotonic() + budget.deadline_seconds
+    
+    parts = []
+    characters = 0
+    consumed = 0
+    total = None
+    truncated_by = None
+    
+    try:
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                truncated_by = 'deadline'
+                break
+            try:
+                chunk = next(chunks)
+            except StopIteration as stop:
+                total = stop.value
+                break
+            
+            consumed += 1
+            if max_chars is not None and characters + len(chunk) > max_chars:
+                parts.append(chunk[:max_chars - characters])
+                characters = max_chars
+                truncated_by = 'max_chars'
+                break
+            parts.append(chunk)
+            characters += len(chunk)
+    finally:
+        # Stops any remaining extraction work (open files, queued PDF pages)
+        chunks.close()
+    
+    if truncated_by is None and total is not None and consumed < total:
+        truncated_by = 'max_pages'
+    if truncated_by:
+        logger.warning(f"Extraction stopped early ({truncated_by}) after {consumed} chunks")
+    
+    return "".join(parts), {
+        'pages': consumed,
+        'characters': characters,
+        'truncated': truncated_by is not None,
+        'truncated_by': truncated_by
+    }
+
+def peek_contact_info(source, file_extension, min_chars=2000):
+    """
+    Resolve contact fields from the start of a document without extracting the rest
+    
+    Reads the first PDF page (or the first min_chars characters of other formats).
+    
+    Returns:
+        dict: name, email and phone as returned by the individual extractors
+    """
+    chunks = iter_document_text(source, file_extension)
+    parts = []
+    characters = 0
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            characters += len(chunk)
+            if file_extension == 'pdf' or characters >= min_chars:
+                break
+    finally:
+        chunks.close()
+    
+    text = "".join(parts)
+    return {
+        'name': extract_name(text),
+        'email': extract_email(text),
+        'phone': extract_phone(text)
+    }
+
+def describe_source(source):
+    """Describe a resume source for log messages"""
+    if isinstance(source, (str, os.PathLike)):
+        return str(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<{len(source)} bytes in memory>"
+    return f"<{type(source).__name__} stream>"
+
+def open_source(source):
+    """
+    Return something the PDF and DOCX backends can open
+    
+    Paths and streams are passed through unchanged; in-memory content is
+    wrapped in a BytesIO so nothing has to be written to disk.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+def extract_text_from_pdf(source, parallel=None):
+    """
+    Extract text from a PDF file, bytes or binary stream
+    
+    Args:
+        source: Path, bytes, memoryview or binary stream of the PDF
+        parallel (bool): Force (True) or disable (False) parallel page extraction;
+            by default documents with PDF_PARALLEL_PAGE_THRESHOLD pages or more are split
+        
+    Returns:
+        str: Text of all pages, in page order
+    """
+    logger.debug(f"Extracting text from PDF: {describe_source(source)}")
     try:
-        with pdfplumber.open(filepath) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-        return text
+        return "".join(iter_pdf_pages(source, parallel=parallel))
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         raise
 
-def extract_text_from_docx(filepath):
-    """Extract text from a DOCX file"""
-    logger.debug(f"Extracting text from DOCX: {filepath}")
-    text = ""
+def iter_pdf_pages(source, parallel=None, max_pages=None):
+    """
+    Yield the text of each PDF page in order
+    
+    Args:
+        source: Path, bytes, memoryview or binary stream of the PDF
+        parallel (bool): Force or disable parallel page extraction (default: by page count)
+        max_pages (int): Stop after this many pages
+        
+    Returns:
+        int: Total number of pages in the document (as the generator's return value)
+    """
+    if not isinstance(source, (str, os.PathLike, bytes, bytearray, memoryview)):
+        # Workers need something picklable; streams are read into memory once
+        source = source.read()
+    
+    with pdfplumber.open(open_source(source)) as pdf:
+        total_pages = len(pdf.pages)
+        page_count = total_pages if max_pages is None else min(total_pages, max_pages)
+        if parallel is None:
+            parallel = PDF_PARALLEL_WORKERS > 1 and page_count >= PDF_PARALLEL_PAGE_THRESHOLD
+        if not parallel:
+            for page in pdf.pages[:page_count]:
+                yield page.extract_text() or ""
+            return total_pages
+    
+    yield from iter_pdf_pages_parallel(source, page_count)
+    return total_pages
+
+def extract_pdf_pages_parallel(source, page_count, workers=None):
+    """Extract page texts across the PDF process pool and return them in page order"""
+    return list(iter_pdf_pages_parallel(source, page_count, workers))
+
+def iter_pdf_pages_parallel(source, page_count, workers=None):
+    """
+    Yield page texts extracted across the PDF process pool
+    
+    Each worker opens its own copy of the document and extracts a contiguous
+    range of pages; pages are yielded in order as their range completes.
+    Ranges still queued are cancelled when the generator is closed early.
+    
+    Args:
+        source: Path or bytes of the PDF
+        page_count (int): Number of pages to extract
+        workers (int): Number of workers to spread the pages over
+    """
+    workers = workers or PDF_PARALLEL_WORKERS
+    if isinstance(source, memoryview):
+        source = bytes(source)
+    
+    # Two ranges per worker keeps workers busy when some pages are slower than others
+    ranges = max(1, min(page_count, workers * 2))
+    bounds = [page_count * i // ranges for i in range(ranges + 1)]
+    page_ranges = [(start, stop) for start, stop in zip(bounds, bounds[1:]) if start < stop]
+    
+    pool = _get_pdf_pool()
+    futures = [pool.submit(_extract_pdf_page_range, source, start, stop) for start, stop in page_ranges]
+    try:
+        for (start, stop), future in zip(page_ranges, futures):
+            try:
+                page_texts = future.result()
+            except BrokenProcessPool as e:
+                logger.warning(f"PDF worker pool failed ({str(e)}), extracting remaining pages serially")
+                _reset_pdf_pool()
+                with pdfplumber.open(open_source(source)) as pdf:
+                    for page in pdf.pages[start:page_count]:
+                        yield page.extract_text() or ""
+                return
+            yield from page_texts
+    finally:
+        for future in futures:
+            future.cancel()
+
+def _extract_pdf_page_range(source, start, stop):
+    """Extract the text of pages [start, stop) in a worker process"""
+    with pdfplumber.open(open_source(source)) as pdf:
+        return [pdf.pages[number].extract_text() or "" for number in range(start, stop)]
+
+def _get_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_PARALLEL_WORKERS)
+        return _pdf_pool
+
+def _forget_pdf_pool():
+    # A forked child inherits the parent's executor object but none of its worker processes
+    global _pdf_pool, _pdf_pool_lock
+    _pdf_pool = None
+    _pdf_pool_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_forget_pdf_pool)
+
+def _reset_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+def extract_text_from_docx(source):
+    """Extract text from a DOCX file, bytes or binary stream"""
+    logger.debug(f"Extracting text from DOCX: {describe_source(source)}")
     try:
-        doc = Document(filepath)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
+        return "".join(iter_docx_paragraphs(source))
     except Exception as e:
         logger.error(f"Error extracting text from DOCX: {str(e)}")
         raise
 
+def iter_docx_paragraphs(source):
+    """Yield the text of each DOCX paragraph, table cell and text box, newline terminated"""
+    return iter_docx_text(open_source(source))
+
+def extract_text_from_txt(source):
+    """Extract text from a UTF-8 text file, bytes or binary stream"""
+    return "".join(iter_txt_lines(source))
+
+def iter_txt_lines(source):
+    """Yield the lines of a UTF-8 text file, bytes or binary stream"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from f
+        return
+    
+    # Decode with universal newlines, exactly like reading the file in text mode
+    wrapper = io.TextIOWrapper(open_source(source), encoding='utf-8')
+    try:
+        # Not `yield from`: closing this generator early would close the wrapper and the stream with it
+        for line in wrapper:
+            yield line
+    finally:
+        # Leave the caller's stream open
+        wrapper.detach()
+
 def extract_resume_data(text):
     """
     Extract structured data from resume text
@@ -89,25 +390,28 @@ def extract_resume_data(text):
     """
     logger.debug("Extracting structured data from resume text")
     
+    # Locate every section in one pass and share the index between extractors
+    index = SectionIndex(text)
+    
     resume_data = {
         'raw_text': text,
         'name': extract_name(text),
         'email': extract_email(text),
         'phone': extract_phone(text),
-        'education': extract_education(text),
-        'experience': extract_experience(text),
-        'skills': extract_skills_from_text(text),
-        'projects': extract_projects(text),
-        'certifications': extract_certifications(text),
-        'languages': extract_languages(text),
-        'sections': identify_sections(text)
+        'education': extract_education(text, index),
+        'experience': extract_experience(text, index),
+        'skills': extract_skills_from_text(text, index),
+        'projects': extract_projects(text, index),
+        'certifications': extract_certifications(text, index),
+        'languages': extract_languages(text, index),
+        'sections': identify_sections(text, index),
+        'section_spans': index.spans()
     }
     
     return resume_data
 
 def extract_name(text):
     """Extract name from text using basic regex patterns"""
-    # We're skipping spaCy since it's not available
     # Use simple method to extract name based on first few lines
     
     # Fallback to first line if no name entity was found
@@ -117,13 +421,13 @@ def extract_name(text):
         if line and len(line) > 3 and len(line.split()) <= 5:
             return line
     
-    return "Name not detected"
+    return CONTACT_NOT_FOUND['name']
 
 def extract_email(text):
     """Extract email address from text"""
     email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
     emails = re.findall(email_pattern, text)
-    return emails[0] if emails else "Email not found"
+    return emails[0] if emails else CONTACT_NOT_FOUND['email']
 
 def extract_phone(text):
     """Extract phone number from text"""
@@ -144,14 +448,14 @@ def extract_phone(text):
         if matches:
             return matches[0]
     
-    return "Phone not found"
+    return CONTACT_NOT_FOUND['phone']
 
-def extract_education(text):
+def extract_education(text, index=None):
     """Extract education information from text"""
     education = []
     
     # Identify education section
-    education_section = extract_section(text, ['EDUCATION', 'ACADEMIC BACKGROUND'])
+    education_section = extract_section(text, SECTION_HEADERS['education'], index)
     if education_section:
         # Look for common degree patterns
         degree_patterns = [
@@ -190,12 +494,12 @@ def extract_education(text):
     
     return education if education else [{"details": "Education section not found"}]
 
-def extract_experience(text):
+def extract_experience(text, index=None):
     """Extract work experience information from text"""
     experience = []
     
     # Identify experience section
-    experience_section = extract_section(text, ['EXPERIENCE', 'WORK EXPERIENCE', 'EMPLOYMENT', 'WORK HISTORY'])
+    experience_section = extract_section(text, SECTION_HEADERS['experience'], index)
     if experience_section:
         # Split by date patterns or company names
         date_pattern = r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|January|February|March|April|May|June|July|August|September|October|November|December)\.?[\s,]*\d{4}|[\d]{1,2}/[\d]{4}|[\d]{4})\s*(-|–|to)\s*((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|January|February|March|April|May|June|July|August|September|October|November|December)\.?[\s,]*\d{4}|[\d]{1,2}/[\d]{4}|[\d]{4}|Present|Current|Now)'
@@ -249,9 +553,9 @@ def extract_experience(text):
     
     return experience if experience else [{"description": "Experience section not found"}]
 
-def extract_skills_from_text(text):
+def extract_skills_from_text(text, index=None):
     """Extract skills from text (basic version, more comprehensive in skill_extractor.py)"""
-    skills_section = extract_section(text, ['SKILLS', 'TECHNICAL SKILLS', 'CORE COMPETENCIES'])
+    skills_section = extract_section(text, SECTION_HEADERS['skills'], index)
     if skills_section:
         # Simple extraction: split by commas, bullets, or new lines
         skills_text = re.sub(r'•|·|\*|›|✓|✔|▪|▫|-|\|', ',', skills_section)
@@ -260,9 +564,9 @@ def extract_skills_from_text(text):
     
     return []
 
-def extract_projects(text):
+def extract_projects(text, index=None):
     """Extract project information from text"""
-    projects_section = extract_section(text, ['PROJECTS', 'PROJECT EXPERIENCE', 'ACADEMIC PROJECTS'])
+    projects_section = extract_section(text, SECTION_HEADERS['projects'], index)
     if projects_section:
         # Split by project titles or bullet points
         projects = []
@@ -293,9 +597,9 @@ def extract_projects(text):
     
     return []
 
-def extract_certifications(text):
+def extract_certifications(text, index=None):
     """Extract certification information from text"""
-    cert_section = extract_section(text, ['CERTIFICATIONS', 'CERTIFICATES', 'PROFESSIONAL CERTIFICATIONS'])
+    cert_section = extract_section(text, SECTION_HEADERS['certifications'], index)
     if cert_section:
         # Split by new lines and bullet points
         cert_text = re.sub(r'•|·|\*|›|✓|✔|▪|▫|-', '\n', cert_section)
@@ -304,9 +608,9 @@ def extract_certifications(text):
     
     return []
 
-def extract_languages(text):
+def extract_languages(text, index=None):
     """Extract language information from text"""
-    lang_section = extract_section(text, ['LANGUAGES', 'LANGUAGE SKILLS'])
+    lang_section = extract_section(text, SECTION_HEADERS['languages'], index)
     if lang_section:
         # Split by commas and new lines
         lang_text = re.sub(r'•|·|\*|›|✓|✔|▪|▫|-', ',', lang_section)
@@ -315,56 +619,45 @@ def extract_languages(text):
     
     return []
 
-def extract_section(text, section_headers):
+def extract_section(text, section_headers, index=None):
     """
     Extract a section from the text based on section headers
     
     Args:
         text (str): Full resume text
         section_headers (list): Possible section header names
+        index (SectionIndex): Section index already built for the text (optional)
         
     Returns:
         str: The extracted section text or empty string if not found
     """
-    section_pattern = '|'.join(f"({header})" for header in section_headers)
-    regex_pattern = fr"(?:{section_pattern})[:\s]*(?:\n|\r\n?)(.*?)(?:\n\s*(?:[A-Z][A-Z\s]+[A-Z])[:\s]*(?:\n|\r\n?)|$)"
+    if index is None:
+        index = SectionIndex(text)
     
     try:
-        match = re.search(regex_pattern, text, re.IGNORECASE | re.DOTALL)
-        if match:
-            # Return the content of the section (capturing group after the header)
-            return match.group(len(section_headers) + 1).strip()
+        return index.section(section_headers)
     except Exception as e:
         logger.error(f"Error extracting section {section_headers}: {str(e)}")
     
     return ""
 
-def identify_sections(text):
+def identify_sections(text, index=None):
     """
     Identify the main sections present in the resume
     
     Args:
         text (str): Full resume text
+        index (SectionIndex): Section index already built for the text (optional)
         
     Returns:
         dict: Dictionary of section names and their presence
     """
-    common_sections = {
-        'contact': ['CONTACT', 'CONTACT INFORMATION'],
-        'summary': ['SUMMARY', 'PROFESSIONAL SUMMARY', 'PROFILE'],
-        'education': ['EDUCATION', 'ACADEMIC BACKGROUND'],
-        'experience': ['EXPERIENCE', 'WORK EXPERIENCE', 'EMPLOYMENT', 'WORK HISTORY'],
-        'skills': ['SKILLS', 'TECHNICAL SKILLS', 'CORE COMPETENCIES'],
-        'projects': ['PROJECTS', 'PROJECT EXPERIENCE', 'ACADEMIC PROJECTS'],
-        'certifications': ['CERTIFICATIONS', 'CERTIFICATES', 'PROFESSIONAL CERTIFICATIONS'],
-        'languages': ['LANGUAGES', 'LANGUAGE SKILLS'],
-        'interests': ['INTERESTS', 'HOBBIES'],
-        'references': ['REFERENCES']
-    }
+    if index is None:
+        index = SectionIndex(text)
     
     sections = {}
-    for section_key, headers in common_sections.items():
-        section_text = extract_section(text, headers)
+    for section_key, headers in SECTION_HEADERS.items():
+        section_text = extract_section(text, headers, index)
         sections[section_key] = bool(section_text)
     
     return sections
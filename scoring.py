@@ -0,0 +1,252 @@
+import os
+import json
+import logging
+import numpy as np
+from resume_parser import CONTACT_NOT_FOUND
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Resolved relative to this module so the working directory does not matter
+PROFILES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'data', 'scoring_profiles.json')
+
+# Weight profile used for new uploads
+ACTIVE_PROFILE = os.environ.get('SCORING_PROFILE', 'v1')
+
+ESSENTIAL_SECTIONS = ['summary', 'education', 'experience', 'skills']
+RECOMMENDED_SECTIONS = ['projects', 'certifications']
+
+# Per-resume inputs to the score, persisted on Resume so stored resumes can be re-scored
+FEATURE_COLUMNS = [
+    'has_summary', 'has_education', 'has_experience', 'has_skills',
+    'has_projects', 'has_certifications', 'has_contact',
+    'match_percentage', 'action_verb_density', 'unique_action_verbs',
+    'word_count_total_assessment', 'word_count_summary_assessment', 'issue_count'
+]
+
+BOOLEAN_FEATURES = [column for column in FEATURE_COLUMNS if column.startswith('has_')]
+ASSESSMENT_FEATURES = ['word_count_total_assessment', 'word_count_summary_assessment']
+
+SCORE_COLUMNS = ['sections', 'keywords', 'action_verbs', 'word_count', 'issues', 'overall']
+
+# Weights of the original scoring, used when the profiles file is missing
+DEFAULT_PROFILE = {
+    'version': 'v1',
+    'sections': {'max': 30, 'essential_section': 5, 'recommended_section': 2.5, 'contact': 5},
+    'keywords': {'max': 25, 'per_match_percent': 0.25, 'no_job_description': 15},
+    'action_verbs': {'max': 20, 'good_density': 0.05, 'good': 15, 'unique_bonus': 5,
+                     'unique_bonus_min_verbs': 10, 'density_factor': 200, 'density_cap': 15},
+    'word_count': {'max': 15,
+                   'total': {'good': 10, 'too_short': 5, 'too_long': 7},
+                   'summary': {'good': 5, 'too_short': 2, 'too_long': 3}},
+    'issues': {'max': 10, 'per_issue': 2},
+    'grades': [['A', 90], ['B', 80], ['C', 70], ['D', 60]],
+    'lowest_grade': 'F'
+}
+
+def load_scoring_profile(version=None, profiles_file=PROFILES_FILE):
+    """
+    Load a weight profile by version
+
+    Args:
+        version (str): Profile version (default ACTIVE_PROFILE)
+        profiles_file (str): JSON file mapping versions to profiles
+
+    Returns:
+        dict: The profile, with its 'version' key set
+    """
+    version = version or ACTIVE_PROFILE
+    try:
+        with open(profiles_file, 'r') as f:
+            profiles = json.load(f)
+    except FileNotFoundError:
+        if version == DEFAULT_PROFILE['version']:
+            return DEFAULT_PROFILE
+        raise
+
+    if version not in profiles:
+        raise KeyError(f"Unknown scoring profile: {version}")
+    return dict(profiles[version], version=version)
+
+_active_profile = None
+
+def get_scoring_profile():
+    """Return the active weight profile, loaded once per process"""
+    global _active_profile
+    if _active_profile is None:
+        _active_profile = load_scoring_profile()
+    return _active_profile
+
+def extract_scoring_features(resume_data, analysis):
+    """
+    Collect the analysis values the score is computed from
+
+    Args:
+        resume_data (dict): Parsed resume data (only email and phone are used)
+        analysis (dict): Analysis results from analyze_resume
+
+    Returns:
+        dict: Feature values keyed by FEATURE_COLUMNS
+    """
+    present = analysis.get('sections_analysis', {}).get('present', [])
+    action_verbs = analysis.get('action_verbs', {})
+    assessment = analysis.get('word_count', {}).get('assessment', {})
+
+    features = {f'has_{section}': section in present for section in ESSENTIAL_SECTIONS + RECOMMENDED_SECTIONS}
+    features.update({
+        'has_contact': (resume_data.get('email') != CONTACT_NOT_FOUND['email']
+                        and resume_data.get('phone') != CONTACT_NOT_FOUND['phone']),
+        'match_percentage': analysis.get('keyword_match', {}).get('match_percentage'),
+        'action_verb_density': action_verbs.get('action_verb_density', 0),
+        'unique_action_verbs': action_verbs.get('unique_action_verbs', 0),
+        'word_count_total_assessment': assessment.get('total'),
+        'word_count_summary_assessment': assessment.get('summary'),
+        'issue_count': len(analysis.get('common_resume_issues', []))
+    })
+    return features
+
+def score_features(features, profile=None):
+    """
+    Score one resume from its features
+
+    Args:
+        features (dict): Values from extract_scoring_features
+        profile (dict): Weight profile (default: the active profile)
+
+    Returns:
+        dict: Category scores, overall score and grade
+    """
+    profile = profile or get_scoring_profile()
+    scores = {}
+
+    # Score based on sections
+    weights = profile['sections']
+    section_score = 0
+    for section in ESSENTIAL_SECTIONS:
+        if features[f'has_{section}']:
+            section_score += weights['essential_section']
+    for section in RECOMMENDED_SECTIONS:
+        if features[f'has_{section}']:
+            section_score += weights['recommended_section']
+    if features['has_contact']:
+        section_score += weights['contact']
+    scores['sections'] = min(section_score, weights['max'])
+
+    # Score based on keyword matching; a default score if no job description was given
+    weights = profile['keywords']
+    if features['match_percentage'] is not None:
+        keyword_score = features['match_percentage'] * weights['per_match_percent']
+    else:
+        keyword_score = weights['no_job_description']
+    scores['keywords'] = min(keyword_score, weights['max'])
+
+    # Score based on action verb usage, with a bonus for many unique verbs
+    weights = profile['action_verbs']
+    density = features['action_verb_density']
+    if density is None:
+        density = 0
+    if density >= weights['good_density']:
+        action_verb_score = weights['good']
+        if (features['unique_action_verbs'] or 0) >= weights['unique_bonus_min_verbs']:
+            action_verb_score += weights['unique_bonus']
+    else:
+        action_verb_score = min(density * weights['density_factor'], weights['density_cap'])
+    scores['action_verbs'] = min(action_verb_score, weights['max'])
+
+    # Score based on total and summary word count
+    weights = profile['word_count']
+    word_count_score = 0
+    word_count_score += weights['total'].get(features['word_count_total_assessment'], 0)
+    word_count_score += weights['summary'].get(features['word_count_summary_assessment'], 0)
+    scores['word_count'] = min(word_count_score, weights['max'])
+
+    # Deduct points per common issue
+    weights = profile['issues']
+    issues_score = weights['max'] - min(features['issue_count'] * weights['per_issue'], weights['max'])
+    scores['issues'] = max(issues_score, 0)
+
+    scores['overall'] = (
+        scores['sections'] +
+        scores['keywords'] +
+        scores['action_verbs'] +
+        scores['word_count'] +
+        scores['issues']
+    )
+    scores['grade'] = grade_for(scores['overall'], profile)
+
+    return scores
+
+def grade_for(overall, profile):
+    """Return the letter grade for an overall score"""
+    for grade, cutoff in profile['grades']:
+        if overall >= cutoff:
+            return grade
+    return profile['lowest_grade']
+
+def score_feature_arrays(features, profile=None):
+    """
+    Score many resumes at once
+
+    Applies exactly the arithmetic of score_features to whole columns, so
+    the results match scoring each resume individually.
+
+    Args:
+        features (dict): FEATURE_COLUMNS mapped to equally long NumPy arrays. Flags are
+            booleans, match_percentage is NaN where no job description was given and
+            assessments are string arrays ('' where missing)
+        profile (dict): Weight profile (default: the active profile)
+
+    Returns:
+        dict: SCORE_COLUMNS mapped to float arrays, and 'grade' to a string array
+    """
+    profile = profile or get_scoring_profile()
+    scores = {}
+
+    weights = profile['sections']
+    section_score = np.zeros(len(features['issue_count']))
+    for section in ESSENTIAL_SECTIONS:
+        section_score += features[f'has_{section}'] * weights['essential_section']
+    for section in RECOMMENDED_SECTIONS:
+        section_score += features[f'has_{section}'] * weights['recommended_section']
+    section_score += features['has_contact'] * weights['contact']
+    scores['sections'] = np.minimum(section_score, weights['max'])
+
+    weights = profile['keywords']
+    match_percentage = features['match_percentage']
+    keyword_score = np.where(np.isnan(match_percentage), weights['no_job_description'],
+                             match_percentage * weights['per_match_percent'])
+    scores['keywords'] = np.minimum(keyword_score, weights['max'])
+
+    weights = profile['action_verbs']
+    density = features['action_verb_density']
+    bonus = np.where(features['unique_action_verbs'] >= weights['unique_bonus_min_verbs'], weights['unique_bonus'], 0)
+    action_verb_score = np.where(density >= weights['good_density'], weights['good'] + bonus,
+                                 np.minimum(density * weights['density_factor'], weights['density_cap']))
+    scores['action_verbs'] = np.minimum(action_verb_score, weights['max'])
+
+    weights = profile['word_count']
+    word_count_score = np.zeros(len(density))
+    for part, column in (('total', 'word_count_total_assessment'), ('summary', 'word_count_summary_assessment')):
+        for assessment, points in weights[part].items():
+            word_count_score += (features[column] == assessment) * points
+    scores['word_count'] = np.minimum(word_count_score, weights['max'])
+
+    weights = profile['issues']
+    issues_score = weights['max'] - np.minimum(features['issue_count'] * weights['per_issue'], weights['max'])
+    scores['issues'] = np.maximum(issues_score, 0).astype(float)
+
+    scores['overall'] = (
+        scores['sections'] +
+        scores['keywords'] +
+        scores['action_verbs'] +
+        scores['word_count'] +
+        scores['issues']
+    )
+
+    # Grade cutoffs are ordered from the highest, so the first one reached wins
+    cutoffs = profile['grades']
+    scores['grade'] = np.select([scores['overall'] >= cutoff for _, cutoff in cutoffs],
+                                [grade for grade, _ in cutoffs], default=profile['lowest_grade'])
+
+    return scores
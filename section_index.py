@@ -0,0 +1,141 @@
+import re
+from bisect import bisect_left
+
+# Section names and the headers that introduce them
+SECTION_HEADERS = {
+    'contact': ['CONTACT', 'CONTACT INFORMATION'],
+    'summary': ['SUMMARY', 'PROFESSIONAL SUMMARY', 'PROFILE'],
+    'education': ['EDUCATION', 'ACADEMIC BACKGROUND'],
+    'experience': ['EXPERIENCE', 'WORK EXPERIENCE', 'EMPLOYMENT', 'WORK HISTORY'],
+    'skills': ['SKILLS', 'TECHNICAL SKILLS', 'CORE COMPETENCIES'],
+    'projects': ['PROJECTS', 'PROJECT EXPERIENCE', 'ACADEMIC PROJECTS'],
+    'certifications': ['CERTIFICATIONS', 'CERTIFICATES', 'PROFESSIONAL CERTIFICATIONS'],
+    'languages': ['LANGUAGES', 'LANGUAGE SKILLS'],
+    'interests': ['INTERESTS', 'HOBBIES'],
+    'references': ['REFERENCES']
+}
+
+# Colons and whitespace after a header; the run must contain a line break
+HEADER_TAIL_PATTERN = re.compile(r'[:\s]+')
+
+# A line break and the whitespace after it, where the next section may start
+LINE_BREAK_PATTERN = re.compile(r'\n\s*')
+
+# An all-letters line (optionally ending in a colon) that closes the previous section.
+# Lazy so the check stops at the first line end instead of scanning whole paragraphs.
+HEADING_LINE_PATTERN = re.compile(r'[A-Z][A-Z\s]+?[A-Z][:\s]*(?:\n|\r\n?)', re.IGNORECASE)
+
+class SectionIndex:
+    """
+    Index of section header and section end offsets in a resume
+
+    The text is scanned once when the index is built; every section lookup
+    afterwards is a walk over the candidate header lines plus a binary
+    search, so extracting all sections stays linear in document length.
+
+    Lookups reproduce the original per-section regular expression
+    `HEADER[:\\s]*\\n(.*?)(?:\\n\\s*[A-Z][A-Z\\s]+[A-Z][:\\s]*\\n|$)`
+    (case-insensitive): a header is any occurrence followed by colons or
+    whitespace up to a line break, and the section runs until the next
+    line made only of letters and spaces.
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+        # (end of header text, start of section content) for every colon/whitespace
+        # run that contains a line break; only there can a header end
+        self.header_ends = []
+        for match in HEADER_TAIL_PATTERN.finditer(text):
+            run = match.group()
+            last_break = max(run.rfind('\n'), run.rfind('\r'))
+            if last_break >= 0:
+                self.header_ends.append((match.start(), match.start() + last_break + 1))
+
+        # Offsets of the line breaks that end a section
+        self.section_ends = [
+            match.start() for match in LINE_BREAK_PATTERN.finditer(text)
+            if HEADING_LINE_PATTERN.match(text, match.end())
+        ]
+
+        self._spans = {}
+
+    def span(self, section_headers):
+        """
+        Locate a section by its possible headers
+
+        Args:
+            section_headers (list): Possible section header names
+
+        Returns:
+            tuple: (start, end) offsets of the unstripped section content, or None
+        """
+        key = tuple(section_headers)
+        if key not in self._spans:
+            self._spans[key] = self._find_span(section_headers)
+        return self._spans[key]
+
+    def section(self, section_headers):
+        """
+        Return the text of a section
+
+        Args:
+            section_headers (list): Possible section header names
+
+        Returns:
+            str: The stripped section text or empty string if not found
+        """
+        span = self.span(section_headers)
+        if span is None:
+            return ""
+        return self.text[span[0]:span[1]].strip()
+
+    def spans(self, sections=None):
+        """
+        Return the content spans of all sections present in the text
+
+        Args:
+            sections (dict): Section names mapped to their headers (default SECTION_HEADERS)
+
+        Returns:
+            dict: Section name mapped to [start, end] offsets of non-empty sections
+        """
+        sections = SECTION_HEADERS if sections is None else sections
+        found = {}
+        for section_key, headers in sections.items():
+            span = self.span(headers)
+            if span is not None and self.text[span[0]:span[1]].strip():
+                found[section_key] = list(span)
+        return found
+
+    def _find_span(self, section_headers):
+        header_patterns = [(index, len(header), re.compile(re.escape(header), re.IGNORECASE))
+                           for index, header in enumerate(section_headers) if header]
+
+        longest = max((length for _, length, _ in header_patterns), default=0)
+
+        # Leftmost header occurrence wins; ties go to the earlier header in the list
+        best = None
+        for header_end, content_start in self.header_ends:
+            if best is not None and header_end - longest > best[0]:
+                break
+            for index, length, pattern in header_patterns:
+                header_start = header_end - length
+                if header_start < 0 or (best is not None and (header_start, index) >= best[:2]):
+                    continue
+                if pattern.fullmatch(self.text, header_start, header_end):
+                    best = (header_start, index, content_start)
+
+        if best is None:
+            return None
+
+        content_start = best[2]
+        position = bisect_left(self.section_ends, content_start)
+        if position < len(self.section_ends):
+            content_end = self.section_ends[position]
+        elif self.text.endswith('\n'):
+            # Like the regex's `$`, stop before a final line break
+            content_end = max(content_start, len(self.text) - 1)
+        else:
+            content_end = len(self.text)
+        return (content_start, content_end)
@@ -1,36 +1,23 @@
-import json
-import re
-import os
 import logging
 from collections import defaultdict
+from skill_matcher import SkillMatcher
+from skills_registry import SkillsRegistry
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Try to import spaCy, but provide a fallback if it's not available
-try:
-    import spacy
-    nlp = spacy.load('en_core_web_sm')
-    logger.info("SpaCy model loaded successfully")
-except ImportError:
-    logger.warning("SpaCy model not available. Using basic skill extraction methods instead.")
-    nlp = None
+# Matchers for individual dictionary sections, cached by object identity
+_section_matchers = {}
 
 # Load skills dictionary
 def load_skills_dictionary():
-    """Load the skills dictionary from the JSON file"""
-    skills_file = os.path.join('static', 'data', 'skills_dictionary.json')
-    try:
-        if os.path.exists(skills_file):
-            with open(skills_file, 'r') as f:
-                return json.load(f)
-        else:
-            logger.warning(f"Skills dictionary file not found: {skills_file}")
-            return generate_default_skills_dictionary()
-    except Exception as e:
-        logger.error(f"Error loading skills dictionary: {str(e)}")
-        return generate_default_skills_dictionary()
+    """Return the skills dictionary, loaded once per process and reloaded when the file changes"""
+    return skills_registry.get().skills_dict
+
+def get_skills_dictionary_version():
+    """Return the version identifier of the currently loaded skills dictionary"""
+    return skills_registry.get().version
 
 def generate_default_skills_dictionary():
     """Generate a default skills dictionary if the file doesn't exist"""
@@ -103,6 +90,25 @@ def generate_default_skills_dictionary():
         }
     }
 
+# Shared by every request in this process
+skills_registry = SkillsRegistry(fallback=generate_default_skills_dictionary)
+
+def get_skill_matcher():
+    """Return the matcher compiled from the current skills dictionary"""
+    return skills_registry.get().matcher
+
+def _section_matcher(section, skills):
+    """Return a matcher for a single dictionary section, cached by object identity"""
+    key = (section, id(skills))
+    cached = _section_matchers.get(key)
+    if cached is None or cached[0] is not skills:
+        if len(_section_matchers) >= 32:
+            _section_matchers.clear()
+        # Keep a reference to the section so its id cannot be reused while cached
+        cached = (skills, SkillMatcher({section: skills}))
+        _section_matchers[key] = cached
+    return cached[1]
+
 def extract_skills(resume_data):
     """
     Extract skills from resume data
@@ -115,20 +121,11 @@ def extract_skills(resume_data):
     """
     logger.debug("Extracting skills from resume data")
     
-    # Load skills dictionary
-    skills_dict = load_skills_dictionary()
-    
     # Combine all text from various resume sections
     text = resume_data['raw_text']
     
-    # Extract technical skills
-    technical_skills = extract_technical_skills(text, skills_dict['technical'])
-    
-    # Extract soft skills
-    soft_skills = extract_soft_skills(text, skills_dict['soft'])
-    
-    # Extract industry-specific skills
-    industry_skills = extract_industry_skills(text, skills_dict['industry_specific'])
+    # Extract technical, soft and industry-specific skills in a single pass
+    technical_skills, soft_skills, industry_skills = get_skill_matcher().categorize(text)
     
     # Combine all skills
     all_skills = defaultdict(list)
@@ -170,23 +167,9 @@ def extract_technical_skills(text, tech_skills_dict):
     Returns:
         dict: Extracted technical skills by category
     """
-    extracted_skills = defaultdict(list)
-    
-    # Convert text to lowercase for case-insensitive matching
-    text_lower = text.lower()
-    
-    # Check for each category of technical skills
-    for category, skills in tech_skills_dict.items():
-        for skill in skills:
-            # Create pattern for whole word matching (with boundary check)
-            # Also handle common variations (e.g., JavaScript vs Javascript)
-            skill_pattern = r'\b' + re.escape(skill.lower()) + r'(?:\.js)?\b'
-            
-            # Check if skill exists in the text
-            if re.search(skill_pattern, text_lower):
-                extracted_skills[category].append(skill)
-    
-    return dict(extracted_skills)
+    # Whole word matching, also accepting a ".js" suffix (e.g., Node vs Node.js)
+    technical_skills, _, _ = _section_matcher('technical', tech_skills_dict).categorize(text)
+    return technical_skills
 
 def extract_soft_skills(text, soft_skills_list):
     """
@@ -199,21 +182,8 @@ def extract_soft_skills(text, soft_skills_list):
     Returns:
         list: Extracted soft skills
     """
-    extracted_skills = []
-    
-    # Convert text to lowercase for case-insensitive matching
-    text_lower = text.lower()
-    
-    # Check for each soft skill
-    for skill in soft_skills_list:
-        # Create pattern for whole word or phrase matching
-        skill_pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-        
-        # Check if skill exists in the text
-        if re.search(skill_pattern, text_lower):
-            extracted_skills.append(skill)
-    
-    return extracted_skills
+    _, soft_skills, _ = _section_matcher('soft', soft_skills_list).categorize(text)
+    return soft_skills
 
 def extract_industry_skills(text, industry_skills_dict):
     """
@@ -226,22 +196,8 @@ def extract_industry_skills(text, industry_skills_dict):
     Returns:
         dict: Extracted industry-specific skills by industry
     """
-    extracted_skills = defaultdict(list)
-    
-    # Convert text to lowercase for case-insensitive matching
-    text_lower = text.lower()
-    
-    # Check for each industry category
-    for industry, skills in industry_skills_dict.items():
-        for skill in skills:
-            # Create pattern for whole word or phrase matching
-            skill_pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-            
-            # Check if skill exists in the text
-            if re.search(skill_pattern, text_lower):
-                extracted_skills[industry].append(skill)
-    
-    return dict(extracted_skills)
+    _, _, industry_skills = _section_matcher('industry_specific', industry_skills_dict).categorize(text)
+    return industry_skills
 
 def extract_skills_from_job_description(job_description):
     """
@@ -256,35 +212,6 @@ def extract_skills_from_job_description(job_description):
     if not job_description:
         return []
         
-    # Load skills dictionary
-    skills_dict = load_skills_dictionary()
-    
-    # Flatten the technical skills dictionary
-    all_technical_skills = []
-    for category, skills in skills_dict['technical'].items():
-        all_technical_skills.extend(skills)
-    
-    # Get soft skills
-    soft_skills = skills_dict['soft']
-    
-    # Flatten the industry skills dictionary
-    all_industry_skills = []
-    for industry, skills in skills_dict['industry_specific'].items():
-        all_industry_skills.extend(skills)
-    
-    # Combine all skills
-    all_skills = all_technical_skills + soft_skills + all_industry_skills
-    
-    # Extract skills from job description
-    extracted_skills = []
-    job_description_lower = job_description.lower()
-    
-    for skill in all_skills:
-        # Create pattern for whole word matching (with boundary check)
-        skill_pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-        
-        # Check if skill exists in the job description
-        if re.search(skill_pattern, job_description_lower):
-            extracted_skills.append(skill)
-    
-    return extracted_skills
+    # Technical, soft and industry skills in dictionary order, whole word matches only
+    matches = get_skill_matcher().find(job_description, js_suffix=False)
+    return [skill for _, _, skill in matches]
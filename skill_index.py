@@ -0,0 +1,204 @@
+import heapq
+import logging
+import threading
+import numpy as np
+from sqlalchemy import select
+from models import db, Resume
+from analyzer import flatten_skills
+from skill_extractor import skills_registry
+from late_ids import MissingIds, load_late_rows
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+WORD_BITS = 64
+INITIAL_CAPACITY = 1024
+LOAD_BATCH_SIZE = 5000
+
+def build_vocabulary(matcher):
+    """Map each lowercase skill of the dictionary to a bit position, in dictionary order"""
+    vocabulary = {}
+    for _, _, skill in matcher.entries:
+        vocabulary.setdefault(skill.lower(), len(vocabulary))
+    return vocabulary
+
+class SkillBitsetIndex:
+    """
+    Skills of stored resumes as packed bitsets over the dictionary vocabulary
+
+    Row i of the matrix holds one bit per vocabulary skill for the resume
+    ids[i]. The index catches up with the database by loading the rows after
+    max_id, plus the rows below it that were committed late (see MissingIds).
+    """
+
+    def __init__(self, vocabulary, version=None):
+        """
+        Args:
+            vocabulary (dict): Lowercase skill mapped to its bit position
+            version (str): Version of the skills dictionary the vocabulary came from
+        """
+        self.vocabulary = vocabulary
+        self.version = version
+        self.words = max(1, -(-len(vocabulary) // WORD_BITS))
+        self.size = 0
+        self.max_id = 0
+        self.missing = MissingIds()
+        self._ids = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self._bits = np.zeros((INITIAL_CAPACITY, self.words), dtype=np.uint64)
+        self._lock = threading.Lock()
+
+    def encode(self, skills):
+        """
+        Return the bitset of a list of skills (or categorized skills); unknown skills are ignored
+
+        Returns:
+            numpy.ndarray: uint64 array of length self.words
+        """
+        row = np.zeros(self.words, dtype=np.uint64)
+        for skill in flatten_skills(skills or []):
+            position = self.vocabulary.get(skill.lower())
+            if position is not None:
+                row[position // WORD_BITS] |= np.uint64(1) << np.uint64(position % WORD_BITS)
+        return row
+
+    def append(self, resume_ids, rows):
+        """
+        Append encoded rows for resumes not in the index yet
+
+        Args:
+            resume_ids (array): Resume ids in increasing order
+            rows (array): Matching bitsets, shape (len(resume_ids), self.words)
+        """
+        resume_ids = np.asarray(resume_ids, dtype=np.int64)
+        rows = np.asarray(rows)
+        with self._lock:
+            if len(resume_ids) and resume_ids[0] <= self.max_id:
+                # Rows committed late; skip any already appended
+                new = ~np.isin(resume_ids, self._ids[:self.size])
+                resume_ids, rows = resume_ids[new], rows[new]
+            count = len(resume_ids)
+            if count == 0:
+                return
+            self._reserve(self.size + count)
+            self._ids[self.size:self.size + count] = resume_ids
+            self._bits[self.size:self.size + count] = rows
+            self.size += count
+            self.max_id = max(self.max_id, int(resume_ids[-1]))
+
+    def add(self, resume_id, skills):
+        """Append one resume by its skills"""
+        self.append([resume_id], self.encode(skills)[np.newaxis, :])
+
+    def _reserve(self, capacity):
+        if capacity <= len(self._ids):
+            return
+        # Double the capacity so appends stay amortized O(1)
+        new_capacity = max(capacity, 2 * len(self._ids))
+        ids = np.zeros(new_capacity, dtype=np.int64)
+        bits = np.zeros((new_capacity, self.words), dtype=np.uint64)
+        ids[:self.size] = self._ids[:self.size]
+        bits[:self.size] = self._bits[:self.size]
+        self._ids, self._bits = ids, bits
+
+    def match_counts(self, job_skills):
+        """Return the number of job skills each stored resume has, as an array aligned with the ids"""
+        query = self.encode(job_skills)
+        with self._lock:
+            bits = self._bits[:self.size]
+            ids = self._ids[:self.size]
+        return ids, np.bitwise_count(bits & query).sum(axis=1, dtype=np.int64)
+
+    def rank(self, job_skills, limit=50):
+        """
+        Rank stored resumes by how many of the job's skills they have
+
+        The match counts come from one vectorized AND and popcount over the
+        whole matrix. np.argpartition narrows the rows down to the best
+        `limit` candidates, which a heap then orders; ties go to the most
+        recent resume.
+
+        Args:
+            job_skills (list): Skills extracted from the job description
+            limit (int): Number of resumes to return
+
+        Returns:
+            list: Dicts with resume_id, matched (distinct skills) and match_percentage, best first
+        """
+        job_skill_count = int(np.bitwise_count(self.encode(job_skills)).sum())
+        if job_skill_count == 0 or limit <= 0:
+            return []
+
+        ids, counts = self.match_counts(job_skills)
+        candidates = np.flatnonzero(counts)
+        if len(candidates) > limit:
+            # Ties go to the higher id, i.e. the more recent resume
+            keys = counts[candidates] * (int(ids.max()) + 1) + ids[candidates]
+            candidates = candidates[np.argpartition(keys, len(keys) - limit)[-limit:]]
+
+        best = heapq.nlargest(limit, zip(counts[candidates].tolist(), ids[candidates].tolist()))
+        return [{
+            'resume_id': resume_id,
+            'matched': matched,
+            'match_percentage': matched / job_skill_count * 100
+        } for matched, resume_id in best]
+
+    def load_new_resumes(self, batch_size=LOAD_BATCH_SIZE):
+        """
+        Append the stored resumes added since the last load
+
+        Returns:
+            int: Number of resumes appended
+        """
+        table = Resume.__table__
+        loaded = 0
+        if len(self.missing):
+            rows = load_late_rows([table.c.id, table.c.skills], self.missing)
+            if rows:
+                self.append([row.id for row in rows], np.array([self.encode(row.skills) for row in rows]))
+                self.missing.found(row.id for row in rows)
+                loaded += len(rows)
+        while True:
+            rows = db.session.execute(
+                select(table.c.id, table.c.skills)
+                .where(table.c.id > self.max_id)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            self.missing.passed(self.max_id, [row.id for row in rows])
+            self.append([row.id for row in rows], np.array([self.encode(row.skills) for row in rows]))
+            loaded += len(rows)
+        self.missing.expire(self.max_id)
+        return loaded
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_skill_index():
+    """
+    Return the process-wide skill index, caught up with the resumes table
+
+    The index is built on first use and rebuilt when the skills dictionary
+    changes; otherwise only resumes stored since the last call are loaded.
+    """
+    global _index
+    dictionary = skills_registry.get()
+    with _index_lock:
+        if _index is None or _index.version != dictionary.version:
+            _index = SkillBitsetIndex(build_vocabulary(dictionary.matcher), dictionary.version)
+        loaded = _index.load_new_resumes()
+    if loaded:
+        logger.debug(f"Skill index: loaded {loaded} resumes ({_index.size} total)")
+    return _index
+
+def index_new_resume():
+    """Bring an already built index up to date after a resume is stored"""
+    if _index is not None:
+        with _index_lock:
+            _index.load_new_resumes()
+
+def rank_resumes_for_job(job_skills, limit=50):
+    """Return the stored resumes that best match a job description's skills (see SkillBitsetIndex.rank)"""
+    return get_skill_index().rank(job_skills, limit)
@@ -0,0 +1,159 @@
+import re
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Zero-width matches at every word boundary; a skill can only start at one
+BOUNDARY_PATTERN = re.compile(r'\b')
+
+# Key under which a trie node stores the id of the skill pattern ending there
+TERMINAL = ''
+
+# Match flags recorded per pattern while scanning
+MATCH_EXACT = 1
+MATCH_JS_SUFFIX = 2
+
+def is_word_char(char):
+    """Mirror the `\\w` class used by `\\b` in Python's re module"""
+    return char.isalnum() or char == '_'
+
+class SkillMatcher:
+    """
+    Compiled multi-pattern matcher over a skills dictionary
+
+    All skills are stored in a character trie keyed on their lowercase form.
+    A scan only starts a trie walk at word boundaries, so each resume is
+    processed in a single pass whose cost depends on the text length and
+    the longest skill, not on the number of skills in the dictionary.
+
+    Matching reproduces `re.search(r'\\b' + re.escape(skill) + r'\\b', text)`
+    exactly, including the optional `.js` suffix accepted for technical skills.
+    """
+
+    def __init__(self, skills_dict):
+        """
+        Build the matcher from a skills dictionary
+
+        Args:
+            skills_dict (dict): Dictionary with any of the 'technical',
+                'soft' and 'industry_specific' sections
+        """
+        # Entries in dictionary order: (section, category, skill)
+        self.entries = []
+        for category, skills in skills_dict.get('technical', {}).items():
+            self.entries.extend(('technical', category, skill) for skill in skills)
+        self.entries.extend(('soft', None, skill) for skill in skills_dict.get('soft', []))
+        for industry, skills in skills_dict.get('industry_specific', {}).items():
+            self.entries.extend(('industry_specific', industry, skill) for skill in skills)
+
+        self.trie = {}
+        self.pattern_entries = []
+        self.pattern_ends_in_word = []
+        pattern_ids = {}
+
+        for ordinal, (_, _, skill) in enumerate(self.entries):
+            pattern = skill.lower()
+            if not pattern:
+                continue
+            pattern_id = pattern_ids.get(pattern)
+            if pattern_id is None:
+                pattern_id = len(self.pattern_entries)
+                pattern_ids[pattern] = pattern_id
+                self.pattern_entries.append([])
+                self.pattern_ends_in_word.append(is_word_char(pattern[-1]))
+
+                node = self.trie
+                for char in pattern:
+                    node = node.setdefault(char, {})
+                node[TERMINAL] = pattern_id
+            self.pattern_entries[pattern_id].append(ordinal)
+
+        logger.debug(f"Compiled skill matcher with {len(self.entries)} entries "
+                     f"and {len(self.pattern_entries)} distinct patterns")
+
+    def scan(self, text_lower):
+        """
+        Find every skill pattern occurring in already lowercased text
+
+        Args:
+            text_lower (str): Lowercased text to scan
+
+        Returns:
+            dict: Pattern id mapped to MATCH_EXACT / MATCH_JS_SUFFIX flags
+        """
+        hits = {}
+        root = self.trie
+        ends_in_word = self.pattern_ends_in_word
+        length = len(text_lower)
+
+        for boundary in BOUNDARY_PATTERN.finditer(text_lower):
+            position = boundary.start()
+            node = root.get(text_lower[position]) if position < length else None
+
+            while node is not None:
+                position += 1
+                pattern_id = node.get(TERMINAL)
+                if pattern_id is not None:
+                    flags = hits.get(pattern_id, 0)
+                    # The closing \b holds when the word-ness changes after the skill
+                    next_is_word = position < length and is_word_char(text_lower[position])
+                    if ends_in_word[pattern_id] != next_is_word:
+                        flags |= MATCH_EXACT
+                    # Technical skills also accept a trailing ".js" (e.g. "node" in "node.js")
+                    if text_lower.startswith('.js', position):
+                        after = position + 3
+                        if after >= length or not is_word_char(text_lower[after]):
+                            flags |= MATCH_JS_SUFFIX
+                    if flags:
+                        hits[pattern_id] = flags
+                if position >= length:
+                    break
+                node = node.get(text_lower[position])
+
+        return hits
+
+    def find(self, text, js_suffix=True):
+        """
+        Find the dictionary entries present in the text
+
+        Args:
+            text (str): Text to search
+            js_suffix (bool): Accept a trailing ".js" for technical skills
+
+        Returns:
+            list: Matching (section, category, skill) entries in dictionary order
+        """
+        ordinals = []
+        for pattern_id, flags in self.scan(text.lower()).items():
+            for ordinal in self.pattern_entries[pattern_id]:
+                if flags & MATCH_EXACT or (js_suffix and self.entries[ordinal][0] == 'technical'):
+                    ordinals.append(ordinal)
+        ordinals.sort()
+        return [self.entries[ordinal] for ordinal in ordinals]
+
+    def categorize(self, text):
+        """
+        Find skills in the text grouped the way the skills dictionary is
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            tuple: (technical skills by category, soft skills list,
+                industry-specific skills by industry)
+        """
+        technical_skills = {}
+        soft_skills = []
+        industry_skills = {}
+
+        for section, category, skill in self.find(text):
+            if section == 'technical':
+                technical_skills.setdefault(category, []).append(skill)
+            elif section == 'soft':
+                soft_skills.append(skill)
+            else:
+                industry_skills.setdefault(category, []).append(skill)
+
+        return technical_skills, soft_skills, industry_skills
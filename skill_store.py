@@ -0,0 +1,264 @@
+import logging
+import threading
+from sqlalchemy import select, func, exists, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import db, Resume, Skill, ResumeSkill
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Skill names looked up per query; keeps IN lists within the database's parameter limits
+NAME_CHUNK_SIZE = 500
+
+# Skill name mapped to its id; ids never change, and there are as many names as dictionary skills.
+# Only committed skills are cached; ids created in a transaction are added once it commits.
+_skill_ids = {}
+_skill_ids_lock = threading.Lock()
+
+def normalize_skill(name):
+    """Return the key a skill is stored under"""
+    return ' '.join(str(name).split()).lower()
+
+def categorized_skills(skills):
+    """
+    List the (category, normalized name) pairs of a resume's skills, without duplicates
+
+    Args:
+        skills (dict|list): Skills by category (as returned by extract_skills) or a plain list
+
+    Returns:
+        list: (category, name) tuples; nested categories are joined with '.'
+    """
+    if isinstance(skills, list):
+        skills = {'': skills}
+    pairs = []
+    seen = set()
+    for category, category_skills in (skills or {}).items():
+        if isinstance(category_skills, dict):
+            groups = [(f'{category}.{subcategory}', subskills) for subcategory, subskills in category_skills.items()]
+        else:
+            groups = [(category, category_skills)]
+        for group, names in groups:
+            for name in names or []:
+                pair = (group[:64], normalize_skill(name))
+                if pair[1] and pair not in seen:
+                    seen.add(pair)
+                    pairs.append(pair)
+    return pairs
+
+def get_skill_ids(names, create=False, session=None):
+    """
+    Return the ids of skill names
+
+    Args:
+        names (iterable): Skill names, in any case
+        create (bool): Add the names that are not stored yet, in the session's
+            transaction (they are committed or rolled back with it)
+        session (Session): Session to query and insert with (default db.session)
+
+    Returns:
+        dict: Normalized name mapped to its id; unknown names are left out unless created
+    """
+    session = db.session if session is None else session
+    wanted = {normalize_skill(name) for name in names}
+    wanted.discard('')
+    with _skill_ids_lock:
+        found = {name: _skill_ids[name] for name in wanted if name in _skill_ids}
+    missing = sorted(wanted - found.keys())
+    if not missing:
+        return found
+
+    loaded = _load_skill_ids(session, missing)
+    found.update(loaded)
+    with _skill_ids_lock:
+        _skill_ids.update(loaded)
+
+    new = [name for name in missing if name not in found]
+    if new and create:
+        _insert_skills(session, new)
+        created = _load_skill_ids(session, new)
+        found.update(created)
+        session.info.setdefault('new_skill_ids', {}).update(created)
+    return found
+
+def _load_skill_ids(session, names):
+    ids = {}
+    for start in range(0, len(names), NAME_CHUNK_SIZE):
+        rows = session.execute(
+            select(Skill.id, Skill.name).where(Skill.name.in_(names[start:start + NAME_CHUNK_SIZE]))
+        ).all()
+        ids.update((row.name, row.id) for row in rows)
+    return ids
+
+def _insert_skills(session, names):
+    """Insert skill names, skipping those another transaction stored first"""
+    table = Skill.__table__
+    rows = [{'name': name} for name in names]
+    dialect = session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        session.execute(insert(table).on_conflict_do_nothing(index_elements=['name']), rows)
+        return
+    # Elsewhere, one savepoint per name keeps a duplicate from aborting the caller's transaction
+    connection = session.connection()
+    for row in rows:
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert(), [row])
+        except IntegrityError:
+            pass
+
+@event.listens_for(Session, 'after_commit')
+def _cache_new_skill_ids(session):
+    created = session.info.pop('new_skill_ids', None)
+    if created:
+        with _skill_ids_lock:
+            _skill_ids.update(created)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_new_skill_ids(session):
+    session.info.pop('new_skill_ids', None)
+
+def set_resume_skills(resume, skills):
+    """
+    Give a new resume its skills, to be stored as resume_skills rows when it is saved
+
+    The skill ids are looked up (and unseen skills inserted) by the session that
+    flushes the resume, in the same transaction, so a resume that fails to save
+    leaves no skills behind.
+
+    Args:
+        resume (Resume): Unsaved record
+        skills (dict|list): Skills by category or a plain list
+    """
+    resume.pending_skills = categorized_skills(skills)
+
+@event.listens_for(Session, 'before_flush')
+def _link_pending_skills(session, flush_context, instances):
+    """Turn the pending skills of new resumes into resume_skills rows, one lookup for the whole flush"""
+    resumes = [obj for obj in session.new if isinstance(obj, Resume) and getattr(obj, 'pending_skills', None)]
+    if not resumes:
+        return
+    ids = get_skill_ids({name for resume in resumes for _, name in resume.pending_skills},
+                        create=True, session=session)
+    # pending_skills is kept: if this transaction rolls back, a retry links the skills again
+    for resume in resumes:
+        resume.skill_links = [ResumeSkill(skill_id=ids[name], category=category)
+                              for category, name in resume.pending_skills if name in ids]
+
+def resume_ids_with_skills(all_of=(), any_of=(), category=None):
+    """
+    Select the ids of resumes having every skill in all_of and at least one in any_of
+
+    Both lookups go through the (skill_id, category, resume_id) index of
+    resume_skills; no skills JSON is read.
+
+    Args:
+        all_of (list): Skills a resume must all have
+        any_of (list): Skills a resume must have at least one of
+        category (str): Only count skills extracted under this category (optional)
+
+    Returns:
+        Select: A query of resume ids for use in other queries, or None if no
+            resume can match (a required skill was never stored)
+    """
+    if not all_of and not any_of:
+        raise ValueError("Give at least one skill in all_of or any_of")
+
+    conditions = []
+    if all_of:
+        wanted = {normalize_skill(name) for name in all_of} - {''}
+        ids = get_skill_ids(wanted)
+        if len(ids) < len(wanted):
+            return None
+        required = (select(ResumeSkill.resume_id)
+                    .where(ResumeSkill.skill_id.in_(list(ids.values())))
+                    .group_by(ResumeSkill.resume_id)
+                    .having(func.count(func.distinct(ResumeSkill.skill_id)) == len(ids)))
+        if category:
+            required = required.where(ResumeSkill.category == category)
+        conditions.append(required)
+    if any_of:
+        ids = get_skill_ids(any_of)
+        if not ids:
+            return None
+        optional = select(ResumeSkill.resume_id).where(ResumeSkill.skill_id.in_(list(ids.values())))
+        if category:
+            optional = optional.where(ResumeSkill.category == category)
+        conditions.append(optional.distinct())
+
+    if len(conditions) == 1:
+        return conditions[0]
+    return conditions[0].intersect(conditions[1])
+
+def find_resumes_by_skills(all_of=(), any_of=(), category=None, limit=100, before_id=None):
+    """
+    Return stored resumes matching an AND/OR skill filter, newest first
+
+    Args:
+        all_of (list): Skills a resume must all have
+        any_of (list): Skills a resume must have at least one of
+        category (str): Only count skills extracted under this category (optional)
+        limit (int): Most resumes to return
+        before_id (int): Only resumes with a lower id, to continue from a previous page (optional)
+
+    Returns:
+        list: Rows with id, name, filename, upload_date, overall_score and grade
+    """
+    matching = resume_ids_with_skills(all_of, any_of, category)
+    if matching is None:
+        return []
+    query = (db.session.query(Resume.id, Resume.name, Resume.filename, Resume.upload_date,
+                              Resume.overall_score, Resume.grade)
+             .filter(Resume.id.in_(matching)))
+    if before_id is not None:
+        query = query.filter(Resume.id < before_id)
+    return query.order_by(Resume.id.desc()).limit(limit).all()
+
+def backfill_resume_skills(batch_size=1000):
+    """
+    Fill resume_skills for resumes stored before the table existed
+
+    Walks the resumes without skill rows in id order, reading only their
+    skills JSON and committing one batch at a time, so it can be stopped
+    and run again.
+
+    Returns:
+        dict: Resumes scanned and skill rows written
+    """
+    table = Resume.__table__
+    has_links = exists().where(ResumeSkill.resume_id == table.c.id)
+    scanned = written = 0
+    last_id = 0
+
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, table.c.skills)
+            .where(table.c.id > last_id, ~has_links)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        pairs = {row.id: categorized_skills(row.skills) for row in rows}
+        ids = get_skill_ids({name for resume_pairs in pairs.values() for _, name in resume_pairs}, create=True)
+        parameters = [
+            {'resume_id': resume_id, 'skill_id': ids[name], 'category': category}
+            for resume_id, resume_pairs in pairs.items()
+            for category, name in resume_pairs
+            if name in ids
+        ]
+        if parameters:
+            db.session.execute(ResumeSkill.__table__.insert(), parameters)
+        db.session.commit()
+
+        scanned += len(rows)
+        written += len(parameters)
+        last_id = rows[-1].id
+        logger.debug(f"Backfilled skills up to resume {last_id}")
+
+    return {'resumes': scanned, 'skill_rows': written}
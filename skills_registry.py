@@ -0,0 +1,172 @@
+import os
+import json
+import pickle
+import hashlib
+import logging
+import tempfile
+import threading
+from skill_matcher import SkillMatcher
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Resolved relative to this module so the working directory does not matter
+SKILLS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'data', 'skills_dictionary.json')
+
+# Compiled artifacts are unpickled, so they live in the instance folder: never under static/,
+# which Flask serves, or anywhere else a client could read or replace them
+SKILLS_ARTIFACT_DIR = os.environ.get(
+    'SKILLS_ARTIFACT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+)
+
+# Bump whenever SkillMatcher's internal layout changes so stale artifacts are rebuilt
+ARTIFACT_FORMAT = 1
+
+def artifact_path(skills_file, artifact_dir=SKILLS_ARTIFACT_DIR):
+    """Return the path of the compiled artifact of a skills dictionary file"""
+    name = os.path.splitext(os.path.basename(skills_file))[0]
+    return os.path.join(artifact_dir, name + '.compiled.pickle')
+
+class SkillsDictionary:
+    """A loaded skills dictionary together with its compiled matcher"""
+
+    def __init__(self, skills_dict, matcher, content_hash, source):
+        self.skills_dict = skills_dict
+        self.matcher = matcher
+        self.content_hash = content_hash
+        # Short, stable identifier used to tag data derived from this dictionary
+        self.version = content_hash[:12]
+        self.source = source
+
+class SkillsRegistry:
+    """
+    Process-wide cache of the skills dictionary
+
+    The JSON file is parsed and compiled once per process. Every access
+    stats the file and only re-reads it when its mtime or size changed;
+    a reload then only happens if the content hash differs as well.
+    The compiled form is written to a pickle in the instance folder so new
+    workers can skip parsing and compiling the dictionary.
+    """
+
+    def __init__(self, skills_file=SKILLS_FILE, fallback=None, artifact_dir=SKILLS_ARTIFACT_DIR):
+        """
+        Args:
+            skills_file (str): Path to the skills dictionary JSON file
+            fallback (callable): Returns the dictionary to use when the file is missing
+            artifact_dir (str): Directory of the compiled artifact; must not be publicly served
+        """
+        self.skills_file = skills_file
+        self.artifact_dir = artifact_dir
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._current = None
+        self._file_stamp = None
+
+    def get(self):
+        """
+        Return the current skills dictionary, reloading it if the file changed
+
+        Returns:
+            SkillsDictionary: The loaded dictionary and its compiled matcher
+        """
+        stamp = self._stat()
+        if self._current is not None and stamp == self._file_stamp:
+            return self._current
+
+        with self._lock:
+            stamp = self._stat()
+            if self._current is None or stamp != self._file_stamp:
+                self._reload(stamp)
+            return self._current
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.skills_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _reload(self, stamp):
+        if stamp is None:
+            if self._current is None or self._current.source != 'default':
+                logger.warning(f"Skills dictionary file not found: {self.skills_file}")
+                self._current = self._compile(self._fallback_dictionary(), 'default')
+            self._file_stamp = None
+            return
+
+        try:
+            with open(self.skills_file, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            logger.error(f"Error loading skills dictionary: {str(e)}")
+            if self._current is None:
+                self._current = self._compile(self._fallback_dictionary(), 'default')
+            return
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        self._file_stamp = stamp
+        if self._current is not None and self._current.content_hash == content_hash:
+            # Touched but unchanged, nothing to rebuild
+            return
+
+        loaded = self._load_artifact(content_hash)
+        if loaded is None:
+            try:
+                skills_dict = json.loads(content)
+            except ValueError as e:
+                logger.error(f"Error loading skills dictionary: {str(e)}")
+                if self._current is None:
+                    self._current = self._compile(self._fallback_dictionary(), 'default')
+                return
+            loaded = SkillsDictionary(skills_dict, SkillMatcher(skills_dict), content_hash, 'json')
+            self._save_artifact(loaded)
+
+        logger.info(f"Loaded skills dictionary version {loaded.version} from {loaded.source}")
+        self._current = loaded
+
+    def _fallback_dictionary(self):
+        return self.fallback() if self.fallback else {}
+
+    def _compile(self, skills_dict, source):
+        content = json.dumps(skills_dict, sort_keys=True).encode('utf-8')
+        content_hash = hashlib.sha256(content).hexdigest()
+        return SkillsDictionary(skills_dict, SkillMatcher(skills_dict), content_hash, source)
+
+    def _load_artifact(self, content_hash):
+        path = artifact_path(self.skills_file, self.artifact_dir)
+        try:
+            with open(path, 'rb') as f:
+                artifact = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable skills artifact {path}: {str(e)}")
+            return None
+
+        if artifact.get('format') != ARTIFACT_FORMAT or artifact.get('content_hash') != content_hash:
+            return None
+        return SkillsDictionary(artifact['skills_dict'], artifact['matcher'], content_hash, 'artifact')
+
+    def _save_artifact(self, loaded):
+        path = artifact_path(self.skills_file, self.artifact_dir)
+        artifact = {
+            'format': ARTIFACT_FORMAT,
+            'content_hash': loaded.content_hash,
+            'skills_dict': loaded.skills_dict,
+            'matcher': loaded.matcher,
+        }
+        tmp_path = None
+        try:
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            # Write to a temporary file first so concurrent workers never read a partial artifact
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write skills artifact {path}: {str(e)}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,24 @@
+import os
+import sys
+import logging
+
+import pytest
+
+# The application modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """The Flask app on a fresh SQLite database and text index"""
+    directory = tmp_path_factory.mktemp('app')
+    os.environ['DATABASE_URL'] = f"sqlite:///{directory / 'resume_analyzer.db'}"
+    os.environ['TEXT_INDEX_DIR'] = str(directory / 'text_index')
+    logging.disable(logging.CRITICAL)
+    from app import app
+    from persistence import writer
+    from jobs import job_queue
+    app.config['TESTING'] = True
+    yield app
+    job_queue.shutdown()
+    writer.shutdown()
+    logging.disable(logging.NOTSET)
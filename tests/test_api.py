@@ -0,0 +1,83 @@
+"""The NDJSON batch endpoint must report every resume, failing ones as error lines between the results"""
+import io
+import json
+import base64
+import zipfile
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+
+def encoded(data):
+    return base64.b64encode(data).decode()
+
+def ndjson(response):
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    return sorted(lines, key=lambda line: line['index'])
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture(scope='module')
+def resume_text():
+    return generate_corpus(count=1, file_types=['txt'])[0]['data']
+
+def test_json_batch_reports_errors_in_place(client, resume_text):
+    documents = [
+        {'filename': 'first.txt', 'content': encoded(resume_text)},
+        {'filename': 'old.doc', 'content': encoded(b'binary word document')},
+        {'filename': 'garbled.txt', 'content': 'not base64!'},
+        'not an object',
+        {'filename': 'empty.txt', 'content': ''},
+        {'filename': 'broken.pdf', 'content': encoded(b'%PDF-1.4 truncated')},
+        {'filename': 'last.txt', 'content': encoded(resume_text + b'\nPython SQL')},
+    ]
+    lines = ndjson(client.post('/api/v1/analyze/batch', json={'documents': documents, 'store': False}))
+
+    assert [line['index'] for line in lines] == list(range(len(documents)))
+    assert [line.get('filename') for line in lines] == \
+        ['first.txt', 'old.doc', 'garbled.txt', None, 'empty.txt', 'broken.pdf', 'last.txt']
+    assert [('error' in line) for line in lines] == [False, True, True, True, True, True, False]
+    assert 'File type not allowed' in lines[1]['error']
+    assert lines[2]['error'] == 'content is not valid base64'
+    for line in (lines[0], lines[-1]):
+        assert 'resume_id' not in line
+        assert line['grade'] and line['overall_score'] is not None
+        assert 'scores' in line and 'skills' in line
+
+def test_multipart_batch_stores_good_files(client, resume_text):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zipped:
+        zipped.writestr('cv.txt', resume_text)
+        zipped.writestr('notes.md', b'# notes')
+    files = [(io.BytesIO(resume_text), 'plain.txt'), (io.BytesIO(archive.getvalue()), 'batch.zip'),
+             (io.BytesIO(b'not a zip'), 'broken.zip')]
+    lines = ndjson(client.post('/api/v1/analyze/batch', data={'resumes': files},
+                               content_type='multipart/form-data'))
+
+    assert [line['filename'] for line in lines] == ['plain.txt', 'batch.zip/cv.txt', 'batch.zip/notes.md', 'broken.zip']
+    assert isinstance(lines[0]['resume_id'], int) and isinstance(lines[1]['resume_id'], int)
+    assert 'File type not allowed' in lines[2]['error']
+    assert lines[3]['error'].startswith('Not a valid zip archive')
+
+@pytest.mark.parametrize('body', [{'documents': []}, {'documents': 'x'}, {}])
+def test_batch_rejects_bad_requests(client, body):
+    response = client.post('/api/v1/analyze/batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+def test_batch_requires_files(client):
+    response = client.post('/api/v1/analyze/batch', data={}, content_type='multipart/form-data')
+    assert response.status_code == 400
+
+def test_analyze_scores_text_against_job_description(client, resume_text):
+    document = {'filename': 'cv.txt', 'content': encoded(resume_text), 'store': False}
+    words = resume_text.decode().split()
+    job_description = f"Looking for {words[5]} and {words[8]} experience, plus zyxwvut"
+    result = client.post('/api/v1/analyze', json=dict(document, job_description=job_description)).get_json()
+    assert result['text_match']['score'] > 0
+    assert 'zyxwvut' not in result['text_match']['matched_terms']
+    assert client.post('/api/v1/analyze', json=document).get_json()['text_match'] is None
@@ -0,0 +1,80 @@
+"""Keyset pagination of the history must page through exactly the rows a full sort returns"""
+from datetime import datetime
+
+import pytest
+
+from benchmarks.bench_history import fill, walk
+
+@pytest.fixture(scope='module')
+def history(app):
+    from models import db, Resume
+    with app.app_context():
+        fill(db, Resume, 300, seed=1)
+        # Unscored and ungraded rows, which row-value comparisons never match
+        db.session.execute(Resume.__table__.insert(), [
+            {'filename': f'unscored_{number}.pdf', 'upload_date': upload_date, 'overall_score': score, 'grade': grade}
+            for number, (upload_date, score, grade) in enumerate([
+                (datetime(2020, 1, 1), None, None), (datetime(2020, 1, 2), None, None), (datetime(2020, 1, 2), None, None),
+                (datetime(2020, 1, 3), 75.0, None), (datetime(2020, 1, 1), 91.5, None),
+                (datetime(2020, 1, 4), None, 'B'), (datetime(2020, 1, 4), None, 'F'), (None, None, None),
+            ])
+        ])
+        db.session.commit()
+        rows = db.session.query(Resume.id, Resume.upload_date, Resume.overall_score, Resume.grade).all()
+        yield rows
+        db.session.query(Resume).delete()
+        db.session.commit()
+
+def descending_nulls_last(value):
+    return (value is None, -value if value is not None else 0)
+
+SORT_KEYS = {
+    'date': lambda row: (*descending_nulls_last(row.upload_date and row.upload_date.timestamp()), -row.id),
+    'score': lambda row: (*descending_nulls_last(row.overall_score), -row.id),
+    'grade': lambda row: (row.grade is None, row.grade or '', *descending_nulls_last(row.overall_score), -row.id),
+}
+
+FILTERS = [{}, {'grade': 'B'}, {'grade': 'F'}, {'grade': 'Z'}, {'min_score': 55, 'max_score': 85},
+           {'grade': 'A', 'min_score': 95}]
+
+def in_range(score, low, high):
+    return (low is None and high is None) or (score is not None and (low or 0) <= score <= (high or 100))
+
+@pytest.mark.parametrize('sort', list(SORT_KEYS))
+@pytest.mark.parametrize('reverse', [False, True])
+@pytest.mark.parametrize('filters', FILTERS)
+def test_walk_matches_sort(history, sort, reverse, filters):
+    from history import history_page
+    selected = [row for row in history
+                if row.grade == filters.get('grade', row.grade)
+                and in_range(row.overall_score, filters.get('min_score'), filters.get('max_score'))]
+    expected = [row.id for row in sorted(selected, key=SORT_KEYS[sort], reverse=reverse)]
+    forward, backward = walk(history_page, sort=sort, reverse=reverse, **filters)
+    assert forward == expected
+    assert backward == expected
+
+def test_page_ends(history):
+    from history import history_page, MAX_HISTORY_PAGE_SIZE
+    first = history_page(page_size=10)
+    assert len(first['rows']) == 10 and first['prev_cursor'] is None and first['next_cursor']
+    second = history_page(after=first['next_cursor'], page_size=10)
+    assert history_page(before=second['prev_cursor'], page_size=10)['rows'] == first['rows']
+    assert len(history_page(page_size=1000)['rows']) == MAX_HISTORY_PAGE_SIZE
+    assert history_page(grade='Z')['next_cursor'] is None
+
+def test_cursor_round_trip(history):
+    from history import HISTORY_SORTS, encode_cursor, decode_cursor
+    for row in (history[0], history[-1]):
+        for keys in HISTORY_SORTS.values():
+            assert decode_cursor(encode_cursor(row, keys), keys) == [getattr(row, column.key) for column, _ in keys]
+
+@pytest.mark.parametrize('cursor', ['!!!', 'bm90IGpzb24', 'eyJhIjoxfQ', 'WzEsMl0', 'WyJub3QgYSBkYXRlIiwxXQ'])
+def test_invalid_cursor(history, cursor):
+    from history import history_page, InvalidCursorError
+    with pytest.raises(InvalidCursorError):
+        history_page(sort='date', after=cursor)
+
+def test_invalid_cursor_shows_first_page(app, history):
+    response = app.test_client().get('/history?after=!!!')
+    assert response.status_code == 200
+    assert b'could not be found' in response.data
@@ -0,0 +1,160 @@
+"""Profile scoring must match the original hard-coded score, and bulk scoring must match scoring one resume"""
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from analyzer import score_resume
+from scoring import (FEATURE_COLUMNS, BOOLEAN_FEATURES, ASSESSMENT_FEATURES, SCORE_COLUMNS, DEFAULT_PROFILE,
+                     load_scoring_profile, extract_scoring_features, score_features, score_feature_arrays)
+
+SECTIONS = ['contact', 'summary', 'education', 'experience', 'skills', 'projects', 'certifications', 'languages']
+ASSESSMENTS = ['good', 'too_short', 'too_long']
+
+def hard_coded_score(resume_data, analysis):
+    """score_resume before weight profiles"""
+    scores = {}
+    present = analysis.get('sections_analysis', {}).get('present', [])
+    section_score = 0
+    for section in ['summary', 'education', 'experience', 'skills']:
+        if section in present:
+            section_score += 5
+    for section in ['projects', 'certifications']:
+        if section in present:
+            section_score += 2.5
+    if resume_data.get('email') != "Email not found" and resume_data.get('phone') != "Phone not found":
+        section_score += 5
+    scores['sections'] = min(section_score, 30)
+
+    keyword_match = analysis.get('keyword_match', {})
+    if keyword_match.get('match_percentage') is not None:
+        keyword_score = keyword_match.get('match_percentage') * 0.25
+    else:
+        keyword_score = 15
+    scores['keywords'] = min(keyword_score, 25)
+
+    action_verbs = analysis.get('action_verbs', {})
+    if action_verbs.get('assessment') == 'good':
+        action_verb_score = 15
+        if action_verbs.get('unique_action_verbs', 0) >= 10:
+            action_verb_score += 5
+    else:
+        action_verb_score = min(action_verbs.get('action_verb_density', 0) * 200, 15)
+    scores['action_verbs'] = min(action_verb_score, 20)
+
+    assessment = analysis.get('word_count', {}).get('assessment', {})
+    word_count_score = {'good': 10, 'too_short': 5, 'too_long': 7}.get(assessment.get('total'), 0)
+    if 'summary' in assessment:
+        word_count_score += {'good': 5, 'too_short': 2, 'too_long': 3}.get(assessment.get('summary'), 0)
+    scores['word_count'] = min(word_count_score, 15)
+
+    issues_score = 10 - min(len(analysis.get('common_resume_issues', [])) * 2, 10)
+    scores['issues'] = max(issues_score, 0)
+
+    scores['overall'] = (scores['sections'] + scores['keywords'] + scores['action_verbs'] +
+                         scores['word_count'] + scores['issues'])
+    for grade, cutoff in [('A', 90), ('B', 80), ('C', 70), ('D', 60)]:
+        if scores['overall'] >= cutoff:
+            scores['grade'] = grade
+            break
+    else:
+        scores['grade'] = 'F'
+    return scores
+
+def random_analysis(rng):
+    """Resume data and analysis as analyze_resume produces them, biased towards threshold values"""
+    density = rng.choice([0, 0.0, 0.01, 0.049, 0.05, 0.075, 0.2, rng.random() / 10])
+    assessment = {'total': rng.choice(ASSESSMENTS)}
+    if rng.random() < 0.7:
+        assessment['summary'] = rng.choice(ASSESSMENTS)
+    resume_data = {'email': rng.choice(["Email not found", 'a@b.com']),
+                   'phone': rng.choice(["Phone not found", '555 0100'])}
+    analysis = {
+        'sections_analysis': {'present': [section for section in SECTIONS if rng.random() < 0.6]},
+        'keyword_match': {'match_percentage': rng.choice([None, 0, 0.0, 12.5, 100 / 3, 60, 100.0,
+                                                          rng.random() * 100])},
+        'action_verbs': {'action_verb_density': density, 'unique_action_verbs': rng.randint(0, 20),
+                         'assessment': 'good' if density >= 0.05 else 'needs_improvement'},
+        'word_count': {'assessment': assessment},
+        'common_resume_issues': ['issue'] * rng.randint(0, 8)
+    }
+    return resume_data, analysis
+
+CASES = [random_analysis(random.Random(seed)) for seed in range(500)]
+
+def feature_arrays(rows):
+    """Columns as rescore.load_feature_arrays builds them from stored rows"""
+    features = {}
+    for column in FEATURE_COLUMNS:
+        values = [row[column] for row in rows]
+        if column in BOOLEAN_FEATURES:
+            features[column] = np.array(values, dtype=bool)
+        elif column in ASSESSMENT_FEATURES:
+            features[column] = np.array([value or '' for value in values], dtype=str)
+        else:
+            features[column] = np.array(values, dtype=float)
+    return features
+
+@pytest.mark.parametrize('resume_data,analysis', CASES)
+def test_profile_v1_matches_hard_coded_score(resume_data, analysis):
+    scores = score_resume(resume_data, analysis, job_description='')
+    expected = hard_coded_score(resume_data, analysis)
+    assert scores == expected
+    assert {key: type(value) for key, value in scores.items()} == \
+        {key: type(value) for key, value in expected.items()}
+
+def test_profiles_file_matches_default_profile():
+    assert load_scoring_profile('v1') == DEFAULT_PROFILE
+
+@pytest.mark.parametrize('profile_version', ['v1', 'reweighted'])
+def test_feature_arrays_match_single_scores(profile_version):
+    profile = load_scoring_profile('v1')
+    if profile_version == 'reweighted':
+        profile = copy.deepcopy(profile)
+        profile['keywords']['per_match_percent'] = 0.4
+        profile['action_verbs'].update(good_density=0.03, unique_bonus_min_verbs=5)
+        profile['issues']['per_issue'] = 3
+        profile['grades'] = [['A', 85], ['B', 70], ['C', 55]]
+
+    rows = [extract_scoring_features(resume_data, analysis) for resume_data, analysis in CASES]
+    bulk = score_feature_arrays(feature_arrays(rows), profile)
+    for number, row in enumerate(rows):
+        single = score_features(row, profile)
+        for column in SCORE_COLUMNS:
+            assert bulk[column][number] == single[column], (number, column)
+        assert bulk['grade'][number] == single['grade']
+
+def test_feature_arrays_empty():
+    scores = score_feature_arrays(feature_arrays([]), load_scoring_profile('v1'))
+    assert all(len(scores[column]) == 0 for column in SCORE_COLUMNS + ['grade'])
+
+def test_rescore_rebuilds_suggestions_when_the_score_band_moves(app):
+    from models import db, Resume
+    from rescore import rescore_resumes
+    features = {'has_summary': True, 'has_education': True, 'has_experience': True, 'has_skills': True,
+                'has_projects': False, 'has_certifications': False, 'has_contact': True,
+                'match_percentage': None, 'action_verb_density': 0.0, 'unique_action_verbs': 0,
+                'word_count_total_assessment': 'good', 'word_count_summary_assessment': 'good', 'issue_count': 0}
+    analysis = {'sections_analysis': {'missing_essential': [], 'missing_recommended': ['projects']},
+                'action_verbs_analysis': {'assessment': 'needs_improvement'}}
+    good = {'high_priority': [], 'medium_priority': ['kept'], 'low_priority': []}
+    with app.app_context():
+        # Scored 95 and 60 before; both really score 25 + 15 + 0 + 15 + 10 = 65
+        moved = Resume(filename='moved.txt', overall_score=95.0, grade='A', suggestions=good, **features, **analysis)
+        same = Resume(filename='same.txt', overall_score=60.0, grade='D', suggestions=good, **features, **analysis)
+        db.session.add_all([moved, same])
+        db.session.commit()
+        moved_id, same_id = moved.id, same.id
+
+        result = rescore_resumes('v1', batch_size=1)
+        moved, same = db.session.get(Resume, moved_id), db.session.get(Resume, same_id)
+        assert (moved.overall_score, moved.grade, same.overall_score) == (65.0, 'D', 65.0)
+        assert result['suggestions_updated'] == 1
+        assert "Consider a complete resume overhaul to better highlight your qualifications" in \
+            moved.suggestions['high_priority']
+        assert "Consider adding a Projects section to strengthen your resume" in moved.suggestions['medium_priority']
+        assert same.suggestions == good
+        db.session.delete(moved)
+        db.session.delete(same)
+        db.session.commit()
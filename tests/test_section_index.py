@@ -0,0 +1,75 @@
+"""SectionIndex must locate the same sections as the per-section regex it replaced"""
+import random
+import re
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from section_index import SectionIndex, SECTION_HEADERS
+
+def regex_match(text, section_headers):
+    section_pattern = '|'.join(f"({header})" for header in section_headers)
+    regex_pattern = fr"(?:{section_pattern})[:\s]*(?:\n|\r\n?)(.*?)(?:\n\s*(?:[A-Z][A-Z\s]+[A-Z])[:\s]*(?:\n|\r\n?)|$)"
+    return re.search(regex_pattern, text, re.IGNORECASE | re.DOTALL), len(section_headers) + 1
+
+def regex_section(text, section_headers):
+    match, group = regex_match(text, section_headers)
+    return match.group(group).strip() if match else ""
+
+def regex_span(text, section_headers):
+    match, group = regex_match(text, section_headers)
+    return match.span(group) if match else None
+
+EDGE_CASES = [
+    "",
+    "SKILLS",
+    "SKILLS\n",
+    "skills:\nPython, SQL",
+    "Skills : \r\nPython\r\nEDUCATION\r\nBSc",
+    "TECHNICAL SKILLS\nPython\n\n  EXPERIENCE:\nAcme\nReferences\nOn request",
+    "My skills are broad.\nEXPERIENCESKILLS\nx\nA B\ny",
+    "WORK EXPERIENCE\nEngineer at Acme\nWork History\nOlder jobs\nPROJECTS\nThing 2.0\nAB\n",
+    "Profile:: \n\n\nSummary text\nI\nSummary\nsecond",
+    "EDUCATION\nBSc 2019\nMSc, 2021\nCERTIFICATIONS:\nAWS\nLANGUAGES \nEnglish\nHOBBIES\nChess",
+]
+
+WORDS = ['Python', 'built', 'APIs', 'at', 'Acme', '2019', 'team', 'of', '5', 'SQL', 'AB', 'X', 'lead', '-', 'C++']
+SEPARATORS = ['\n', '\r\n', '\r', ' ', ':', ' :\n', '\n\n', '\n  ', '\t', ', ']
+
+def fuzz_text(rng):
+    """Headers (in any case), heading-like lines and filler joined by line breaks, colons and spaces"""
+    headers = [header for headers in SECTION_HEADERS.values() for header in headers]
+    pieces = []
+    for _ in range(rng.randint(1, 30)):
+        choice = rng.random()
+        if choice < 0.3:
+            header = rng.choice(headers)
+            pieces.append(rng.choice([header, header.lower(), header.title()]))
+        elif choice < 0.4:
+            pieces.append(''.join(rng.choice('ABC DEF') for _ in range(rng.randint(1, 8))))
+        else:
+            pieces.append(rng.choice(WORDS))
+        pieces.append(rng.choice(SEPARATORS))
+    return ''.join(pieces)
+
+TEXTS = EDGE_CASES + [entry['text'] for entry in generate_corpus(count=20)] + \
+        [fuzz_text(random.Random(seed)) for seed in range(300)]
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_sections_match_regex(text):
+    index = SectionIndex(text)
+    for headers in SECTION_HEADERS.values():
+        assert index.span(headers) == regex_span(text, headers)
+        assert index.section(headers) == regex_section(text, headers)
+
+def test_custom_headers():
+    text = "Intro\nVOLUNTEERING:\nFood bank\nAWARDS\nBest intern\n"
+    index = SectionIndex(text)
+    for headers in (['VOLUNTEERING'], ['AWARDS', 'HONORS'], ['HONORS'], ['intro']):
+        assert index.section(headers) == regex_section(text, headers)
+
+def test_spans_skip_empty_sections():
+    text = "SKILLS\nPython\nEDUCATION\nBSc\nREFERENCES\n"
+    spans = SectionIndex(text).spans()
+    assert 'references' not in spans
+    assert text[slice(*spans['education'])].strip() == 'BSc'
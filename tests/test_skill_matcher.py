@@ -0,0 +1,77 @@
+"""The compiled skill matcher must find exactly what the per-skill regex loops it replaced found"""
+import re
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from skill_extractor import (load_skills_dictionary, extract_technical_skills, extract_soft_skills,
+                             extract_industry_skills, extract_skills_from_job_description)
+
+def regex_search(skill, text_lower, js_suffix=False):
+    suffix = r'(?:\.js)?' if js_suffix else ''
+    return re.search(r'\b' + re.escape(skill.lower()) + suffix + r'\b', text_lower) is not None
+
+def regex_technical(text, tech_skills_dict):
+    found = {}
+    for category, skills in tech_skills_dict.items():
+        matched = [skill for skill in skills if regex_search(skill, text.lower(), js_suffix=True)]
+        if matched:
+            found[category] = matched
+    return found
+
+def regex_industry(text, industry_skills_dict):
+    found = {}
+    for industry, skills in industry_skills_dict.items():
+        matched = [skill for skill in skills if regex_search(skill, text.lower())]
+        if matched:
+            found[industry] = matched
+    return found
+
+def regex_job_description(text, skills_dict):
+    every_skill = ([skill for skills in skills_dict['technical'].values() for skill in skills]
+                   + skills_dict['soft']
+                   + [skill for skills in skills_dict['industry_specific'].values() for skill in skills])
+    return [skill for skill in every_skill if regex_search(skill, text.lower())]
+
+EDGE_CASES = [
+    "",
+    "C++, C#, .NET and F# developer; node.js, React.js, Vue.JS",
+    "Pythonic code is not python. PYTHON 3, python-based, _python, python_",
+    "Worked with Go/Rust/Java(Spring) and JavaScript; java.js and go.js.",
+    "Skills:\tSQL\nNoSQL\rPostgreSQL MongoDB, machine learning, Machine-Learning",
+    "Communication, leadership and team work; problem-solving; Problem Solving",
+    "Ünïcode Python naïve café R. R&D, A/B testing, CI/CD",
+]
+
+def corpus_texts():
+    return [entry['text'] for entry in generate_corpus(count=24)] + \
+           [entry['job_description'] for entry in generate_corpus(count=12, seed=3)]
+
+@pytest.fixture(scope='module')
+def skills_dict():
+    return load_skills_dictionary()
+
+@pytest.fixture(scope='module')
+def dictionary_text(skills_dict):
+    """Every skill of the dictionary, with separators that do and don't form word boundaries"""
+    skills = ([skill for skills in skills_dict['technical'].values() for skill in skills] + skills_dict['soft']
+              + [skill for skills in skills_dict['industry_specific'].values() for skill in skills])
+    separators = [', ', '/', '-', ' and ', '_', '.js ', '']
+    return ''.join(skill + separators[number % len(separators)] for number, skill in enumerate(skills))
+
+@pytest.mark.parametrize('text', EDGE_CASES + corpus_texts())
+def test_sections_match_regex_loops(skills_dict, text):
+    assert extract_technical_skills(text, skills_dict['technical']) == regex_technical(text, skills_dict['technical'])
+    assert extract_soft_skills(text, skills_dict['soft']) == \
+        [skill for skill in skills_dict['soft'] if regex_search(skill, text.lower())]
+    assert extract_industry_skills(text, skills_dict['industry_specific']) == \
+        regex_industry(text, skills_dict['industry_specific'])
+
+@pytest.mark.parametrize('text', EDGE_CASES + corpus_texts())
+def test_job_description_skills_match_regex_loop(skills_dict, text):
+    assert extract_skills_from_job_description(text) == regex_job_description(text, skills_dict)
+
+def test_whole_dictionary(skills_dict, dictionary_text):
+    assert extract_technical_skills(dictionary_text, skills_dict['technical']) == \
+        regex_technical(dictionary_text, skills_dict['technical'])
+    assert extract_skills_from_job_description(dictionary_text) == regex_job_description(dictionary_text, skills_dict)
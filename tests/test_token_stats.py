@@ -0,0 +1,128 @@
+"""The token-count analyses must report what the per-verb regex analyses they replaced reported"""
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from analyzer import analyze_word_count, analyze_action_verbs, identify_common_issues
+from benchmarks.corpus import generate_corpus
+from section_index import SectionIndex, SECTION_HEADERS
+from token_stats import TokenStats, build_lemma_table, inflections
+
+COMMON_ACTION_VERBS = [
+    'achieved', 'improved', 'developed', 'created', 'implemented', 'managed', 'led', 'designed',
+    'established', 'coordinated', 'conducted', 'organized', 'directed', 'launched', 'spearheaded',
+    'delivered', 'generated', 'reduced', 'increased', 'negotiated', 'supervised', 'trained',
+    'analyzed', 'built', 'streamlined', 'produced', 'resolved', 'executed', 'maintained',
+    'collaborated', 'influenced', 'optimized', 'authored', 'initiated', 'transformed'
+]
+
+STRONG_ACTION_VERBS = [
+    'achieved', 'improved', 'developed', 'created', 'implemented', 'managed', 'led',
+    'designed', 'established', 'coordinated', 'analyzed', 'built'
+]
+
+def regex_word_counts(resume_data):
+    raw_text = resume_data.get('raw_text', '')
+    word_counts = {'total': len(re.findall(r'\b\w+\b', raw_text))}
+    if resume_data.get('sections', {}).get('summary', False):
+        summary_span = resume_data.get('section_spans', {}).get('summary')
+        if summary_span is None:
+            summary_span = SectionIndex(raw_text).span(SECTION_HEADERS['summary'])
+        if summary_span:
+            summary_text = raw_text[summary_span[0]:summary_span[1]]
+            word_counts['summary'] = len(re.findall(r'\b\w+\b', summary_text))
+    word_counts['experience'] = sum(len(re.findall(r'\b\w+\b', exp['description']))
+                                    for exp in resume_data.get('experience', []) if 'description' in exp)
+    return word_counts
+
+def regex_action_verbs(resume_data):
+    combined_description = ' '.join(exp['description'] for exp in resume_data.get('experience', [])
+                                    if 'description' in exp).lower()
+    verb_counter = Counter()
+    for verb in COMMON_ACTION_VERBS:
+        matches = re.findall(r'\b' + re.escape(verb) + r'\b', combined_description)
+        if matches:
+            verb_counter[verb] = len(matches)
+    action_verb_count = sum(verb_counter.values())
+    total_words = len(re.findall(r'\b\w+\b', combined_description))
+    action_verb_density = action_verb_count / total_words if total_words > 0 else 0
+    return {
+        'action_verb_count': action_verb_count,
+        'unique_action_verbs': len(verb_counter),
+        'action_verb_density': action_verb_density,
+        'most_used_verbs': verb_counter.most_common(5),
+        'assessment': 'good' if action_verb_density >= 0.05 else 'needs_improvement'
+    }
+
+def regex_weak_experience(resume_data):
+    for exp in resume_data.get('experience', []):
+        if 'description' in exp:
+            description = exp['description']
+            if len(re.findall(r'\b\w+\b', description)) < 15:
+                return True
+            if not any(re.search(r'\b' + re.escape(verb) + r'\b', description.lower())
+                       for verb in STRONG_ACTION_VERBS):
+                return True
+    return False
+
+FILLER = ['the', 'team', 'platform', 'by', '40%', 'customers', 'API', 'and', 'in', 'e-commerce',
+          'İstanbul', 'İD', 'naïve', 'co-led', 'led.', 'Led', 'BUILT', 'built-in', 'rebuilt', '2021',
+          'x_led', 'developed_', 'über', 'ﬁle', 'Straße']
+SEPARATORS = [' ', ' ', ', ', '. ', '\n', ' - ', '/', ';']
+
+def fuzz_description(rng):
+    words = COMMON_ACTION_VERBS + FILLER
+    pieces = []
+    for _ in range(rng.randint(0, 40)):
+        word = rng.choice(words)
+        pieces.append(rng.choice([word, word.upper(), word.title()]))
+        pieces.append(rng.choice(SEPARATORS))
+    return ''.join(pieces)
+
+def fuzz_resume(rng, raw_text):
+    resume_data = {
+        'raw_text': raw_text,
+        'sections': {'summary': rng.random() < 0.7},
+        'experience': [{'title': 'Engineer'} if rng.random() < 0.1 else {'description': fuzz_description(rng)}
+                       for _ in range(rng.randint(0, 5))],
+    }
+    if rng.random() < 0.5:
+        resume_data['section_spans'] = SectionIndex(raw_text).spans()
+    return resume_data
+
+RESUMES = [fuzz_resume(random.Random(seed), entry['text'])
+           for seed, entry in enumerate(generate_corpus(count=40))] + \
+          [fuzz_resume(random.Random(seed), fuzz_description(random.Random(-seed))) for seed in range(200)] + \
+          [{}, {'raw_text': 'SUMMARY\nİİ İstanbul\n', 'sections': {'summary': True},
+                'experience': [{'description': 'LED İ team; Developed x'}]}]
+
+@pytest.mark.parametrize('resume_data', RESUMES)
+def test_analyses_match_regex(resume_data):
+    word_counts = analyze_word_count(resume_data)
+    assert {key: value for key, value in word_counts.items() if key != 'assessment'} == \
+        regex_word_counts(resume_data)
+    assert analyze_action_verbs(resume_data) == regex_action_verbs(resume_data)
+    issue = "Weak experience descriptions (too short or lacking action verbs)"
+    assert (issue in identify_common_issues(resume_data)) == regex_weak_experience(resume_data)
+
+def test_inflections_are_opt_in():
+    resume_data = {'experience': [{'description': 'Leading the team, develops tools and manages releases'}]}
+    assert analyze_action_verbs(resume_data)['action_verb_count'] == 0
+    assert analyze_action_verbs(resume_data, match_inflections=True)['most_used_verbs'] == \
+        [('developed', 1), ('managed', 1), ('led', 1)]
+
+def test_lemma_table():
+    assert inflections('manage') == ['manage', 'manages', 'managing']
+    assert inflections('analyze') == ['analyze', 'analyzes', 'analyzing']
+    assert inflections('spearhead') == ['spearhead', 'spearheads', 'spearheading']
+    assert build_lemma_table({'led': 'lead'}) == {'led': ('led',)}
+    assert build_lemma_table({'led': 'lead'}, match_inflections=True) == {'led': ('led', 'lead', 'leads', 'leading')}
+
+def test_combined_stats_match_joined_text():
+    texts = ['Built APIs', '', 'İstanbul office, led 5']
+    combined = TokenStats.combine(TokenStats(text) for text in texts)
+    joined = TokenStats(' '.join(texts))
+    assert (combined.word_count, combined.lowercase_word_count, combined.counts) == \
+        (joined.word_count, joined.lowercase_word_count, joined.counts)
@@ -0,0 +1,479 @@
+import os
+import json
+import math
+import heapq
+import shutil
+import logging
+import tempfile
+import threading
+from collections import Counter, defaultdict
+import numpy as np
+from sqlalchemy import select
+from models import db, Resume
+from token_stats import WORD_PATTERN
+from late_ids import MissingIds, load_late_rows
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; index updates are then not locked across processes
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = os.environ.get(
+    'TEXT_INDEX_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'text_index')
+)
+
+# Bump whenever the on-disk layout or the tokenization changes; older indexes are rebuilt
+FORMAT_VERSION = 1
+
+# New resumes are kept in memory until this many are pending, then written as a segment
+FLUSH_DOCS = int(os.environ.get('TEXT_INDEX_FLUSH_DOCS', 500))
+
+# When there are more segments than this, the smallest ones are merged into one
+MAX_SEGMENTS = 8
+MERGE_FACTOR = 4
+
+LOAD_BATCH_SIZE = 1000
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+MAX_TERM_LENGTH = 32
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can for from has have in is it its of on or our such that the their
+this to was we were will with you your who what which while would should must may also any all into
+than then there these they those about over under more most other some very not no nor do does did
+""".split())
+
+SEGMENT_ARRAYS = ('terms', 'offsets', 'docs', 'tfs', 'doc_ids', 'doc_lengths')
+
+def tokenize(text):
+    """Return the indexed terms of a text: lowercase words, without stopwords and single characters"""
+    return [token for token in WORD_PATTERN.findall((text or '').lower())
+            if 1 < len(token) <= MAX_TERM_LENGTH and token not in STOPWORDS]
+
+def bm25_idf(document_frequency, document_count):
+    return math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+class Segment:
+    """
+    Immutable, memory-mapped part of the inverted index
+
+    Postings of terms[i] are docs[offsets[i]:offsets[i + 1]] (segment-local
+    document numbers, ascending) with term frequencies in tfs at the same
+    positions. doc_ids and doc_lengths map document numbers to resume ids and
+    token counts.
+    """
+
+    def __init__(self, path, info):
+        self.path = path
+        self.name = info['name']
+        self.doc_count = info['docs']
+        self.total_length = info['total_length']
+        self.max_id = info['max_id']
+        for name in SEGMENT_ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+
+    def postings(self, term):
+        """Return (document numbers, term frequencies) of a term, or None"""
+        position = int(np.searchsorted(self.terms, term))
+        if position >= len(self.terms) or self.terms[position] != term:
+            return None
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return self.docs[start:end], self.tfs[start:end]
+
+    def info(self):
+        return {'name': self.name, 'docs': self.doc_count, 'total_length': self.total_length, 'max_id': self.max_id}
+
+def _save_arrays(path, arrays):
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f'{name}.npy'), array)
+
+def _term_dtype(terms):
+    return f'<U{max([1] + [len(term) for term in terms])}'
+
+class TextIndex:
+    """
+    BM25 inverted index over the raw text of stored resumes
+
+    The index is a list of memory-mapped segments on disk plus the resumes
+    added since the last flush, kept in memory. A manifest file names the
+    current segments, the highest indexed id and the ids below it still
+    missing (see MissingIds); it is replaced atomically, so workers can open
+    the index at start-up and pick up segments written by other workers.
+    """
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = index_dir
+        self.segments_dir = os.path.join(index_dir, 'segments')
+        self.manifest_path = os.path.join(index_dir, 'manifest.json')
+        self.segments = []
+        self.max_id = 0
+        self.missing = MissingIds()
+        # Resumes not yet written to a segment: (resume id, length, term counts)
+        self.pending = []
+        self._manifest_stamp = None
+        self._lock = threading.RLock()
+        os.makedirs(self.segments_dir, exist_ok=True)
+        self.reload()
+
+    @property
+    def doc_count(self):
+        return sum(segment.doc_count for segment in self.segments) + len(self.pending)
+
+    @property
+    def total_length(self):
+        return sum(segment.total_length for segment in self.segments) + sum(length for _, length, _ in self.pending)
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest.get('format') != FORMAT_VERSION:
+            logger.info("Text index format changed, rebuilding")
+            return None
+        return manifest
+
+    def reload(self):
+        """Open the segments named in the manifest if another process changed it"""
+        with self._lock:
+            try:
+                stat = os.stat(self.manifest_path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                stamp = None
+            if stamp == self._manifest_stamp:
+                return False
+
+            manifest = self._read_manifest()
+            self._manifest_stamp = stamp
+            segments = manifest['segments'] if manifest else []
+            self.segments = [Segment(os.path.join(self.segments_dir, info['name']), info) for info in segments]
+            max_id = manifest['max_id'] if manifest else 0
+            missing = MissingIds(manifest.get('missing', []) if manifest else [])
+
+            # Keep pending resumes that the new segments do not cover yet
+            self.pending = [entry for entry in self.pending if entry[0] > max_id or entry[0] in missing]
+            missing = MissingIds(missing.entries() + [entry for entry in self.missing.entries() if entry[0] > max_id])
+            missing.found(entry[0] for entry in self.pending)
+            self.missing = missing
+            self.max_id = max([max_id] + [entry[0] for entry in self.pending])
+            return True
+
+    def add(self, resume_id, text):
+        """Add a resume with an id above max_id or missing below it; written to disk once FLUSH_DOCS are pending"""
+        tokens = tokenize(text)
+        with self._lock:
+            if resume_id <= self.max_id and resume_id not in self.missing:
+                return
+            self.pending.append((resume_id, len(tokens), Counter(tokens)))
+            self.missing.found([resume_id])
+            self.max_id = max(self.max_id, resume_id)
+            if len(self.pending) >= FLUSH_DOCS:
+                self.flush()
+
+    def load_new_resumes(self, batch_size=LOAD_BATCH_SIZE):
+        """
+        Add the stored resumes added since the last load
+
+        Returns:
+            int: Number of resumes added
+        """
+        self.reload()
+        table = Resume.__table__
+        loaded = 0
+        if len(self.missing):
+            rows = load_late_rows([table.c.id, table.c.raw_text], self.missing)
+            for row in rows:
+                self.add(row.id, row.raw_text)
+            loaded += len(rows)
+        while True:
+            rows = db.session.execute(
+                select(table.c.id, table.c.raw_text)
+                .where(table.c.id > self.max_id)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            with self._lock:
+                self.missing.passed(self.max_id, [row.id for row in rows])
+            for row in rows:
+                self.add(row.id, row.raw_text)
+            loaded += len(rows)
+        with self._lock:
+            self.missing.expire(self.max_id)
+        return loaded
+
+    def flush(self):
+        """Write the pending resumes as a new segment and merge segments if there are too many"""
+        with self._lock, self._process_lock():
+            # Another worker may have written some of the pending resumes already
+            self._manifest_stamp = None
+            self.reload()
+            if not self.pending:
+                return
+
+            self.segments.append(self._write_pending_segment())
+            self.pending = []
+            while len(self.segments) > MAX_SEGMENTS:
+                self._merge_smallest()
+            self._write_manifest()
+            self._remove_unused_segments()
+
+    def _process_lock(self):
+        return _FileLock(os.path.join(self.index_dir, 'lock'))
+
+    def _new_segment_dir(self):
+        return tempfile.mkdtemp(prefix='segment-', dir=self.segments_dir)
+
+    def _write_pending_segment(self):
+        postings = defaultdict(list)
+        for number, (_, _, counts) in enumerate(self.pending):
+            for term, tf in counts.items():
+                postings[term].append((number, tf))
+
+        terms = sorted(postings)
+        lengths = [len(postings[term]) for term in terms]
+        path = self._new_segment_dir()
+        _save_arrays(path, {
+            'terms': np.array(terms, dtype=_term_dtype(terms)),
+            'offsets': np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))),
+            'docs': np.fromiter((number for term in terms for number, _ in postings[term]), dtype=np.int32),
+            'tfs': np.fromiter((min(tf, 65535) for term in terms for _, tf in postings[term]), dtype=np.uint16),
+            'doc_ids': np.array([resume_id for resume_id, _, _ in self.pending], dtype=np.int64),
+            'doc_lengths': np.array([length for _, length, _ in self.pending], dtype=np.int32)
+        })
+        info = {
+            'name': os.path.basename(path),
+            'docs': len(self.pending),
+            'total_length': sum(length for _, length, _ in self.pending),
+            'max_id': max(resume_id for resume_id, _, _ in self.pending)
+        }
+        return Segment(path, info)
+
+    def _merge_smallest(self):
+        """Replace the MERGE_FACTOR smallest segments with one segment holding all their documents"""
+        smallest = sorted(self.segments, key=lambda segment: segment.doc_count)[:MERGE_FACTOR]
+        # Merge in resume id order so document numbers stay (mostly) ordered by id
+        merging = [segment for segment in self.segments if segment in smallest]
+        merging.sort(key=lambda segment: segment.max_id)
+
+        terms = np.unique(np.concatenate([np.asarray(segment.terms) for segment in merging]))
+        ranges = []
+        doc_offset = 0
+        for segment in merging:
+            segment_terms = np.asarray(segment.terms)
+            segment_offsets = np.asarray(segment.offsets)
+            if len(segment_terms):
+                positions = np.minimum(np.searchsorted(segment_terms, terms), len(segment_terms) - 1)
+                found = segment_terms[positions] == terms
+            else:
+                positions = np.zeros(len(terms), dtype=np.int64)
+                found = np.zeros(len(terms), dtype=bool)
+            starts = np.where(found, segment_offsets[positions], 0)
+            ends = np.where(found, segment_offsets[np.minimum(positions + 1, len(segment_offsets) - 1)], 0)
+            ranges.append((segment, starts, ends, doc_offset))
+            doc_offset += segment.doc_count
+        counts = sum(ends - starts for _, starts, ends, _ in ranges)
+        offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        path = self._new_segment_dir()
+
+        # Postings are written straight to the memory-mapped output files
+        docs = np.lib.format.open_memmap(os.path.join(path, 'docs.npy'), mode='w+', dtype=np.int32, shape=(int(offsets[-1]),))
+        tfs = np.lib.format.open_memmap(os.path.join(path, 'tfs.npy'), mode='w+', dtype=np.uint16, shape=(int(offsets[-1]),))
+        # Each term's postings from earlier segments come first, so document numbers stay ascending
+        position = offsets[:-1].copy()
+        for segment, starts, ends, first_doc in ranges:
+            for index in np.flatnonzero(ends > starts):
+                start, end, out = starts[index], ends[index], position[index]
+                docs[out:out + end - start] = segment.docs[start:end] + first_doc
+                tfs[out:out + end - start] = segment.tfs[start:end]
+            position += ends - starts
+        docs.flush()
+        tfs.flush()
+        del docs, tfs
+
+        _save_arrays(path, {
+            'terms': terms,
+            'offsets': offsets,
+            'doc_ids': np.concatenate([np.asarray(segment.doc_ids) for segment in merging]),
+            'doc_lengths': np.concatenate([np.asarray(segment.doc_lengths) for segment in merging])
+        })
+        info = {
+            'name': os.path.basename(path),
+            'docs': doc_offset,
+            'total_length': sum(segment.total_length for segment in merging),
+            'max_id': max(segment.max_id for segment in merging)
+        }
+        merged = Segment(path, info)
+        self.segments = [segment for segment in self.segments if segment not in merging] + [merged]
+        self.segments.sort(key=lambda segment: segment.max_id)
+
+    def _write_manifest(self):
+        max_id = max([0] + [segment.max_id for segment in self.segments])
+        self.missing.expire(self.max_id)
+        manifest = {
+            'format': FORMAT_VERSION,
+            'max_id': max_id,
+            # Ids below max_id in no segment yet, which workers keep looking for
+            'missing': [entry for entry in self.missing.entries() if entry[0] < max_id],
+            'segments': [segment.info() for segment in self.segments]
+        }
+        handle, temp_path = tempfile.mkstemp(dir=self.index_dir, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self.manifest_path)
+        stat = os.stat(self.manifest_path)
+        self._manifest_stamp = (stat.st_mtime_ns, stat.st_size)
+
+    def _remove_unused_segments(self):
+        # Workers that still map a removed segment keep reading it until they reload (POSIX semantics)
+        in_use = {segment.name for segment in self.segments}
+        for name in os.listdir(self.segments_dir):
+            if name not in in_use:
+                shutil.rmtree(os.path.join(self.segments_dir, name), ignore_errors=True)
+
+    def _query_terms(self, query):
+        """Return (term, idf) for the distinct query terms found in the index"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        document_count = self.doc_count
+        weighted = []
+        for term in terms:
+            frequency = sum(len(postings[0]) for postings in
+                            (segment.postings(term) for segment in self.segments) if postings is not None)
+            frequency += sum(1 for _, _, counts in self.pending if term in counts)
+            if frequency:
+                weighted.append((term, bm25_idf(frequency, document_count)))
+        return weighted
+
+    def search(self, query, limit=50):
+        """
+        Rank stored resumes by BM25 relevance to a query (e.g. a job description)
+
+        Args:
+            query (str): Query text
+            limit (int): Number of resumes to return
+
+        Returns:
+            list: Dicts with resume_id and score, best first
+        """
+        with self._lock:
+            weighted = self._query_terms(query)
+            if not weighted or limit <= 0:
+                return []
+            average_length = self.total_length / self.doc_count
+
+            candidates = []
+            for segment in self.segments:
+                scores = np.zeros(segment.doc_count)
+                for term, idf in weighted:
+                    postings = segment.postings(term)
+                    if postings is None:
+                        continue
+                    docs, tfs = postings
+                    tf = tfs.astype(np.float64)
+                    norm = K1 * (1 - B + B * segment.doc_lengths[docs] / average_length)
+                    scores[docs] += idf * tf * (K1 + 1) / (tf + norm)
+                matched = np.flatnonzero(scores)
+                if len(matched) > limit:
+                    matched = matched[np.argpartition(scores[matched], len(matched) - limit)[-limit:]]
+                candidates.extend(zip(scores[matched].tolist(), segment.doc_ids[matched].tolist()))
+
+            for resume_id, length, counts in self.pending:
+                score = _bm25_score(weighted, counts, length, average_length)
+                if score:
+                    candidates.append((score, resume_id))
+
+        best = heapq.nlargest(limit, candidates)
+        return [{'resume_id': resume_id, 'score': score} for score, resume_id in best]
+
+    def score_text(self, query, text):
+        """
+        Score one document that is not in the index (e.g. a new upload) against a query
+
+        Corpus statistics are taken from the index as if the document had been added.
+
+        Returns:
+            dict: BM25 score and the query terms the document contains
+        """
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        with self._lock:
+            document_count = self.doc_count + 1
+            average_length = (self.total_length + len(tokens)) / document_count
+            weighted = []
+            for term in dict.fromkeys(tokenize(query)):
+                frequency = sum(len(postings[0]) for postings in
+                                (segment.postings(term) for segment in self.segments) if postings is not None)
+                frequency += sum(1 for _, _, pending_counts in self.pending if term in pending_counts)
+                frequency += 1 if term in counts else 0
+                if frequency:
+                    weighted.append((term, bm25_idf(frequency, document_count)))
+
+        return {
+            'score': _bm25_score(weighted, counts, len(tokens), average_length) if tokens else 0.0,
+            'matched_terms': [term for term, _ in weighted if term in counts]
+        }
+
+def _bm25_score(weighted, counts, length, average_length):
+    score = 0.0
+    for term, idf in weighted:
+        tf = counts.get(term)
+        if tf:
+            score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / average_length))
+    return score
+
+class _FileLock:
+    """Exclusive lock on a file, held across processes while the index is updated"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_text_index():
+    """Return the process-wide text index, opened from disk and caught up with the resumes table"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TextIndex()
+        loaded = _index.load_new_resumes()
+    if loaded:
+        logger.debug(f"Text index: added {loaded} resumes ({_index.doc_count} total)")
+    return _index
+
+def index_new_resumes():
+    """Bring an already opened index up to date after resumes are stored"""
+    if _index is not None:
+        with _index_lock:
+            _index.load_new_resumes()
+
+def search_resumes(query, limit=50):
+    """Return the stored resumes most relevant to a query (see TextIndex.search)"""
+    return get_text_index().search(query, limit)
+
+def score_resume_text(query, text):
+    """Score a resume that is not stored yet against a query (see TextIndex.score_text)"""
+    return get_text_index().score_text(query, text)
@@ -0,0 +1,105 @@
+import re
+from collections import Counter
+
+# A word is a maximal run of word characters, as matched by \b\w+\b
+WORD_PATTERN = re.compile(r'\w+')
+
+class TokenStats:
+    """
+    Word tokens of a text, counted once and shared by all analyses
+
+    Attributes:
+        word_count (int): Number of words in the text as written
+        lowercase_word_count (int): Number of words in the lowercased text
+        counts (Counter): Occurrences of each word in the lowercased text
+    """
+
+    def __init__(self, text):
+        tokens = WORD_PATTERN.findall(text.lower())
+        self.counts = Counter(tokens)
+        self.lowercase_word_count = len(tokens)
+
+        # Lowercasing preserves word boundaries for every character except 'İ', which gains a combining dot
+        self.word_count = len(WORD_PATTERN.findall(text)) if 'İ' in text else len(tokens)
+
+    @classmethod
+    def combine(cls, stats):
+        """Return the statistics of several texts joined with spaces"""
+        combined = cls('')
+        for item in stats:
+            combined.word_count += item.word_count
+            combined.lowercase_word_count += item.lowercase_word_count
+            combined.counts.update(item.counts)
+        return combined
+
+    def count(self, forms):
+        """Return the total occurrences of any of the given lowercase words"""
+        return sum(self.counts[form] for form in forms)
+
+    def contains_any(self, words):
+        """Return True if any of the given lowercase words occurs in the text"""
+        return any(word in self.counts for word in words)
+
+class DocumentTokenStats:
+    """
+    Token statistics for a parsed resume: the whole text, the summary and each experience description
+
+    Built once per resume in analyze_resume and passed to the individual analyses.
+    """
+
+    def __init__(self, resume_data, summary_text=None):
+        self.raw = TokenStats(resume_data.get('raw_text', ''))
+        self.summary = TokenStats(summary_text) if summary_text is not None else None
+        self.experience = [TokenStats(exp['description'])
+                           for exp in resume_data.get('experience', []) if 'description' in exp]
+        self._combined_experience = None
+
+    @property
+    def combined_experience(self):
+        """Statistics of all experience descriptions joined together"""
+        if self._combined_experience is None:
+            self._combined_experience = TokenStats.combine(self.experience)
+        return self._combined_experience
+
+def inflections(base):
+    """
+    Return the regular inflections of a verb's base form
+
+    Args:
+        base (str): Base form, e.g. 'develop' or 'manage'
+
+    Returns:
+        list: Base form, third person singular and present participle
+    """
+    if base.endswith(('s', 'sh', 'ch', 'x', 'z')):
+        third_person = base + 'es'
+    elif base.endswith('y') and base[-2:-1] not in 'aeiou':
+        third_person = base[:-1] + 'ies'
+    else:
+        third_person = base + 's'
+
+    if base.endswith('e') and not base.endswith('ee'):
+        participle = base[:-1] + 'ing'
+    else:
+        participle = base + 'ing'
+
+    return [base, third_person, participle]
+
+def build_lemma_table(verb_lemmas, match_inflections=False):
+    """
+    Map each verb to the word forms counted as an occurrence of it
+
+    Args:
+        verb_lemmas (dict): Verb as listed (past tense) mapped to its base form
+        match_inflections (bool): Also count base form, -s and -ing forms
+
+    Returns:
+        dict: Verb mapped to a tuple of lowercase forms, in the order of verb_lemmas
+    """
+    table = {}
+    for verb, base in verb_lemmas.items():
+        forms = [verb]
+        if match_inflections:
+            forms += [form for form in inflections(base) if form != verb]
+        table[verb] = tuple(forms)
+    return table